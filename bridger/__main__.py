@@ -1,9 +1,12 @@
+import signal
+
 from paho.mqtt.client import MQTT_ERR_SUCCESS, CallbackAPIVersion
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from bridger.config import MQTT_BROKER, MQTT_PASS, MQTT_PORT, MQTT_USER
 from bridger.influx import create_influx_client
 from bridger.log import logger
+from bridger.mesh import pki_engine
 from bridger.mqtt import BridgerMQTT
 
 
@@ -28,7 +31,24 @@ def connect_to_mqtt(influx_client):
     return client
 
 
+def handle_sigterm(signum, frame):
+    # docker stop sends SIGTERM, unwind the network loop like Ctrl-C so held packets are written before we exit
+    logger.info("Received SIGTERM, shutting down...")
+    raise SystemExit(0)
+
+
+def shutdown(client):
+    """Runs however the process exits so nothing held in memory is lost."""
+    # Saved first, it doesn't depend on InfluxDB being reachable
+    pki_engine.public_keys.save()
+    if client:
+        client.disconnect()
+        client.loop_stop()
+        client.shutdown()
+
+
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, handle_sigterm)
     client = None
 
     try:
@@ -39,11 +59,7 @@ if __name__ == "__main__":
         client.loop_forever(retry_first_connection=True)
     except KeyboardInterrupt:
         logger.info("Received KeyboardInterrupt, shutting down...")
-        if client:
-            client.disconnect()
-            client.loop_stop()
     except Exception as e:
         logger.error(f"Application error: {e}")
-        if client:
-            client.disconnect()
-            client.loop_stop()
+    finally:
+        shutdown(client)
@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+
+import brotli
+from aiohttp import web
+
+MIN_COMPRESS_SIZE = 512  # Bytes. Smaller bodies are not worth compressing.
+ENCODING_PREFERENCE = ("br", "gzip")
+MAX_CACHE_ENTRIES = 256
+
+
+def accepted_encodings(header: str) -> set[str]:
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    content_type: str
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, content_type: str) -> "CachedResponse":
+        etag = hashlib.sha1(body).hexdigest()
+        encoded = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encoded["br"] = brotli.compress(body, mode=brotli.MODE_TEXT)
+            encoded["gzip"] = gzip.compress(body, compresslevel=9)
+
+        return cls(body=body, content_type=content_type, etag=etag, encoded=encoded)
+
+    def respond(self, request: web.Request, max_age: int, vary: tuple[str, ...] = ()) -> web.Response:
+        """`vary` names any request headers other than Accept and Accept-Encoding the body was chosen by."""
+        encodings = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        encoding = next((name for name in ENCODING_PREFERENCE if name in self.encoded and name in encodings), None)
+
+        # Each representation gets its own strong ETag so caches never mix up compressed and plain bodies
+        etag = f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={max_age}",
+            "Vary": ", ".join(("Accept", "Accept-Encoding", *vary)),
+        }
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return web.Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return web.Response(body=self.encoded[encoding], content_type=self.content_type, headers=headers)
+
+        return web.Response(body=self.body, content_type=self.content_type, headers=headers)
+
+
+class ResponseCache:
+    """Pre-serialized and pre-compressed response bodies keyed by name and the version of the data they were built from.
+
+    Keys can come from the request path, so only the `max_entries` most recently used responses are kept.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, tuple[Hashable, CachedResponse]] = OrderedDict()
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], tuple[bytes, str]]) -> CachedResponse:
+        entry = self.entries.get(key)
+
+        if entry is None or entry[0] != version:
+            body, content_type = build()
+            entry = (version, CachedResponse.build(body, content_type))
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def invalidate(self) -> None:
+        self.entries.clear()
@@ -1,8 +1,12 @@
 import argparse
 import os
 import secrets
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
+from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
 from requests.exceptions import ConnectionError
 from rich.console import Console
 from rich.table import Table
@@ -11,6 +15,10 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 
 from bridger.emqx import EMQXClient
 from bridger.gateway import GatewayError, GatewayManagerEMQX
+from bridger.influx import create_influx_client
+from bridger.influx.interfaces import InfluxReader
+from bridger.influx.routing import BUCKETS
+from bridger.influx.schema import COMPACT_FIELDS, SCHEMAS, flux_time, migration_records, parse_duration, time_chunks
 
 console = Console()
 
@@ -154,6 +162,117 @@ def generate_apikey_command(args):
     console.print(f"\nBootstrap file created at: [bold]{bootstrap_file}[/bold]", style="green")
 
 
+def cardinality_report_command(args):
+    reader = InfluxReader(create_influx_client("cli"))
+    for bucket in [args.bucket] if args.bucket else BUCKETS.buckets:
+        cardinality_report(reader, bucket, args.range, args.measurement)
+
+
+def cardinality_report(reader: InfluxReader, bucket: str, range: str, measurements: Optional[list[str]]):
+    measurements = measurements or reader.get_measurements(range, bucket)
+    if not measurements:
+        console.print(f"No measurements found in {bucket} over {range}", style="yellow")
+        return
+
+    rows = []
+    for measurement in measurements:
+        series = reader.get_series_cardinality(measurement, range, bucket)
+        tags = reader.get_tag_cardinality(measurement, range, bucket)
+        rows.append((measurement, series, tags))
+
+    table = Table(title=f"Series in {bucket} over {range}")
+    table.add_column("Measurement", style="cyan", no_wrap=True)
+    table.add_column("Series", style="magenta", justify="right")
+    table.add_column("Distinct tag values")
+    table.add_column("Fields in the compact schema", style="yellow")
+
+    for measurement, series, tags in sorted(rows, key=lambda row: row[1], reverse=True):
+        ordered = sorted(tags.items(), key=lambda item: item[1], reverse=True)
+        table.add_row(
+            measurement,
+            str(series),
+            ", ".join(f"{tag}: {count}" for tag, count in ordered),
+            ", ".join(tag for tag, _ in ordered if tag in COMPACT_FIELDS),
+        )
+
+    console.print(table)
+    console.print(f"Total series in {bucket}: {sum(row[1] for row in rows)}", style="bold")
+
+
+def migrate_schema_command(args):
+    if args.target_bucket and not args.bucket:
+        console.print("--target-bucket needs --bucket, every routed bucket is migrated otherwise", style="bold red")
+        exit(1)
+
+    # Points are routed to more than one bucket when a hot bucket or bucket routes are set, each is copied to its own target
+    sources = [args.bucket] if args.bucket else BUCKETS.buckets
+    targets = {source: args.target_bucket or f"{source}{args.target_suffix}" for source in sources}
+    if any(source == target for source, target in targets.items()):
+        console.print(
+            "The target bucket has to differ from the source bucket, old series can't be rewritten in place",
+            style="bold red",
+        )
+        exit(1)
+
+    try:
+        now = datetime.now(timezone.utc)
+        start = now - parse_duration(args.start)
+        stop = now - parse_duration(args.stop) if args.stop else now
+        chunk = parse_duration(args.chunk)
+    except ValueError as e:
+        console.print(str(e), style="bold red")
+        exit(1)
+
+    client = create_influx_client("cli")
+    reader = InfluxReader(client)
+    write_api = client.write_api(write_options=SYNCHRONOUS)
+    for source, target in targets.items():
+        totals = migrate_bucket(reader, write_api, source, target, args, start, stop, chunk)
+
+        table = Table(title=f"{'Would migrate' if args.dry_run else 'Migrated'} {source} to {target}")
+        table.add_column("Measurement", style="cyan", no_wrap=True)
+        table.add_column("Points", style="magenta", justify="right")
+        for measurement, count in totals.items():
+            table.add_row(measurement, str(count))
+        console.print(table)
+
+
+def migrate_bucket(reader, write_api, source, target, args, start, stop, chunk) -> dict[str, int]:
+    measurements = args.measurement or reader.get_measurements(flux_time(start), source)
+
+    totals = {}
+    for measurement in measurements:
+        totals[measurement] = 0
+        for chunk_start, chunk_stop in time_chunks(start, stop, chunk):
+            tables = reader.get_rows(measurement, flux_time(chunk_start), flux_time(chunk_stop), source)
+            if tables is None:
+                console.print(
+                    f"Reading {measurement} from {source} at {flux_time(chunk_start)} failed, stopping", style="bold red"
+                )
+                exit(1)
+
+            records = migration_records(tables, args.schema)
+            if records and not args.dry_run:
+                try:
+                    for offset in range(0, len(records), args.batch_size):
+                        write_api.write(
+                            bucket=target,
+                            record=records[offset : offset + args.batch_size],
+                            write_precision="ns",
+                        )
+                except ApiException as e:
+                    console.print(
+                        f"Writing {measurement} to {target} at {flux_time(chunk_start)} failed: {e}", style="bold red"
+                    )
+                    exit(1)
+
+            totals[measurement] += len(records)
+            console.print(
+                f"{source} {measurement}: {len(records)} points from {flux_time(chunk_start)} to {flux_time(chunk_stop)}"
+            )
+    return totals
+
+
 def main():
     parser = argparse.ArgumentParser(description="Bridger CLI - MQTT gateway management")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
@@ -181,6 +300,33 @@ def main():
     apikey_parser.add_argument("--force", "-f", action="store_true", help="Force overwrite existing files")
     apikey_parser.set_defaults(func=generate_apikey_command)
 
+    # Cardinality report command
+    cardinality_parser = subparsers.add_parser("cardinality-report", help="Estimate InfluxDB series per measurement")
+    cardinality_parser.add_argument("--range", "-r", default="-1d", help="Flux range start to look back over (default: -1d)")
+    cardinality_parser.add_argument("--bucket", help="Bucket to report on (default: every bucket points are written to)")
+    cardinality_parser.add_argument(
+        "--measurement", "-m", action="append", help="Measurement to report on, can be repeated (default: all)"
+    )
+    cardinality_parser.set_defaults(func=cardinality_report_command)
+
+    # Migrate schema command
+    migrate_parser = subparsers.add_parser("migrate-schema", help="Copy historical data into a bucket using a new schema")
+    migrate_parser.add_argument("--bucket", help="Bucket to read from (default: every bucket points are written to)")
+    migrate_parser.add_argument("--target-bucket", help="Bucket to write to when --bucket is given")
+    migrate_parser.add_argument(
+        "--target-suffix", default="_compact", help="Suffix added to each bucket's name for its target (default: _compact)"
+    )
+    migrate_parser.add_argument("--schema", choices=SCHEMAS, default="compact", help="Schema to write")
+    migrate_parser.add_argument("--start", default="30d", help="How far back to start, e.g. 30d (default: 30d)")
+    migrate_parser.add_argument("--stop", help="How far back to stop, e.g. 1h (default: now)")
+    migrate_parser.add_argument("--chunk", default="6h", help="Time range read and written at once (default: 6h)")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000, help="Points per write request (default: 5000)")
+    migrate_parser.add_argument(
+        "--measurement", "-m", action="append", help="Measurement to migrate, can be repeated (default: all)"
+    )
+    migrate_parser.add_argument("--dry-run", action="store_true", help="Read and convert without writing")
+    migrate_parser.set_defaults(func=migrate_schema_command)
+
     args = parser.parse_args()
 
     if args.command is None:
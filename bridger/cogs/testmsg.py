@@ -17,6 +17,7 @@ from bridger.dataclasses import NodeData, TextMessagePoint
 from bridger.deduplication import PacketDeduplicator
 from bridger.influx.interfaces import InfluxReader
 from bridger.log import logger
+from bridger.mesh import pki_engine
 from bridger.mqtt import PBPacketProcessor
 from bridger.utils import should_ignore_pki_message
 
@@ -38,6 +39,7 @@ class TestMsg(commands.GroupCog, name="testmsg"):
         self.discord_channel = None
         self.influx_reader = influx_reader
         self.deduplicator = PacketDeduplicator(maxlen=100, use_gateway_id=True)
+        self.public_keys = pki_engine.public_keys
 
     @commands.Cog.listener(name="on_ready")
     async def on_ready(self):
@@ -186,7 +188,10 @@ class TestMsg(commands.GroupCog, name="testmsg"):
                             logger.exception("Failed to fetch or edit Discord message")
                     else:
                         now_timestamp = int(datetime.now().timestamp())
-                        content = f"Test message from {name} - `{source_node.node_hex_id_with_bang}` <t:{now_timestamp}:R>\n> {data.text}"  # noqa: E501
+                        # The ingest process learns keys so pick up anything it has written since we last looked
+                        self.public_keys.reload_if_changed()
+                        pki = " (PKI)" if source_node_id in self.public_keys else ""
+                        content = f"Test message from {name} - `{source_node.node_hex_id_with_bang}`{pki} <t:{now_timestamp}:R>\n> {data.text}"  # noqa: E501
 
                         embeds = [self.create_embed(service_envelope)]
                         try:
@@ -7,5 +7,52 @@ MQTT_PORT = os.getenv("MQTT_PORT", 1883)
 MQTT_TOPIC = os.getenv("MQTT_TOPIC", "egr/home/2/e/#")
 INFLUXDB_V2_BUCKET = os.getenv("INFLUXDB_V2_BUCKET", "meshtastic")
 INFLUXDB_V2_WRITE_PRECISION = os.getenv("INFLUXDB_V2_WRITE_PRECISION", "s")  # s, ms, us, or ns
+INFLUX_SCHEMA = os.getenv("INFLUX_SCHEMA", "legacy")  # legacy or compact, see README
+INFLUX_HOT_BUCKET = os.getenv("INFLUX_HOT_BUCKET", "")  # Bucket for high rate telemetry, empty keeps it in the main bucket
+INFLUX_HOT_MEASUREMENTS = os.getenv(
+    "INFLUX_HOT_MEASUREMENTS",
+    "battery,sensor,power,air_quality,local_stats,health,host,traffic_management,position,reception,reception_gateway",
+)
+INFLUX_BUCKET_ROUTES = os.getenv("INFLUX_BUCKET_ROUTES", "")  # Comma separated measurement=bucket overrides
 MESHTASTIC_API_ENDPOINT = "https://api.meshtastic.org"
 MESHTASTIC_API_CACHE_TTL = int(os.getenv("MESHTASTIC_API_CACHE_TTL", 3600 * 6))  # Default to 6 hours if not set
+BRIDGER_NODE_ID = os.getenv("BRIDGER_NODE_ID")  # Node ID (!hex or number) that PKI packets are decrypted for
+BRIDGER_PKI_PRIVATE_KEY = os.getenv("BRIDGER_PKI_PRIVATE_KEY")  # Base64 encoded X25519 private key of that node
+PKI_SHARED_KEY_CACHE_SIZE = int(os.getenv("PKI_SHARED_KEY_CACHE_SIZE", 1024))  # Peers whose shared key is kept
+BRIDGER_DATA_PATH = os.getenv("BRIDGER_DATA_PATH", "/var/lib/bridger")
+MESHTASTIC_CATALOG_PATH = os.getenv("MESHTASTIC_CATALOG_PATH", os.path.join(BRIDGER_DATA_PATH, "device_hardware.json"))
+# Comma separated allow and deny lists applied before packets are decoded, an empty allow list allows everything
+FILTER_CHANNELS_ALLOW = os.getenv("FILTER_CHANNELS_ALLOW", "")
+FILTER_CHANNELS_DENY = os.getenv("FILTER_CHANNELS_DENY", "")
+FILTER_GATEWAYS_ALLOW = os.getenv("FILTER_GATEWAYS_ALLOW", "")
+FILTER_GATEWAYS_DENY = os.getenv("FILTER_GATEWAYS_DENY", "")
+FILTER_PORTNUMS_ALLOW = os.getenv("FILTER_PORTNUMS_ALLOW", "")  # Port number names or numbers
+FILTER_PORTNUMS_DENY = os.getenv("FILTER_PORTNUMS_DENY", "")
+NODE_STATE_POLICY = os.getenv("NODE_STATE_POLICY", "change")  # always, change or interval
+NODE_STATE_INTERVAL = int(os.getenv("NODE_STATE_INTERVAL", 3600 * 3))  # Seconds between nodeinfo writes, see README
+PACKET_STATS_INTERVAL = int(os.getenv("PACKET_STATS_INTERVAL", 60))  # Seconds between packet outcome summaries
+RECEPTION_WINDOW = float(os.getenv("RECEPTION_WINDOW", 5))  # Seconds a packet is held open to collect other gateways
+RECEPTION_PER_GATEWAY = os.getenv("RECEPTION_PER_GATEWAY", "false").lower() == "true"  # Also write a row per gateway
+LINK_QUALITY_INTERVAL = int(os.getenv("LINK_QUALITY_INTERVAL", 300))  # Seconds between link_quality writes
+LINK_QUALITY_ALPHA = float(os.getenv("LINK_QUALITY_ALPHA", 0.2))  # Weight of the newest sample in the SNR/RSSI EWMA
+LINK_QUALITY_MAX_LINKS = int(os.getenv("LINK_QUALITY_MAX_LINKS", 4096))  # Links tracked before the stalest is dropped
+ROLLUP_BUCKET = os.getenv("ROLLUP_BUCKET", f"{INFLUXDB_V2_BUCKET}_rollup")
+ROLLUP_INTERVALS = os.getenv("ROLLUP_INTERVALS", "60,900,3600")  # Comma separated window lengths in seconds
+ROLLUP_STATE_PATH = os.getenv("ROLLUP_STATE_PATH", os.path.join(BRIDGER_DATA_PATH, "rollups.json"))
+LINK_DISTANCE_INTERVAL = int(os.getenv("LINK_DISTANCE_INTERVAL", 300))  # Seconds between link_distance writes
+LINK_DISTANCE_BUCKET_KM = float(os.getenv("LINK_DISTANCE_BUCKET_KM", 1))  # Width of link_distance distance buckets
+PUBLIC_KEY_DIRECTORY_PATH = os.getenv("PUBLIC_KEY_DIRECTORY_PATH", os.path.join(BRIDGER_DATA_PATH, "public_keys.json"))
+PUBLIC_KEY_SAVE_INTERVAL = int(os.getenv("PUBLIC_KEY_SAVE_INTERVAL", 60))  # Seconds between writes of newly learned keys
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 300))  # Seconds clients may cache API responses
+STREAM_CLIENT_BUFFER = int(os.getenv("STREAM_CLIENT_BUFFER", 256))  # Points buffered per live stream client
+STREAM_KEEPALIVE = int(os.getenv("STREAM_KEEPALIVE", 15))  # Seconds between keepalive comments on idle streams
+RECENT_STORE_CAPACITY = int(os.getenv("RECENT_STORE_CAPACITY", 1024))  # Samples kept per node and measurement
+RECENT_STORE_MEMORY = int(os.getenv("RECENT_STORE_MEMORY", 64))  # Megabytes the recent telemetry store may use
+SPATIAL_CELL_SIZE = float(os.getenv("SPATIAL_CELL_SIZE", 0.05))  # Degrees per side of a spatial index grid cell
+COVERAGE_ZOOM = int(os.getenv("COVERAGE_ZOOM", 12))  # Map zoom level coverage is binned at, lower zooms are derived
+COVERAGE_POSITION_MAX_AGE = int(os.getenv("COVERAGE_POSITION_MAX_AGE", 3600 * 6))  # Oldest position used to place a node
+COVERAGE_PATH = os.getenv("COVERAGE_PATH", os.path.join(BRIDGER_DATA_PATH, "coverage.json"))
+COVERAGE_SAVE_INTERVAL = int(os.getenv("COVERAGE_SAVE_INTERVAL", 300))  # Seconds between writes of the coverage file
+TOPOLOGY_EDGE_MAX_AGE = int(os.getenv("TOPOLOGY_EDGE_MAX_AGE", 3600 * 6))  # Seconds before an unseen edge is dropped
+GATEWAY_HEALTH_REFRESH_INTERVAL = int(os.getenv("GATEWAY_HEALTH_REFRESH_INTERVAL", 60))
+GATEWAY_HEALTH_WINDOW = int(os.getenv("GATEWAY_HEALTH_WINDOW", 3600))  # Seconds of packets used for the packet rate
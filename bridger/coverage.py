@@ -0,0 +1,230 @@
+import json
+import math
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.config import COVERAGE_PATH, COVERAGE_POSITION_MAX_AGE, COVERAGE_SAVE_INTERVAL, COVERAGE_ZOOM
+from bridger.linkquality import LinkQualityAggregator
+from bridger.log import logger
+from bridger.spatial import KM_PER_DEGREE, SpatialIndex
+from bridger.utils import atomic_write_json
+
+TILE_SIZE = 256
+# Finest detail a rendered tile can show, each stored tile is drawn as at least a single pixel
+MAX_RENDER_DEPTH = 8
+SNR_RANGE = (-20.0, 10.0)
+
+
+def tile_for(latitude: float, longitude: float, zoom: int) -> tuple[int, int]:
+    """Web Mercator (slippy map) tile holding a position."""
+    n = 1 << zoom
+    latitude = max(min(latitude, 85.0511), -85.0511)
+    x = int((longitude + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_width_m(latitude: float, zoom: int) -> float:
+    return 360 / (1 << zoom) * KM_PER_DEGREE * 1000 * math.cos(math.radians(latitude))
+
+
+@dataclass
+class GatewayCoverage:
+    count: int
+    snr_best: float
+    rssi_best: float
+    last_heard: float
+
+    def add(self, snr: float, rssi: float, now: float) -> None:
+        self.count += 1
+        self.snr_best = max(self.snr_best, snr)
+        self.rssi_best = max(self.rssi_best, rssi)
+        self.last_heard = max(self.last_heard, now)
+
+    def merge(self, other: "GatewayCoverage") -> None:
+        self.count += other.count
+        self.snr_best = max(self.snr_best, other.snr_best)
+        self.rssi_best = max(self.rssi_best, other.rssi_best)
+        self.last_heard = max(self.last_heard, other.last_heard)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "snr_best": self.snr_best, "rssi_best": self.rssi_best, "last_heard": self.last_heard}
+
+
+class CoverageMap:
+    """Which gateways hear nodes in each map tile, built up one reception at a time.
+
+    A direct reception (not relayed) of a node whose position is known and at most `max_position_age` seconds old is
+    counted in the `zoom` level tile holding that position, per gateway, along with the best SNR and RSSI heard. Nodes
+    sharing their position less precisely than a tile are skipped since they can't be placed in one. Lower zoom levels
+    are built from the stored tiles when they are requested.
+    """
+
+    def __init__(
+        self,
+        positions: SpatialIndex,
+        zoom: int = COVERAGE_ZOOM,
+        max_position_age: int = COVERAGE_POSITION_MAX_AGE,
+        path: Optional[str] = COVERAGE_PATH,
+        save_interval: int = COVERAGE_SAVE_INTERVAL,
+    ):
+        self.positions = positions
+        self.zoom = zoom
+        self.max_position_age = max_position_age
+        self.path = path
+        self.save_interval = save_interval
+        self.tiles: dict[tuple[int, int], dict[str, GatewayCoverage]] = {}
+        self.version = 0
+        self.dirty = False
+        self.last_save = time.monotonic()
+
+        self.load()
+
+    def observe(self, service_envelope: ServiceEnvelope, now: Optional[float] = None) -> bool:
+        if not LinkQualityAggregator.is_direct(service_envelope):
+            return False
+
+        now = now or time.time()
+        packet = service_envelope.packet
+        position = self.positions.positions.get(getattr(packet, "from"))
+        if position is None or now - position.updated > self.max_position_age:
+            return False
+        if position.accuracy_m > tile_width_m(position.latitude, self.zoom):
+            return False
+
+        tile = self.tiles.setdefault(tile_for(position.latitude, position.longitude, self.zoom), {})
+        gateway = tile.get(service_envelope.gateway_id)
+        if gateway is None:
+            tile[service_envelope.gateway_id] = GatewayCoverage(1, packet.rx_snr, packet.rx_rssi, now)
+        else:
+            gateway.add(packet.rx_snr, packet.rx_rssi, now)
+
+        self.version += 1
+        self.dirty = True
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.save()
+        return True
+
+    def children(self, z: int, x: int, y: int) -> dict[tuple[int, int], dict[str, GatewayCoverage]]:
+        """Stored tiles inside tile z/x/y, keyed by their offset within it."""
+        depth = self.zoom - z
+        if depth < 0:
+            raise ValueError(f"Coverage is only kept down to zoom {self.zoom}")
+
+        if depth == 0:
+            tile = self.tiles.get((x, y))
+            return {(0, 0): tile} if tile else {}
+
+        return {
+            (tile_x - (x << depth), tile_y - (y << depth)): gateways
+            for (tile_x, tile_y), gateways in self.tiles.items()
+            if tile_x >> depth == x and tile_y >> depth == y
+        }
+
+    def tile(self, z: int, x: int, y: int) -> dict:
+        gateways: dict[str, GatewayCoverage] = {}
+        for child in self.children(z, x, y).values():
+            for gateway_id, coverage in child.items():
+                if gateway_id in gateways:
+                    gateways[gateway_id].merge(coverage)
+                else:
+                    gateways[gateway_id] = GatewayCoverage(**coverage.to_dict())
+
+        return {
+            "z": z,
+            "x": x,
+            "y": y,
+            "count": sum(coverage.count for coverage in gateways.values()),
+            "gateways": {gateway_id: coverage.to_dict() for gateway_id, coverage in gateways.items()},
+        }
+
+    def render_png(self, z: int, x: int, y: int) -> bytes:
+        """A 256x256 tile with each stored tile inside it coloured by the best SNR any gateway heard there."""
+        depth = self.zoom - z
+        if depth > MAX_RENDER_DEPTH:
+            raise ValueError(f"Tiles can only be rendered from zoom {self.zoom - MAX_RENDER_DEPTH}")
+
+        scale = TILE_SIZE >> max(depth, 0)
+        pixels = bytearray(TILE_SIZE * TILE_SIZE * 4)
+        for (offset_x, offset_y), gateways in self.children(z, x, y).items():
+            colour = snr_colour(max(coverage.snr_best for coverage in gateways.values()))
+            row = colour * scale
+            for pixel_y in range(offset_y * scale, (offset_y + 1) * scale):
+                start = (pixel_y * TILE_SIZE + offset_x * scale) * 4
+                pixels[start : start + len(row)] = row
+
+        return encode_png(TILE_SIZE, TILE_SIZE, pixels)
+
+    def load(self) -> bool:
+        if self.path is None:
+            return False
+
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            if snapshot["zoom"] != self.zoom:
+                logger.warning(f"Ignoring coverage in {self.path} stored at zoom {snapshot['zoom']}, not {self.zoom}")
+                return False
+
+            self.tiles = {
+                tuple(int(part) for part in key.split("/")): {
+                    gateway_id: GatewayCoverage(*values) for gateway_id, values in gateways.items()
+                }
+                for key, gateways in snapshot["tiles"].items()
+            }
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Unable to load coverage from {self.path}: {e}")
+            return False
+
+        return True
+
+    def save(self) -> None:
+        self.last_save = time.monotonic()
+        if self.path is None or not self.dirty:
+            return
+
+        # Lists rather than objects keep the file small since there is a row for every gateway in every tile
+        snapshot = {
+            "zoom": self.zoom,
+            "tiles": {
+                f"{x}/{y}": {
+                    gateway_id: [coverage.count, coverage.snr_best, coverage.rssi_best, coverage.last_heard]
+                    for gateway_id, coverage in gateways.items()
+                }
+                for (x, y), gateways in self.tiles.items()
+            },
+        }
+        try:
+            atomic_write_json(self.path, snapshot)
+        except OSError as e:
+            logger.warning(f"Unable to persist coverage to {self.path}: {e}")
+            return
+
+        self.dirty = False
+
+
+def snr_colour(snr: float) -> bytes:
+    """Red for the weakest SNR through yellow to green for the strongest, partly transparent."""
+    low, high = SNR_RANGE
+    level = min(max((snr - low) / (high - low), 0.0), 1.0)
+    red = int(255 * min(1.0, 2 - 2 * level))
+    green = int(255 * min(1.0, 2 * level))
+    return bytes((red, green, 0, 160))
+
+
+def encode_png(width: int, height: int, rgba: bytes) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    stride = width * 4
+    # Every scanline starts with filter type 0 (none)
+    raw = b"".join(b"\x00" + rgba[row * stride : (row + 1) * stride] for row in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
@@ -1,16 +1,31 @@
 import base64
+import hashlib
 import os
+import struct
+from functools import lru_cache
+from typing import Optional
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+
+from bridger.config import BRIDGER_NODE_ID, BRIDGER_PKI_PRIVATE_KEY, PKI_SHARED_KEY_CACHE_SIZE
+from bridger.keys import PublicKeyDirectory
+from bridger.utils import parse_node_id
 
 MAX_BLOCKSIZE = 1024
 MESHTASTIC_KEY = os.getenv("MESHTASTIC_KEY", "1PG7OiApB1nwvP+rz05pAQ==")  # Base64-encoded 32-byte key when set to AQ==
+PKI_TAG_SIZE = 8
+PKI_OVERHEAD = PKI_TAG_SIZE + 4  # Authentication tag followed by the extra nonce
 
 
 class CryptoEngine:
     def __init__(self, key_base64=MESHTASTIC_KEY):
         self.key = base64.b64decode(key_base64.encode("ascii"))
+        # No shared cipher context or buffer, so decrypt is safe to call from the MQTT thread and the HTTP feed at once
+        self.cipher_algorithm = algorithms.AES(self.key)
 
     def init_nonce(self, from_node, packet_id):
         # Convert fromNode and packetId to bytes (little-endian format)
@@ -21,13 +36,9 @@ class CryptoEngine:
         self.nonce = nonce_packet_id + nonce_from_node
 
     def decrypt(self, from_node: int, packet_id: int, encrypted_data: bytes) -> bytes:
-        self.init_nonce(from_node, packet_id)
-
-        cipher = Cipher(algorithms.AES(self.key), modes.CTR(self.nonce), backend=default_backend())
-        decryptor = cipher.decryptor()
-
-        decrypted_bytes = decryptor.update(encrypted_data) + decryptor.finalize()
-        return decrypted_bytes
+        nonce = struct.pack("<QQ", packet_id, from_node)
+        decryptor = Cipher(self.cipher_algorithm, modes.CTR(nonce), backend=default_backend()).decryptor()
+        return decryptor.update(encrypted_data) + decryptor.finalize()
 
     def encrypt(self, from_node: int, packet_id: int, plaintext_bytes: bytes) -> bytes:
         self.init_nonce(from_node, packet_id)
@@ -37,3 +48,62 @@ class CryptoEngine:
 
         encrypted_bytes = encryptor.update(plaintext_bytes) + encryptor.finalize()
         return encrypted_bytes
+
+
+class PKICryptoEngine:
+    """Decrypt PKI direct messages sent to our node.
+
+    The sender encrypts with AES-CCM using the SHA-256 of the X25519 shared secret between its key and ours. Key
+    agreement is far more expensive than the AES work, so shared keys are cached per peer public key.
+    """
+
+    def __init__(
+        self,
+        private_key_base64: Optional[str] = BRIDGER_PKI_PRIVATE_KEY,
+        node_id: Optional[str] = BRIDGER_NODE_ID,
+        cache_size: int = PKI_SHARED_KEY_CACHE_SIZE,
+        public_keys: Optional[PublicKeyDirectory] = None,
+    ):
+        self.private_key = None
+        if private_key_base64:
+            self.private_key = X25519PrivateKey.from_private_bytes(base64.b64decode(private_key_base64))
+
+        self.node_id = parse_node_id(node_id) if node_id else None
+        self.public_keys = public_keys if public_keys is not None else PublicKeyDirectory(path=None)
+        self.shared_key = lru_cache(maxsize=cache_size)(self.derive_shared_key)
+
+    @property
+    def enabled(self) -> bool:
+        return self.private_key is not None and self.node_id is not None
+
+    def learn_public_key(self, node_id: int, public_key: bytes) -> None:
+        self.public_keys.update(node_id, public_key)
+
+    def can_decrypt(self, from_node: int, to: int, public_key: Optional[bytes] = None) -> bool:
+        return self.enabled and to == self.node_id and bool(public_key or from_node in self.public_keys)
+
+    def derive_shared_key(self, public_key: bytes) -> bytes:
+        shared_secret = self.private_key.exchange(X25519PublicKey.from_public_bytes(public_key))
+        return hashlib.sha256(shared_secret).digest()
+
+    @staticmethod
+    def nonce(from_node: int, packet_id: int, extra_nonce: bytes) -> bytes:
+        # The firmware writes the packet ID and sender into a 16 byte block, overwrites the packet ID's upper half with
+        # the extra nonce and uses the first 13 bytes as the CCM nonce
+        return struct.pack("<I4sIx", packet_id & 0xFFFFFFFF, extra_nonce, from_node)
+
+    def decrypt(
+        self, from_node: int, packet_id: int, encrypted_data: bytes, public_key: Optional[bytes] = None
+    ) -> Optional[bytes]:
+        """Return the plaintext, or None if we don't know the sender's key or the packet isn't for us."""
+        public_key = public_key or self.public_keys.get(from_node)
+        if not self.enabled or not public_key or len(public_key) != 32 or len(encrypted_data) <= PKI_OVERHEAD:
+            return None
+
+        ciphertext_and_tag, extra_nonce = encrypted_data[:-4], encrypted_data[-4:]
+        cipher = AESCCM(self.shared_key(public_key), tag_length=PKI_TAG_SIZE)
+
+        try:
+            return cipher.decrypt(self.nonce(from_node, packet_id, extra_nonce), ciphertext_and_tag, None)
+        except InvalidTag:
+            return None
@@ -64,6 +64,21 @@ class SensorTelemetryPoint(TelemetryPoint):
     voltage: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
     iaq: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
     channel_utilization: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    distance: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    lux: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    white_lux: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    ir_lux: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    uv_lux: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    wind_direction: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    wind_speed: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    wind_gust: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    wind_lull: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    weight: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    radiation: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rainfall_1h: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rainfall_24h: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    soil_moisture: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    soil_temperature: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
 
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
@@ -78,6 +93,99 @@ class DeviceTelemetryPoint(TelemetryPoint):
     uptime_seconds: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
 
 
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class AirQualityPoint(TelemetryPoint):
+    measurement_name = "air_quality"
+
+    pm10_standard: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm25_standard: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm40_standard: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm100_standard: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm10_environmental: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm25_environmental: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    pm100_environmental: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_03um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_05um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_10um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_25um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_40um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_50um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_100um: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    particles_tps: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    co2: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    co2_temperature: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    co2_humidity: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    form_formaldehyde: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    form_humidity: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    form_temperature: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    pm_temperature: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    pm_humidity: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    pm_voc_idx: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    pm_nox_idx: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class LocalStatsPoint(TelemetryPoint):
+    measurement_name = "local_stats"
+
+    uptime_seconds: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    channel_utilization: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    air_util_tx: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    num_packets_tx: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_packets_rx: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_packets_rx_bad: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_rx_dupe: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_tx_relay: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_tx_relay_canceled: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_tx_dropped: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_online_nodes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    num_total_nodes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    heap_total_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    heap_free_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    noise_floor: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class HealthPoint(TelemetryPoint):
+    measurement_name = "health"
+
+    heart_bpm: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    spO2: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    temperature: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class HostMetricsPoint(TelemetryPoint):
+    measurement_name = "host"
+
+    uptime_seconds: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    freemem_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    diskfree1_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    diskfree2_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    diskfree3_bytes: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    load1: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    load5: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    load15: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class TrafficManagementPoint(TelemetryPoint):
+    measurement_name = "traffic_management"
+
+    packets_inspected: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    position_dedup_drops: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    nodeinfo_cache_hits: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    rate_limit_drops: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    unknown_packet_drops: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    hop_exhausted_packets: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    router_hops_preserved: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
 @dataclass_json(undefined=Undefined.EXCLUDE)
 @dataclass
 class NodeInfoPoint(TelemetryPoint):
@@ -89,6 +197,7 @@ class NodeInfoPoint(TelemetryPoint):
     macaddr: Optional[str] = field(default=None, metadata={"influx_kind": "tag"})
     hw_model: Optional[str] = field(default=None, metadata={"influx_kind": "tag"})
     role: Optional[int] = field(default=None, metadata={"influx_kind": "tag"})
+    heartbeats: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
 
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
@@ -140,10 +249,128 @@ class TextMessagePoint(TelemetryPoint):
 class TraceroutePoint(TelemetryPoint):
     measurement_name = "traceroute"
 
-    route: Optional[int] = None
-    snr_towards: Optional[int] = None
-    route_back: Optional[int] = None
-    snr_back: Optional[int] = None
+    hops_towards: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    hops_back: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class TracerouteHopPoint(TelemetryPoint):
+    measurement_name = "traceroute_hop"
+
+    direction: str = field(metadata={"influx_kind": "tag"})
+    hop: int = field(metadata={"influx_kind": "field"})
+    hop_from: int = field(metadata={"influx_kind": "tag"})
+    hop_to: int = field(metadata={"influx_kind": "tag"})
+    snr: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class RoutingPoint(TelemetryPoint):
+    measurement_name = "routing"
+
+    variant: str = field(metadata={"influx_kind": "tag"})
+    error_reason: Optional[str] = field(default=None, metadata={"influx_kind": "tag"})
+    ack: Optional[bool] = field(default=None, metadata={"influx_kind": "field"})
+    request_id: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class AdminPoint(TelemetryPoint):
+    measurement_name = "admin"
+
+    variant: str = field(metadata={"influx_kind": "tag"})
+    want_response: Optional[bool] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class StoreForwardPoint(TelemetryPoint):
+    measurement_name = "store_forward"
+
+    rr: str = field(metadata={"influx_kind": "tag"})
+    messages_total: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    messages_saved: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    messages_max: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    up_time: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    requests: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    requests_history: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    return_max: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    return_window: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    history_messages: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    window: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    last_request: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    period: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+    secondary: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class RangeTestPoint(TelemetryPoint):
+    measurement_name = "range_test"
+
+    sequence: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class ReceptionSummaryPoint(TelemetryPoint):
+    measurement_name = "reception"
+
+    packet_type: str = field(metadata={"influx_kind": "tag"})
+    gateway_count: int = field(metadata={"influx_kind": "field"})
+    snr_best: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_worst: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_best: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_worst: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    hops_away_min: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class ReceptionPoint(TelemetryPoint):
+    measurement_name = "reception_gateway"
+
+    packet_type: str = field(metadata={"influx_kind": "tag"})
+    hops_away: Optional[int] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class LinkQualityPoint(NodeMixin):
+    measurement_name = "link_quality"
+
+    _from: int = field(metadata=config(field_name="from", metadata={"influx_kind": "tag"}))
+    gateway_id: str = field(metadata={"influx_kind": "tag"})
+    count: int = field(metadata={"influx_kind": "field"})
+    snr_ewma: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_min: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_max: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_p10: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_p50: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    snr_p90: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_ewma: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_min: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_max: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+    rssi_p50: Optional[float] = field(default=None, metadata={"influx_kind": "field"})
+
+
+@dataclass_json(undefined=Undefined.EXCLUDE)
+@dataclass
+class LinkDistancePoint(NodeMixin):
+    measurement_name = "link_distance"
+
+    _from: int = field(metadata=config(field_name="from", metadata={"influx_kind": "tag"}))
+    gateway_id: str = field(metadata={"influx_kind": "tag"})
+    distance_bucket_km: float = field(metadata={"influx_kind": "tag"})
+    count: int = field(metadata={"influx_kind": "field"})
+    distance_km: float = field(metadata={"influx_kind": "field"})
+    snr_mean: float = field(metadata={"influx_kind": "field"})
+    snr_min: float = field(metadata={"influx_kind": "field"})
+    snr_max: float = field(metadata={"influx_kind": "field"})
+    rssi_mean: float = field(metadata={"influx_kind": "field"})
 
 
 @dataclass_json(undefined=Undefined.EXCLUDE)
@@ -0,0 +1,105 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.config import COVERAGE_POSITION_MAX_AGE, LINK_DISTANCE_BUCKET_KM, LINK_DISTANCE_INTERVAL
+from bridger.dataclasses import LinkDistancePoint
+from bridger.linkquality import LinkQualityAggregator
+from bridger.spatial import NodePosition, SpatialIndex, haversine_km
+from bridger.utils import parse_node_id
+
+
+@dataclass
+class DistanceBucket:
+    count: int = 0
+    distance_total: float = 0.0
+    snr_total: float = 0.0
+    snr_min: float = float("inf")
+    snr_max: float = float("-inf")
+    rssi_total: float = 0.0
+
+    def add(self, distance_km: float, snr: float, rssi: float) -> None:
+        self.count += 1
+        self.distance_total += distance_km
+        self.snr_total += snr
+        self.snr_min = min(self.snr_min, snr)
+        self.snr_max = max(self.snr_max, snr)
+        self.rssi_total += rssi
+
+
+class LinkDistanceAggregator:
+    """SNR against distance for every direct reception where both the sender's and the gateway's positions are known.
+
+    Samples are grouped per link into `bucket_km` wide distance buckets and written as `link_distance` points every
+    `interval` seconds. Positions less precise than a bucket or older than `max_position_age` are not used.
+    """
+
+    def __init__(
+        self,
+        positions: SpatialIndex,
+        interval: int = LINK_DISTANCE_INTERVAL,
+        bucket_km: float = LINK_DISTANCE_BUCKET_KM,
+        max_position_age: int = COVERAGE_POSITION_MAX_AGE,
+    ):
+        self.positions = positions
+        self.interval = interval
+        self.bucket_km = bucket_km
+        self.max_position_age = max_position_age
+        self.buckets: dict[tuple[int, str, int], DistanceBucket] = {}
+        self.last_flush = time.monotonic()
+
+    def usable(self, position: Optional[NodePosition], now: float) -> bool:
+        return (
+            position is not None
+            and now - position.updated <= self.max_position_age
+            and position.accuracy_m <= self.bucket_km * 1000
+        )
+
+    def observe(self, service_envelope: ServiceEnvelope, now: Optional[float] = None) -> Optional[float]:
+        """Record a reception, returning its distance in km when one could be worked out."""
+        if not LinkQualityAggregator.is_direct(service_envelope):
+            return None
+
+        try:
+            gateway_node = parse_node_id(service_envelope.gateway_id)
+        except ValueError:
+            return None
+
+        now = now or time.time()
+        packet = service_envelope.packet
+        sender = self.positions.positions.get(getattr(packet, "from"))
+        gateway = self.positions.positions.get(gateway_node)
+        if not self.usable(sender, now) or not self.usable(gateway, now) or sender.node_id == gateway_node:
+            return None
+
+        distance_km = haversine_km(sender.latitude, sender.longitude, gateway.latitude, gateway.longitude)
+        key = (sender.node_id, service_envelope.gateway_id, int(distance_km // self.bucket_km))
+        self.buckets.setdefault(key, DistanceBucket()).add(distance_km, packet.rx_snr, packet.rx_rssi)
+        return distance_km
+
+    def flush(self, now: Optional[float] = None, force: bool = False) -> list[LinkDistancePoint]:
+        now = now or time.monotonic()
+        if not force and now - self.last_flush < self.interval:
+            return []
+
+        points = [
+            LinkDistancePoint(
+                _from=node_id,
+                gateway_id=gateway_id,
+                distance_bucket_km=bucket * self.bucket_km,
+                count=stats.count,
+                distance_km=stats.distance_total / stats.count,
+                snr_mean=stats.snr_total / stats.count,
+                snr_min=stats.snr_min,
+                snr_max=stats.snr_max,
+                rssi_mean=stats.rssi_total / stats.count,
+            )
+            for (node_id, gateway_id, bucket), stats in self.buckets.items()
+        ]
+
+        # Only the current interval is kept so memory stays proportional to the links heard in it
+        self.buckets.clear()
+        self.last_flush = now
+        return points
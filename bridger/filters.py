@@ -0,0 +1,104 @@
+from collections import Counter
+from typing import Iterable, Optional
+
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.config import (
+    FILTER_CHANNELS_ALLOW,
+    FILTER_CHANNELS_DENY,
+    FILTER_GATEWAYS_ALLOW,
+    FILTER_GATEWAYS_DENY,
+    FILTER_PORTNUMS_ALLOW,
+    FILTER_PORTNUMS_DENY,
+    MQTT_TOPIC,
+)
+
+
+def split_setting(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_portnum(value: str) -> int:
+    """Accept either a port number name like `TEXT_MESSAGE_APP` or its number."""
+    if value.isdigit():
+        return int(value)
+    return PortNum.Value(value.upper())
+
+
+def allowed(value, allow: frozenset, deny: frozenset) -> bool:
+    if value in deny:
+        return False
+    return not allow or value in allow
+
+
+class PacketFilter:
+    """Allow and deny lists checked before a packet is parsed or its payload decoded.
+
+    Channels and gateways are read from the MQTT topic (`<prefix>/<channel>/<gateway_id>`) so unwanted packets can be
+    dropped without parsing the envelope. Port numbers are checked once the packet has been decrypted. An empty allow
+    list allows everything and the deny list always wins.
+    """
+
+    def __init__(
+        self,
+        channels_allow: Iterable[str] = (),
+        channels_deny: Iterable[str] = (),
+        gateways_allow: Iterable[str] = (),
+        gateways_deny: Iterable[str] = (),
+        portnums_allow: Iterable[int] = (),
+        portnums_deny: Iterable[int] = (),
+        topic_prefix: str = MQTT_TOPIC.removesuffix("#"),
+    ):
+        self.channels_allow = frozenset(channels_allow)
+        self.channels_deny = frozenset(channels_deny)
+        self.gateways_allow = frozenset(gateway.lower() for gateway in gateways_allow)
+        self.gateways_deny = frozenset(gateway.lower() for gateway in gateways_deny)
+        self.portnums_allow = frozenset(portnums_allow)
+        self.portnums_deny = frozenset(portnums_deny)
+        self.topic_prefix = topic_prefix
+        self.skipped = Counter()
+
+    @classmethod
+    def from_config(cls) -> "PacketFilter":
+        return cls(
+            channels_allow=split_setting(FILTER_CHANNELS_ALLOW),
+            channels_deny=split_setting(FILTER_CHANNELS_DENY),
+            gateways_allow=split_setting(FILTER_GATEWAYS_ALLOW),
+            gateways_deny=split_setting(FILTER_GATEWAYS_DENY),
+            portnums_allow=[parse_portnum(value) for value in split_setting(FILTER_PORTNUMS_ALLOW)],
+            portnums_deny=[parse_portnum(value) for value in split_setting(FILTER_PORTNUMS_DENY)],
+        )
+
+    @property
+    def filters_topic(self) -> bool:
+        return bool(self.channels_allow or self.channels_deny or self.gateways_allow or self.gateways_deny)
+
+    def topic_segments(self, topic: str) -> tuple[Optional[str], Optional[str]]:
+        if not topic.startswith(self.topic_prefix):
+            return None, None
+
+        segments = topic[len(self.topic_prefix) :].split("/")
+        channel = segments[0] if segments[0] else None
+        gateway = segments[1].lower() if len(segments) > 1 and segments[1] else None
+        return channel, gateway
+
+    def allow_topic(self, topic: str) -> bool:
+        if not self.filters_topic:
+            return True
+
+        channel, gateway = self.topic_segments(topic)
+        if channel is not None and not allowed(channel, self.channels_allow, self.channels_deny):
+            self.skipped[f"channel:{channel}"] += 1
+            return False
+        if gateway is not None and not allowed(gateway, self.gateways_allow, self.gateways_deny):
+            self.skipped[f"gateway:{gateway}"] += 1
+            return False
+        return True
+
+    def allow_portnum(self, portnum: int) -> bool:
+        if allowed(portnum, self.portnums_allow, self.portnums_deny):
+            return True
+
+        name = PortNum.Name(portnum) if portnum in PortNum.values() else str(portnum)
+        self.skipped[f"portnum:{name}"] += 1
+        return False
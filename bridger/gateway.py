@@ -1,16 +1,21 @@
+import asyncio
+import hashlib
+import json
 import os
 import re
 import secrets
 import string
+import time
 from dataclasses import dataclass
-from typing import Generator, Union
+from typing import Generator, Optional, Union
 
 from discord import Member, User
 from requests import HTTPError
 
-from bridger.config import MQTT_TOPIC
+from bridger.config import GATEWAY_HEALTH_WINDOW, MQTT_TOPIC
 from bridger.dataclasses import NodeMixin
 from bridger.emqx import EMQXClient
+from bridger.influx.interfaces import InfluxReader
 from bridger.log import logger
 
 EMQX_API_KEY = os.getenv("EMQX_API_KEY")
@@ -152,3 +157,55 @@ class GatewayManagerEMQX:
             raise ValueError("Failed to reset password")
 
         return gateway, password
+
+
+class GatewayHealthMonitor:
+    """Keeps a serialized snapshot of every provisioned gateway joined with its recent packet stats."""
+
+    def __init__(
+        self, gateway_manager: GatewayManagerEMQX, influx_reader: InfluxReader, window: int = GATEWAY_HEALTH_WINDOW
+    ):
+        self.gateway_manager = gateway_manager
+        self.influx_reader = influx_reader
+        self.window = window
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.updated_at: Optional[float] = None
+
+    def build_snapshot(self) -> list[dict]:
+        gateways = self.gateway_manager.list_gateways()
+        stats = self.influx_reader.get_gateway_stats(f"-{self.window}s")
+        snapshot = []
+
+        for gateway in gateways:
+            gateway_stats = stats.get(gateway.node_hex_id_with_bang, {})
+            packets = gateway_stats.get("packets", 0)
+            last_seen = gateway_stats.get("last_seen")
+
+            snapshot.append(
+                {
+                    "gateway_id": gateway.node_hex_id_with_bang,
+                    # Discord IDs are larger than a JavaScript number can hold so they are sent as strings
+                    "owner_id": str(gateway.owner_id),
+                    "last_seen": last_seen.isoformat() if last_seen else None,
+                    "packets": packets,
+                    "packets_per_minute": round(packets * 60 / self.window, 2),
+                }
+            )
+
+        return sorted(snapshot, key=lambda row: row["gateway_id"])
+
+    def refresh(self) -> None:
+        body = json.dumps(self.build_snapshot()).encode("utf-8")
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.body = body
+        self.updated_at = time.time()
+        logger.debug(f"Refreshed gateway health snapshot with etag {self.etag}")
+
+    async def run(self, interval: int) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Failed to refresh gateway health snapshot: {e}")
+            await asyncio.sleep(interval)
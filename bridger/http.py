@@ -1,14 +1,38 @@
+import asyncio
+import json
+import math
 import os
+import time
 
 from aiohttp import ClientSession, web
+from influxdb_client import InfluxDBClient
 
+from bridger.cache import CachedResponse, ResponseCache
+from bridger.config import GATEWAY_HEALTH_REFRESH_INTERVAL, HTTP_CACHE_MAX_AGE, STREAM_KEEPALIVE
+from bridger.coverage import CoverageMap
+from bridger.gateway import GatewayHealthMonitor, GatewayManagerEMQX, emqx
+from bridger.influx.interfaces import InfluxReader
+from bridger.log import logger
 from bridger.meshtastic import DeviceModel
+from bridger.recent import MAX_SERIES_BUCKETS, RecentTelemetryStore, downsample, summarise
+from bridger.spatial import SpatialIndex
+from bridger.stream import LivePacketFeed, PointBroadcaster
+from bridger.topology import TopologyGraph
+from bridger.utils import parse_node_id
 
 VERSION = os.getenv("SENTRY_RELEASE", "development")
 
 routes = web.RouteTableDef()
 device = None
 session = None
+gateway_health = None
+response_cache = None
+broadcaster = None
+topology = None
+recent = None
+positions = None
+coverage = None
+background_tasks = []
 
 
 def create_app():
@@ -20,30 +44,55 @@ def create_app():
 
 
 async def on_startup(app):
-    global device, session
+    global device, session, gateway_health, response_cache, broadcaster, topology, recent, positions, coverage
     session = ClientSession()
+    response_cache = ResponseCache()
+    broadcaster = PointBroadcaster()
+    topology = TopologyGraph()
+    recent = RecentTelemetryStore()
+    positions = SpatialIndex()
+    broadcaster.add_listener(topology.ingest)
+    broadcaster.add_listener(recent.ingest)
+    broadcaster.add_listener(positions.ingest)
+    coverage = CoverageMap(positions)
     device = DeviceModel(session=session)
+    await device.start()
+
+    influx_reader = InfluxReader(InfluxDBClient.from_env_properties())
+    gateway_health = GatewayHealthMonitor(GatewayManagerEMQX(emqx), influx_reader)
+    live_feed = LivePacketFeed(broadcaster)
+    live_feed.add_envelope_listener(coverage.observe)
+    for task in (gateway_health.run(GATEWAY_HEALTH_REFRESH_INTERVAL), live_feed.run()):
+        background_tasks.append(asyncio.create_task(task))
+        background_tasks[-1].add_done_callback(log_task_exit)
+
+
+def log_task_exit(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+
+    if task.exception() is not None:
+        logger.opt(exception=task.exception()).error(f"Background task {task.get_name()} failed")
+    else:
+        logger.error(f"Background task {task.get_name()} stopped")
 
 
 async def on_cleanup(app):
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    coverage.save()
     await session.close()
 
 
-@routes.get("/")
-async def index_view(request):
-    app = request.app
-    # Get list of routes and their methods
-    routes_list = [(route.method, route.resource.canonical) for route in app.router.routes()]
-
-    if "application/json" in request.headers.get("Accept", ""):
-        routes_list = [{"method": method, "path": path} for method, path in routes_list]
-        return web.json_response(routes_list)
+def build_index(routes_list: list[tuple[str, str]], variant: str) -> tuple[bytes, str]:
+    if variant == "json":
+        body = json.dumps([{"method": method, "path": path} for method, path in routes_list])
+        return body.encode("utf-8"), "application/json"
 
-    # return HTML response if not curl
-    if "curl" in request.headers.get("User-Agent", ""):
-        routes_list = [f"{method} {path}" for method, path in routes_list]
-        routes_list = "\n".join(routes_list)
-        return web.Response(text=routes_list, content_type="text/plain")
+    if variant == "text":
+        body = "\n".join(f"{method} {path}" for method, path in routes_list)
+        return body.encode("utf-8"), "text/plain"
 
     html_response = "<h1>Bridger API</h1><ul>"
     for method, path in routes_list:
@@ -51,20 +100,50 @@ async def index_view(request):
     html_response += "</ul>"
     html_response += f"<p>Version: {VERSION}</p>"
 
-    return web.Response(text=html_response, content_type="text/html")
+    return html_response.encode("utf-8"), "text/html"
+
+
+@routes.get("/")
+async def index_view(request):
+    if "application/json" in request.headers.get("Accept", ""):
+        variant = "json"
+    elif "curl" in request.headers.get("User-Agent", ""):
+        # return plain text for curl instead of HTML
+        variant = "text"
+    else:
+        variant = "html"
+
+    def build():
+        # Get list of routes and their methods
+        routes_list = [(route.method, route.resource.canonical) for route in request.app.router.routes()]
+        return build_index(routes_list, variant)
+
+    # Routes never change once the app is running so the version alone identifies the listing
+    # The curl listing is picked by User-Agent, so shared caches have to keep it apart from the HTML one
+    return response_cache.get(("index", variant), VERSION, build).respond(request, HTTP_CACHE_MAX_AGE, vary=("User-Agent",))
 
 
 @routes.get("/model/displaynames/{model_id}")
 async def get_displaynames(request):
     model_id = int(request.match_info["model_id"])
     displaynames = await device.get_displaynames(model_id)
-    return web.json_response(displaynames)
+    cached = response_cache.get(
+        ("displaynames", model_id),
+        device.version,
+        lambda: (json.dumps(displaynames).encode("utf-8"), "application/json"),
+    )
+    return cached.respond(request, HTTP_CACHE_MAX_AGE)
 
 
 @routes.get("/model/displaynames")
 async def get_displaynames_all(request):
     displaynames = await device.get_all_displaynames()
-    return web.json_response(displaynames)
+    cached = response_cache.get(
+        "displaynames",
+        device.version,
+        lambda: (json.dumps(displaynames).encode("utf-8"), "application/json"),
+    )
+    return cached.respond(request, HTTP_CACHE_MAX_AGE)
 
     logo_path = os.path.join(os.path.dirname(__file__), "../logo/logo.png")
     if not os.path.exists(logo_path):
@@ -72,6 +151,183 @@ async def get_displaynames_all(request):
     return web.FileResponse(logo_path)
 
 
+@routes.get("/gateways/health")
+async def get_gateways_health(request):
+    if gateway_health is None or gateway_health.body is None:
+        return web.json_response({"status": "unavailable"}, status=503)
+
+    cached = response_cache.get(
+        "gateways_health",
+        gateway_health.etag,
+        lambda: (gateway_health.body, "application/json"),
+    )
+    return cached.respond(request, GATEWAY_HEALTH_REFRESH_INTERVAL)
+
+
+@routes.get("/topology")
+async def get_topology(request):
+    cached = response_cache.get(
+        "topology",
+        topology.version,
+        lambda: (json.dumps(topology.to_node_graph()).encode("utf-8"), "application/json"),
+    )
+    return cached.respond(request, 0)
+
+
+def query_list(request: web.Request, name: str) -> list[str]:
+    return [value for values in request.query.getall(name, []) for value in values.split(",") if value]
+
+
+@routes.get("/stream")
+async def stream_points(request):
+    try:
+        nodes = [parse_node_id(node) for node in query_list(request, "node")]
+    except ValueError:
+        return web.json_response({"error": "node must be a !hex node ID or a node number"}, status=400)
+
+    gateways = [gateway if gateway.startswith("!") else f"!{gateway}" for gateway in query_list(request, "gateway")]
+    subscription = broadcaster.subscribe(
+        measurements=query_list(request, "measurement"),
+        nodes=nodes,
+        gateways=[gateway.lower() for gateway in gateways],
+    )
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    try:
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), STREAM_KEEPALIVE)
+                await response.write(f"data: {payload}\n\n".encode("utf-8"))
+            except asyncio.TimeoutError:
+                await response.write(b": keepalive\n\n")
+    except ConnectionResetError:
+        logger.debug("Stream client went away")
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+    return response
+
+
+def recent_query(request: web.Request) -> tuple[int, str, list[str], float]:
+    """Parse the node, measurement, fields and window shared by the /recent endpoints, raising ValueError."""
+    node_id = parse_node_id(request.match_info["node_id"])
+    measurement = request.match_info["measurement"]
+    fields = query_list(request, "field") or recent.measurements(node_id).get(measurement, [])
+    seconds = float(request.query.get("since", 3600))
+    if not 0 <= seconds < math.inf:
+        raise ValueError(f"since must be a positive number of seconds, not {seconds}")
+    return node_id, measurement, fields, time.time() - seconds
+
+
+@routes.get("/recent/{node_id}")
+async def get_recent_measurements(request):
+    try:
+        node_id = parse_node_id(request.match_info["node_id"])
+    except ValueError:
+        return web.json_response({"error": "node must be a !hex node ID or a node number"}, status=400)
+
+    return web.json_response(recent.measurements(node_id))
+
+
+@routes.get("/recent/{node_id}/{measurement}")
+async def get_recent_summary(request):
+    try:
+        node_id, measurement, fields, since = recent_query(request)
+        percentiles = [float(value) for value in query_list(request, "percentile")] or [50, 90]
+    except ValueError:
+        return web.json_response({"error": "node, since and percentile must be numbers"}, status=400)
+
+    if not all(0 <= percentile <= 100 for percentile in percentiles):
+        return web.json_response({"error": "percentiles must be between 0 and 100"}, status=400)
+
+    try:
+        summary = {field: summarise(*recent.window(node_id, measurement, field, since), percentiles) for field in fields}
+    except KeyError:
+        return web.json_response({"error": "unknown node, measurement or field"}, status=404)
+
+    return web.json_response(summary)
+
+
+@routes.get("/recent/{node_id}/{measurement}/series")
+async def get_recent_series(request):
+    try:
+        node_id, measurement, fields, since = recent_query(request)
+        step = float(request.query.get("step", 60))
+    except ValueError:
+        return web.json_response({"error": "node, since and step must be numbers"}, status=400)
+
+    if not step > 0 or (time.time() - since) / step > MAX_SERIES_BUCKETS:
+        return web.json_response(
+            {"error": f"step must be positive and split the window into at most {MAX_SERIES_BUCKETS} buckets"}, status=400
+        )
+
+    try:
+        series = {field: downsample(*recent.window(node_id, measurement, field, since), since, step) for field in fields}
+    except KeyError:
+        return web.json_response({"error": "unknown node, measurement or field"}, status=404)
+
+    return web.json_response(series)
+
+
+def valid_position(latitude: float, longitude: float) -> bool:
+    # NaN fails both comparisons and infinity is out of range
+    return -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+
+@routes.get("/positions/bbox")
+async def get_positions_bbox(request):
+    try:
+        min_lat, min_lon, max_lat, max_lon = (
+            float(request.query[name]) for name in ("min_lat", "min_lon", "max_lat", "max_lon")
+        )
+    except (KeyError, ValueError):
+        return web.json_response({"error": "min_lat, min_lon, max_lat and max_lon are required numbers"}, status=400)
+
+    if not valid_position(min_lat, min_lon) or not valid_position(max_lat, max_lon):
+        return web.json_response({"error": "latitudes must be within -90 to 90 and longitudes -180 to 180"}, status=400)
+    if min_lat > max_lat or min_lon > max_lon:
+        return web.json_response({"error": "the minimum corner must be south west of the maximum corner"}, status=400)
+
+    return web.json_response([position.to_dict() for position in positions.bbox(min_lat, min_lon, max_lat, max_lon)])
+
+
+@routes.get("/positions/nearest")
+async def get_positions_nearest(request):
+    try:
+        latitude, longitude = float(request.query["lat"]), float(request.query["lon"])
+        k = int(request.query.get("k", 10))
+        radius_km = float(request.query["radius_km"]) if "radius_km" in request.query else None
+    except (KeyError, ValueError):
+        return web.json_response({"error": "lat and lon are required numbers, k and radius_km are optional"}, status=400)
+
+    if not valid_position(latitude, longitude):
+        return web.json_response({"error": "lat must be within -90 to 90 and lon -180 to 180"}, status=400)
+    if radius_km is not None and not radius_km >= 0:
+        return web.json_response({"error": "radius_km must be a positive number"}, status=400)
+
+    nearest = positions.nearest(latitude, longitude, k=min(k, 1000), radius_km=radius_km)
+    return web.json_response([position.to_dict(distance_km=distance) for distance, position in nearest])
+
+
+@routes.get(r"/coverage/{z:\d+}/{x:\d+}/{y:\d+}.{format:(json|png)}")
+async def get_coverage_tile(request):
+    z, x, y = (int(request.match_info[name]) for name in ("z", "x", "y"))
+    variant = request.match_info["format"]
+
+    try:
+        if variant == "png":
+            body, content_type = coverage.render_png(z, x, y), "image/png"
+        else:
+            body, content_type = json.dumps(coverage.tile(z, x, y)).encode("utf-8"), "application/json"
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    # Map clients can ask for any number of tiles so they are built per request instead of kept in the response cache
+    return CachedResponse.build(body, content_type).respond(request, 0)
+
+
 @routes.get("/health")
 async def health_check(request):
     return web.json_response({"status": "ok", "version": VERSION})
@@ -1,20 +1,42 @@
 from dataclasses import fields
+from datetime import datetime, timezone
 from functools import lru_cache
 from textwrap import dedent
-from typing import Union
+from typing import Optional, Union
 
 from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.rest import ApiException
 
-from bridger.config import INFLUXDB_V2_BUCKET, INFLUXDB_V2_WRITE_PRECISION
-from bridger.dataclasses import TelemetryPoint
+from bridger.config import INFLUX_SCHEMA, INFLUXDB_V2_BUCKET, INFLUXDB_V2_WRITE_PRECISION, ROLLUP_BUCKET
+from bridger.dataclasses import ReceptionPoint, ReceptionSummaryPoint, TelemetryPoint
+from bridger.influx.routing import BUCKETS, BucketRouter
+from bridger.influx.schema import FLUX_COLUMNS, check_schema, is_tag
 from bridger.log import logger
 
+# Node names and hardware are tags in the legacy schema and fields in the compact one, pivoting these fields into columns
+# lets the same queries read both. Comparisons joined with `or` are pushed down to storage, contains() is not.
+NODE_INFO_FIELDS = " or ".join(
+    f'r._field == "{name}"' for name in ("packet_id", "long_name", "short_name", "macaddr", "hw_model", "role")
+)
+
+# One row per stored packet, reception rows carry the packet_id of the packet they describe and would count it again
+PACKET_ROWS = (
+    f'r._field == "packet_id" and r._measurement != "{ReceptionSummaryPoint.measurement_name}"'
+    f' and r._measurement != "{ReceptionPoint.measurement_name}"'
+)
+
 
 class InfluxReader:
-    def __init__(self, influx_client: InfluxDBClient):
+    def __init__(self, influx_client: InfluxDBClient, router: Optional[BucketRouter] = None):
         self.query_api = influx_client.query_api()
+        self.router = router or BUCKETS
+
+    def source(self, range: str, measurement: Optional[str] = None) -> str:
+        """Flux reading the range from the bucket a measurement is written to, or from every bucket without one."""
+        buckets = [self.router.bucket(measurement)] if measurement else self.router.buckets
+        streams = [f'from(bucket: "{bucket}") |> range(start: {range})' for bucket in buckets]
+        return streams[0] if len(streams) == 1 else f"union(tables: [{', '.join(streams)}])"
 
     def query_data(self, query: str):
         try:
@@ -36,9 +58,9 @@ class InfluxReader:
               return if strings.strlen(v: hexString) == 7 then "0" + hexString else hexString
             }}
 
-            from(bucket: "{INFLUXDB_V2_BUCKET}")
-              |> range(start: {range})
-              |> filter(fn: (r) => r._measurement == "node" and r._from == "{node_id}" and r._field == "packet_id")
+            {self.source(range, "node")}
+              |> filter(fn: (r) => r._measurement == "node" and r._from == "{node_id}")
+              |> filter(fn: (r) => {NODE_INFO_FIELDS})
               |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
               |> group(columns: ["_from"])
               |> last(column: "_from")
@@ -59,10 +81,10 @@ class InfluxReader:
               return if strings.strlen(v: hexString) == 7 then "0" + hexString else hexString
             }}
 
-            from(bucket: "{INFLUXDB_V2_BUCKET}")
-              |> range(start: {range})
-              |> filter(fn: (r) => r._field == "packet_id")
+            {self.source(range, "node")}
               |> filter(fn: (r) => r._measurement == "node")
+              |> filter(fn: (r) => {NODE_INFO_FIELDS})
+              |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
               |> group(columns: ["_from"])
               |> unique(column: "_from")
               |> map(fn: (r) => ({{ _value: hexify(str: r._from),
@@ -101,10 +123,9 @@ class InfluxReader:
     def get_recent_packets(self, gateway_id: str, range: str = "-1h"):
         """Get recent packets for a gateway within the specified time range."""
         query = dedent(f"""
-            from(bucket: "{INFLUXDB_V2_BUCKET}")
-              |> range(start: {range})
+            {self.source(range)}
               |> filter(fn: (r) => r["gateway_id"] == "{gateway_id}")
-              |> filter(fn: (r) => r["_field"] == "packet_id")
+              |> filter(fn: (r) => {PACKET_ROWS})
               |> keep(columns: ["_from", "_time", "_measurement"])
               |> group()
               |> sort(columns: ["_time"])
@@ -112,6 +133,101 @@ class InfluxReader:
 
         return self.query_data(query)
 
+    def get_gateway_stats(self, range: str = "-1h") -> dict[str, dict]:
+        """Get packet count and last seen time for every gateway in a single query."""
+        query = dedent(f"""
+            {self.source(range)}
+              |> filter(fn: (r) => {PACKET_ROWS})
+              |> keep(columns: ["_time", "gateway_id"])
+              |> group(columns: ["gateway_id"])
+              |> reduce(
+                  identity: {{packets: 0, last_seen: time(v: 0)}},
+                  fn: (r, accumulator) => ({{
+                    packets: accumulator.packets + 1,
+                    last_seen: if r._time > accumulator.last_seen then r._time else accumulator.last_seen,
+                  }}),
+                )
+        """)
+
+        tables = self.query_data(query)
+        if not tables:
+            return {}
+
+        stats = {}
+        for table in tables:
+            for record in table.records:
+                gateway_id = record.values.get("gateway_id")
+                if gateway_id:
+                    stats[gateway_id] = {
+                        "packets": record.values.get("packets", 0),
+                        "last_seen": record.values.get("last_seen"),
+                    }
+        return stats
+
+    def get_measurements(self, range: str = "-1d", bucket: str = INFLUXDB_V2_BUCKET) -> list[str]:
+        query = dedent(f"""
+            import "influxdata/influxdb/schema"
+
+            schema.measurements(bucket: "{bucket}", start: {range})
+        """)
+
+        return [record.get_value() for table in self.query_data(query) or [] for record in table.records]
+
+    def get_series_cardinality(self, measurement: str, range: str = "-1d", bucket: str = INFLUXDB_V2_BUCKET) -> int:
+        """Number of series written to a measurement within the range."""
+        query = dedent(f"""
+            import "influxdata/influxdb"
+
+            influxdb.cardinality(bucket: "{bucket}", start: {range}, predicate: (r) => r._measurement == "{measurement}")
+        """)
+
+        record = self._extract_first_record(self.query_data(query))
+        return record.get_value() if record else 0
+
+    def get_tag_cardinality(self, measurement: str, range: str = "-1d", bucket: str = INFLUXDB_V2_BUCKET) -> dict[str, int]:
+        """Number of distinct values of every tag of a measurement within the range."""
+        query = dedent(f"""
+            import "influxdata/influxdb/schema"
+
+            schema.tagKeys(bucket: "{bucket}", start: {range}, predicate: (r) => r._measurement == "{measurement}")
+        """)
+
+        tag_keys = [
+            record.get_value()
+            for table in self.query_data(query) or []
+            for record in table.records
+            if record.get_value() not in FLUX_COLUMNS
+        ]
+
+        counts = {}
+        for tag_key in tag_keys:
+            query = dedent(f"""
+                import "influxdata/influxdb/schema"
+
+                schema.tagValues(
+                  bucket: "{bucket}",
+                  tag: "{tag_key}",
+                  start: {range},
+                  predicate: (r) => r._measurement == "{measurement}",
+                )
+                  |> count()
+            """)
+
+            record = self._extract_first_record(self.query_data(query))
+            counts[tag_key] = record.get_value() if record else 0
+        return counts
+
+    def get_rows(self, measurement: str, start: str, stop: str, bucket: str = INFLUXDB_V2_BUCKET):
+        """Every point of a measurement between two RFC3339 times with its fields pivoted into columns."""
+        query = dedent(f"""
+            from(bucket: "{bucket}")
+              |> range(start: {start}, stop: {stop})
+              |> filter(fn: (r) => r._measurement == "{measurement}")
+              |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        """)
+
+        return self.query_data(query)
+
     @staticmethod
     def _extract_first_record(table_list):
         if not table_list:
@@ -128,8 +244,10 @@ class InfluxReader:
 
 
 class InfluxWriter:
-    def __init__(self, influx_client: InfluxDBClient):
+    def __init__(self, influx_client: InfluxDBClient, router: Optional[BucketRouter] = None):
+        check_schema(INFLUX_SCHEMA)
         self.write_api = influx_client.write_api(write_options=SYNCHRONOUS)
+        self.router = router or BUCKETS
 
     def write_data(self, record, measurement, fields, tags):
         try:
@@ -141,7 +259,7 @@ class InfluxWriter:
             }
 
             self.write_api.write(
-                bucket=INFLUXDB_V2_BUCKET,
+                bucket=self.router.bucket(measurement),
                 record=record,
                 record_measurement_name=measurement,
                 record_field_keys=fields,
@@ -174,16 +292,69 @@ class InfluxWriter:
         if measurement:
             self.write_data(telemetry_data, measurement, field_keys, tag_keys)
 
+    def write_points(self, points: list[TelemetryPoint]):
+        """Write points of any measurement in a single request per bucket."""
+        self.write_records([self.to_record(point) for point in points])
+
+    def write_timed_points(self, timed_points: list[tuple[TelemetryPoint, float]]):
+        """Write `(point, time)` pairs stamped with their Unix time instead of the time the server receives them."""
+        self.write_records([self.to_record(point, time) for point, time in timed_points])
+
+    def write_records(self, records: list[dict]):
+        records = [record for record in records if record["fields"]]
+        if not records:
+            return
+
+        by_bucket: dict[str, list[dict]] = {}
+        for record in records:
+            by_bucket.setdefault(self.router.bucket(record["measurement"]), []).append(record)
+
+        for bucket, bucket_records in by_bucket.items():
+            try:
+                self.write_api.write(bucket=bucket, record=bucket_records, write_precision=INFLUXDB_V2_WRITE_PRECISION)
+                logger.bind(points=len(bucket_records)).debug(f"Wrote a batch of {len(bucket_records)} points to {bucket}")
+            except ApiException as e:
+                if e.status == 401:
+                    logger.error(f"Credentials for InfluxDB are either not set or incorrect: {e}")
+                else:
+                    logger.error(f"Error writing batch to InfluxDB: {e}")
+
+    def write_rollups(self, records: list[dict]):
+        """Write rollup records to the rollup bucket, they carry their window start as a time in seconds."""
+        if not records:
+            return
+
+        try:
+            self.write_api.write(bucket=ROLLUP_BUCKET, record=records, write_precision="s")
+            logger.bind(points=len(records)).debug(f"Wrote {len(records)} rollups to {ROLLUP_BUCKET}")
+        except ApiException as e:
+            if e.status == 401:
+                logger.error(f"Credentials for InfluxDB are either not set or incorrect: {e}")
+            else:
+                logger.error(f"Error writing rollups to InfluxDB: {e}")
+
+    @classmethod
+    def to_record(cls, point: TelemetryPoint, time: Optional[float] = None) -> dict:
+        tag_keys, field_keys = cls.extract_keys(type(point))
+        record = {
+            "measurement": point.measurement_name,
+            "tags": {key: getattr(point, key) for key in tag_keys if getattr(point, key) is not None},
+            "fields": {key: getattr(point, key) for key in field_keys if getattr(point, key) is not None},
+        }
+        if time is not None:
+            record["time"] = datetime.fromtimestamp(time, timezone.utc)
+        return record
+
     @staticmethod
     @lru_cache(maxsize=64)
-    def extract_keys(cls):
+    def extract_keys(cls, schema: str = INFLUX_SCHEMA):
         tag_keys = []
         field_keys = []
         for f in fields(cls):
             kind = f.metadata.get("influx_kind")
-            if kind == "tag":
+            if is_tag(f.name, kind, schema):
                 tag_keys.append(f.name)
-            elif kind == "field":
+            elif kind in ("tag", "field"):
                 field_keys.append(f.name)
         return tag_keys, field_keys
 
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from bridger.config import INFLUX_BUCKET_ROUTES, INFLUX_HOT_BUCKET, INFLUX_HOT_MEASUREMENTS, INFLUXDB_V2_BUCKET
+from bridger.filters import split_setting
+
+
+class BucketRouter:
+    """Which bucket each measurement is written to and read from.
+
+    Measurements listed in `hot_measurements` go to `hot_bucket` when one is set, so high rate telemetry can be kept
+    for a shorter time than nodeinfo and the other rarely written measurements. `routes` are `measurement=bucket` pairs
+    that take precedence over both. Everything else goes to `default`.
+    """
+
+    def __init__(
+        self,
+        default: str = INFLUXDB_V2_BUCKET,
+        hot_bucket: str = INFLUX_HOT_BUCKET,
+        hot_measurements: str = INFLUX_HOT_MEASUREMENTS,
+        routes: str = INFLUX_BUCKET_ROUTES,
+    ):
+        self.default = default
+        self.routes: dict[str, str] = {}
+        if hot_bucket:
+            self.routes.update((measurement, hot_bucket) for measurement in split_setting(hot_measurements))
+
+        for route in split_setting(routes):
+            measurement, _, bucket = route.partition("=")
+            if not measurement.strip() or not bucket.strip():
+                raise ValueError(f"Invalid bucket route {route!r}, expected measurement=bucket")
+            self.routes[measurement.strip()] = bucket.strip()
+
+    def bucket(self, measurement: Optional[str]) -> str:
+        return self.routes.get(measurement, self.default)
+
+    @property
+    def buckets(self) -> list[str]:
+        """Every bucket points can be written to, the default first."""
+        return list(dict.fromkeys([self.default, *self.routes.values()]))
+
+
+BUCKETS = BucketRouter()
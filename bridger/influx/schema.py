@@ -0,0 +1,101 @@
+import re
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional, Union
+
+from bridger.dataclasses import TelemetryPoint
+
+SCHEMAS = ("legacy", "compact")
+# Attributes that change over a node's life or from packet to packet, each new value of a tag starts a new series
+COMPACT_FIELDS = frozenset({"to", "channel_id", "long_name", "short_name", "macaddr", "hw_model", "role"})
+# Columns Flux adds to every row that aren't part of the stored point
+FLUX_COLUMNS = frozenset({"result", "table", "_start", "_stop", "_time", "_measurement", "_field", "_value"})
+DURATION_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def check_schema(schema: str) -> None:
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown InfluxDB schema {schema!r}, expected one of: {', '.join(SCHEMAS)}")
+
+
+def is_tag(name: str, kind: Optional[str], schema: str) -> bool:
+    check_schema(schema)
+    return kind == "tag" and not (schema == "compact" and name in COMPACT_FIELDS)
+
+
+def point_classes() -> dict[str, type]:
+    """Measurement name -> point class for every telemetry point written to the main bucket."""
+    classes = {}
+    pending = list(TelemetryPoint.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if getattr(cls, "measurement_name", None):
+            classes[cls.measurement_name] = cls
+    return classes
+
+
+def parse_duration(value: str) -> timedelta:
+    """A duration like `30d` or `6h`."""
+    match = re.fullmatch(r"(\d+)([smhdw])", value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration {value!r}, expected a number followed by one of: {', '.join(DURATION_UNITS)}")
+    return timedelta(**{DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def time_chunks(start: datetime, stop: datetime, chunk: timedelta) -> Iterator[tuple[datetime, datetime]]:
+    while start < stop:
+        end = min(start + chunk, stop)
+        yield start, end
+        start = end
+
+
+def flux_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def cast_value(point_cls: Optional[type], name: str, value: str) -> Union[str, int, float]:
+    """Tags are always strings, turn one back into the type its point class gives it before it is written as a field."""
+    if point_cls is None:
+        return value
+
+    for f in fields(point_cls):
+        if f.name == name:
+            types = getattr(f.type, "__args__", (f.type,))
+            try:
+                if int in types:
+                    return int(value)
+                if float in types:
+                    return float(value)
+            except ValueError:
+                pass
+            break
+    return value
+
+
+def migration_records(tables, schema: str) -> list[dict]:
+    """Rewrite rows read with their fields pivoted into columns as records for `schema`.
+
+    The tags of each row are the table's group key, anything else that isn't a Flux column is a field.
+    """
+    classes = point_classes()
+    records = []
+    for table in tables:
+        tag_keys = {column.label for column in table.columns if column.group} - FLUX_COLUMNS
+        for row in table.records:
+            measurement = row.get_measurement()
+            point_cls = classes.get(measurement)
+            tags, values = {}, {}
+            for key, value in row.values.items():
+                if key in FLUX_COLUMNS or value is None:
+                    continue
+                if key not in tag_keys:
+                    values[key] = value
+                elif is_tag(key, "tag", schema):
+                    tags[key] = value
+                else:
+                    values[key] = cast_value(point_cls, key, value)
+
+            if values:
+                records.append({"measurement": measurement, "tags": tags, "fields": values, "time": row.get_time()})
+    return records
@@ -0,0 +1,104 @@
+import base64
+import json
+import os
+import time
+from typing import Optional
+
+from bridger.config import PUBLIC_KEY_DIRECTORY_PATH, PUBLIC_KEY_SAVE_INTERVAL
+from bridger.log import logger
+from bridger.utils import atomic_write_json
+
+PUBLIC_KEY_SIZE = 32
+
+
+class PublicKeyDirectory:
+    """Node public keys learned from NODEINFO packets, served from memory and persisted to disk.
+
+    Writes are batched so a burst of new nodes after a restart doesn't rewrite the file for every key. Other processes
+    sharing the data volume can call `reload_if_changed` to pick up keys the ingest process has learned.
+    """
+
+    def __init__(self, path: Optional[str] = PUBLIC_KEY_DIRECTORY_PATH, save_interval: int = PUBLIC_KEY_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self.keys: dict[int, bytes] = {}
+        self.changed: set[int] = set()
+        self.dirty = False
+        self.last_save = time.monotonic()
+        self.loaded_mtime: Optional[float] = None
+
+        self.load()
+
+    def __contains__(self, node_id: int) -> bool:
+        return node_id in self.keys
+
+    def __getitem__(self, node_id: int) -> bytes:
+        return self.keys[node_id]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, node_id: int) -> Optional[bytes]:
+        return self.keys.get(node_id)
+
+    def update(self, node_id: int, public_key: bytes) -> bool:
+        """Store a node's key, returning whether anything changed."""
+        if len(public_key) != PUBLIC_KEY_SIZE or self.keys.get(node_id) == public_key:
+            return False
+
+        self.keys[node_id] = public_key
+        self.changed.add(node_id)
+        self.dirty = True
+
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.save()
+        return True
+
+    def load(self) -> bool:
+        if self.path is None:
+            return False
+
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            keys = {int(node_id[1:], 16): base64.b64decode(key) for node_id, key in snapshot.items()}
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Unable to load public keys from {self.path}: {e}")
+            return False
+
+        # Keys learned since the last save are newer than the ones on disk
+        self.keys = self.keys | keys | {node_id: self.keys[node_id] for node_id in self.changed}
+        self.loaded_mtime = mtime
+        return True
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None:
+            return False
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+
+        return mtime != self.loaded_mtime and self.load()
+
+    def save(self) -> None:
+        self.last_save = time.monotonic()
+        if self.path is None or not self.dirty:
+            return
+
+        # The ingest process and the HTTP live feed both learn keys, pick up what the other saved so it isn't dropped
+        self.load()
+        snapshot = {f"!{node_id:08x}": base64.b64encode(key).decode("ascii") for node_id, key in self.keys.items()}
+        try:
+            atomic_write_json(self.path, snapshot)
+        except OSError as e:
+            logger.warning(f"Unable to persist public keys to {self.path}: {e}")
+            return
+
+        self.changed.clear()
+        self.dirty = False
+        self.loaded_mtime = os.path.getmtime(self.path)
@@ -0,0 +1,158 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.config import LINK_QUALITY_ALPHA, LINK_QUALITY_INTERVAL, LINK_QUALITY_MAX_LINKS
+from bridger.dataclasses import LinkQualityPoint
+
+
+class Histogram:
+    """Fixed width bins between `low` and `high` used to estimate quantiles in constant memory.
+
+    Values outside the range are counted in the first or last bin.
+    """
+
+    def __init__(self, low: float, high: float, width: float):
+        self.low = low
+        self.width = width
+        self.bins = [0] * int((high - low) / width)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        index = min(max(int((value - self.low) // self.width), 0), len(self.bins) - 1)
+        self.bins[index] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= target and count:
+                # Report the middle of the bin the quantile falls in
+                return self.low + (index + 0.5) * self.width
+
+        return self.low + (len(self.bins) - 0.5) * self.width
+
+    def clear(self) -> None:
+        self.bins = [0] * len(self.bins)
+        self.count = 0
+
+
+class LinkStats:
+    """Signal statistics for one transmitter to gateway link.
+
+    The EWMAs carry over between flushes, everything else covers the current interval only.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.snr_ewma: Optional[float] = None
+        self.rssi_ewma: Optional[float] = None
+        self.snr = Histogram(-25, 15, 0.5)
+        self.rssi = Histogram(-140, -20, 2)
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.snr_min = self.snr_max = None
+        self.rssi_min = self.rssi_max = None
+        self.snr.clear()
+        self.rssi.clear()
+
+    def ewma(self, current: Optional[float], value: float) -> float:
+        return value if current is None else current + self.alpha * (value - current)
+
+    def observe(self, snr: float, rssi: float) -> None:
+        self.count += 1
+        self.snr_ewma = self.ewma(self.snr_ewma, snr)
+        self.rssi_ewma = self.ewma(self.rssi_ewma, rssi)
+        self.snr_min = snr if self.snr_min is None else min(self.snr_min, snr)
+        self.snr_max = snr if self.snr_max is None else max(self.snr_max, snr)
+        self.rssi_min = rssi if self.rssi_min is None else min(self.rssi_min, rssi)
+        self.rssi_max = rssi if self.rssi_max is None else max(self.rssi_max, rssi)
+        self.snr.add(snr)
+        self.rssi.add(rssi)
+
+
+class LinkQualityAggregator:
+    """Streaming per-link signal statistics from packets gateways hear directly.
+
+    A packet with `hop_start == hop_limit` hasn't been relayed, so its SNR and RSSI describe the RF link between the
+    sender and the gateway that uplinked it. Statistics are kept for at most `max_links` links, dropping the least
+    recently heard, and written as `link_quality` points every `interval` seconds.
+    """
+
+    def __init__(
+        self,
+        interval: int = LINK_QUALITY_INTERVAL,
+        alpha: float = LINK_QUALITY_ALPHA,
+        max_links: int = LINK_QUALITY_MAX_LINKS,
+    ):
+        self.interval = interval
+        self.alpha = alpha
+        self.max_links = max_links
+        self.links: OrderedDict[tuple[int, str], LinkStats] = OrderedDict()
+        self.last_flush = time.monotonic()
+
+    @staticmethod
+    def is_direct(service_envelope: ServiceEnvelope) -> bool:
+        packet = service_envelope.packet
+        # A node uplinking its own packet reports no RSSI since it never heard it over the air
+        return packet.hop_start > 0 and packet.hop_start == packet.hop_limit and packet.rx_rssi != 0
+
+    def observe(self, service_envelope: ServiceEnvelope) -> bool:
+        if not self.is_direct(service_envelope):
+            return False
+
+        packet = service_envelope.packet
+        key = (getattr(packet, "from"), service_envelope.gateway_id)
+        stats = self.links.get(key)
+
+        if stats is None:
+            stats = self.links[key] = LinkStats(self.alpha)
+            if len(self.links) > self.max_links:
+                self.links.popitem(last=False)
+        else:
+            self.links.move_to_end(key)
+
+        stats.observe(packet.rx_snr, packet.rx_rssi)
+        return True
+
+    def flush(self, now: Optional[float] = None, force: bool = False) -> list[LinkQualityPoint]:
+        """Return a point for every link heard since the last flush once `interval` has passed."""
+        now = now or time.monotonic()
+        if not force and now - self.last_flush < self.interval:
+            return []
+
+        points = []
+        for (node_id, gateway_id), stats in self.links.items():
+            if not stats.count:
+                continue
+
+            points.append(
+                LinkQualityPoint(
+                    _from=node_id,
+                    gateway_id=gateway_id,
+                    count=stats.count,
+                    snr_ewma=stats.snr_ewma,
+                    snr_min=stats.snr_min,
+                    snr_max=stats.snr_max,
+                    snr_p10=stats.snr.quantile(0.1),
+                    snr_p50=stats.snr.quantile(0.5),
+                    snr_p90=stats.snr.quantile(0.9),
+                    rssi_ewma=stats.rssi_ewma,
+                    rssi_min=stats.rssi_min,
+                    rssi_max=stats.rssi_max,
+                    rssi_p50=stats.rssi.quantile(0.5),
+                )
+            )
+            stats.reset()
+
+        self.last_flush = now
+        return points
@@ -1,19 +1,40 @@
 import base64
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional, Union
 
 from google.protobuf.json_format import MessageToDict
 from google.protobuf.message import DecodeError, Message
 from meshtastic import KnownProtocol, protocols
-from meshtastic.protobuf.mesh_pb2 import Data
 from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
 from meshtastic.protobuf.portnums_pb2 import PortNum
 
 import bridger.mesh.handlers  # noqa: F401 # We need to import handlers to register them in the HANDLER_MAP
-from bridger.crypto import CryptoEngine
+from bridger.crypto import CryptoEngine, PKICryptoEngine
 from bridger.dataclasses import TelemetryPoint
+from bridger.keys import PublicKeyDirectory
 from bridger.log import logger
-from bridger.mesh.handler_registry import HANDLER_MAP
+from bridger.mesh.handler_registry import UNHANDLED, compile_dispatch, handlers_for
+
+compile_dispatch()
+crypto_engine = CryptoEngine()
+pki_engine = PKICryptoEngine(public_keys=PublicKeyDirectory())
+
+
+class ProcessStatus(Enum):
+    DECODED = "decoded"
+    EMPTY = "empty"
+    FILTERED = "filtered"
+    UNSUPPORTED = "unsupported"
+    PKI = "pki"
+    FAILED = "failed"
+
+
+@dataclass
+class ProcessResult:
+    status: ProcessStatus
+    data: Union[TelemetryPoint, list[TelemetryPoint], None] = None
 
 
 class PacketProcessorError(Exception):
@@ -42,27 +63,28 @@ class PBPacketProcessor(PacketProcessor):
     def __init__(
         self,
         service_envelope: ServiceEnvelope,
-        force_decode=False,
         auto_decrypt=True,
         **kwargs,
     ):
         super().__init__(service_envelope, **kwargs)
 
-        self.force_decode = force_decode
-        self.crypto_engine = CryptoEngine()
+        self.crypto_engine = crypto_engine
+        self.pki_engine = pki_engine
 
         if auto_decrypt and self.encrypted:
             self.decrypt()
 
     @property
     def payload_dict(self):
-        if isinstance(self.payload, str):
-            return {"text": self.payload}
-        elif isinstance(self.payload, bytes):
-            return {"data": base64.b64encode(self.payload).decode("ascii")}
+        # Every access to payload parses the packet again
+        payload = self.payload
+        if isinstance(payload, str):
+            return {"text": payload}
+        elif isinstance(payload, bytes):
+            return {"data": base64.b64encode(payload).decode("ascii")}
         else:
             return MessageToDict(
-                self.payload,
+                payload,
                 preserving_proto_field_name=True,
                 use_integers_for_enums=True,
             )
@@ -81,7 +103,7 @@ class PBPacketProcessor(PacketProcessor):
 
     @property
     def payload(self) -> Union[Message, str, bytes]:
-        if self.portnum in HANDLER_MAP:
+        if handlers_for(self.portnum):
             payload = self.service_envelope.packet.decoded.payload
 
             if self.portnum_protocol.protobufFactory:
@@ -93,7 +115,7 @@ class PBPacketProcessor(PacketProcessor):
                     return payload
         elif self.service_envelope.channel_id == "PKI":
             raise PacketProcessorError(
-                f"We cannot decrypt PKI messages: {self.service_envelope.packet}",
+                "We cannot decrypt PKI messages",
                 portnum=self.portnum,
             )
         else:
@@ -108,7 +130,37 @@ class PBPacketProcessor(PacketProcessor):
 
     @property
     def data(self) -> Union[TelemetryPoint, list[TelemetryPoint], None]:
+        return self.process().data
+
+    def process(self, allow_portnum: Optional[Callable[[int], bool]] = None) -> ProcessResult:
+        """Decrypt, decode and handle the packet, reporting what happened instead of raising.
+
+        `allow_portnum` is checked after decryption and before the payload is decoded.
+        """
+        if self.is_pki and not self.can_decrypt_pki:
+            return ProcessResult(ProcessStatus.PKI)
+
+        if self.encrypted and not self._decrypt():
+            return ProcessResult(ProcessStatus.FAILED)
+
+        if allow_portnum is not None and not allow_portnum(self.portnum):
+            return ProcessResult(ProcessStatus.FILTERED)
+
+        handlers = handlers_for(self.portnum)
+        if not handlers:
+            # Nothing would use the payload so skip decoding it altogether
+            UNHANDLED[self.portnum] += 1
+            return ProcessResult(ProcessStatus.UNSUPPORTED)
+
+        try:
+            payload_dict = self.payload_dict if any(handle.needs_payload_dict for handle in handlers) else {}
+        except (DecodeError, UnicodeDecodeError):
+            return ProcessResult(ProcessStatus.FAILED)
+
         packet = self.service_envelope.packet
+        if self.portnum == PortNum.NODEINFO_APP and payload_dict.get("public_key"):
+            self.pki_engine.learn_public_key(getattr(packet, "from"), base64.b64decode(payload_dict["public_key"]))
+
         point_data = {
             "_from": getattr(packet, "from"),
             "to": packet.to,
@@ -122,50 +174,69 @@ class PBPacketProcessor(PacketProcessor):
             "gateway_id": self.service_envelope.gateway_id,
         }
 
-        point_data.update(self.payload_dict)
-        logger.bind(**point_data).debug(f"Decoded packet: {point_data}")
+        point_data.update(payload_dict)
+
+        # Admin messages can carry keys and passwords so their payload is never logged
+        if self.portnum != PortNum.ADMIN_APP:
+            logger.bind(**point_data).debug("Decoded packet")
 
         try:
-            for handler_cls in HANDLER_MAP.get(self.portnum, []):
-                handler = handler_cls(
-                    packet, self.payload_dict, point_data, strip_text=self.strip_text, force_decode=self.force_decode
-                )
-                result = handler.handle()
+            for handle in handlers:
+                result = handle(packet, payload_dict, point_data, strip_text=self.strip_text)
 
                 if result:
-                    return result
+                    return ProcessResult(ProcessStatus.DECODED, result)
 
-            logger.bind(portnum=self.portnum).warning(f"No matching handler for port number: {self.portnum}")
-            logger.debug(f"Payload: {self.payload_dict}")
-            return None
+            return ProcessResult(ProcessStatus.EMPTY)
 
+        except DecodeError:
+            # Handlers that parse the payload themselves find out it is broken here
+            return ProcessResult(ProcessStatus.FAILED)
         except (AttributeError, KeyError, TypeError) as e:
             logger.exception(f"{type(e).__name__}: {e}")
-            return None
+            return ProcessResult(ProcessStatus.FAILED)
+
+    @property
+    def is_pki(self) -> bool:
+        return self.service_envelope.channel_id == "PKI"
+
+    @property
+    def can_decrypt_pki(self) -> bool:
+        packet = self.service_envelope.packet
+        return self.pki_engine.can_decrypt(getattr(packet, "from"), packet.to, packet.public_key)
+
+    def _decrypt(self) -> bool:
+        packet = self.service_envelope.packet
+        encrypted_data = packet.encrypted
+
+        if self.is_pki:
+            decrypted_data = self.pki_engine.decrypt(getattr(packet, "from"), packet.id, encrypted_data, packet.public_key)
+            if decrypted_data is None:
+                logger.bind(envelope_id=packet.id).debug("PKI packet did not decrypt with our key")
+                return False
+        else:
+            decrypted_data = self.crypto_engine.decrypt(getattr(packet, "from"), packet.id, encrypted_data)
+
+        try:
+            # Parsing straight into the envelope replaces the encrypted payload without an intermediate Data message
+            packet.decoded.ParseFromString(memoryview(decrypted_data))
+        except DecodeError:
+            # A failed parse may have left a partial message behind so put the ciphertext back
+            packet.encrypted = encrypted_data
+            logger.bind(envelope_id=packet.id).debug("Packet did not decrypt with the channel key")
+            return False
+
+        return True
 
     def decrypt(self) -> bool:
         if not self.encrypted:
             return False
 
-        if self.service_envelope.channel_id == "PKI":
-            logger.debug("This is a PKI packet so we cannot decrypt it")
+        if self.is_pki and not self.can_decrypt_pki:
+            logger.debug("This is a PKI packet we don't have the keys for so we cannot decrypt it")
             return False
 
-        encrypted_data = self.service_envelope.packet.encrypted
-        decrypted_data = self.crypto_engine.decrypt(
-            getattr(self.service_envelope.packet, "from"),
-            self.service_envelope.packet.id,
-            encrypted_data,
-        )
-
-        logger.debug(f"Decrypted data: {decrypted_data}")
-
-        try:
-            data = Data()
-            data.ParseFromString(decrypted_data)
-            self.service_envelope.packet.decoded.CopyFrom(data)
-        except DecodeError as e:
-            logger.exception(f"Error decrypting message: {e}")
-            raise PacketProcessorError(f"Error decrypting message: {e}")
+        if not self._decrypt():
+            raise PacketProcessorError("Error decrypting message", portnum=self.portnum)
 
         return True
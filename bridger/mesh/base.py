@@ -3,13 +3,15 @@ from typing import Union
 
 
 class PacketHandler(ABC):
-    def __init__(self, packet, payload_dict, base_data, strip_text: bool = True, force_decode: bool = False):
-        self.packet = packet
-        self.payload_dict = payload_dict
-        self.base_data = base_data
-        self.strip_text = strip_text
-        self.force_decode = force_decode
+    """Base class for port number handlers.
+
+    Handlers are stateless and created once when the dispatch table is compiled, so everything a packet needs is passed
+    to `handle`. Handlers that read the payload from `packet` themselves can set `needs_payload_dict` to False so the
+    payload isn't converted to a dict for them.
+    """
+
+    needs_payload_dict = True
 
     @abstractmethod
-    def handle(self) -> Union[None, dict]:
+    def handle(self, packet, payload_dict: dict, base_data: dict, strip_text: bool = True) -> Union[None, dict]:
         pass
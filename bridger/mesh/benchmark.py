@@ -0,0 +1,96 @@
+"""Measure time and allocations of the packet decode path over captured traffic.
+
+The capture file has one base64 encoded ServiceEnvelope per line, each line is what the `bridger.mesh` CLI takes as
+its argument. Lines starting with `#` are skipped.
+
+    python -m bridger.mesh.benchmark capture.txt
+"""
+
+import base64
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from collections import Counter
+from typing import Optional
+
+from google.protobuf.message import DecodeError
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.crypto import PKICryptoEngine
+from bridger.keys import PublicKeyDirectory
+from bridger.log import logger
+from bridger.mesh import PBPacketProcessor
+
+# Public keys learned from the capture are only kept in memory so a run doesn't change the ingest process's key directory
+PKI_ENGINE = PKICryptoEngine(public_keys=PublicKeyDirectory(path=None))
+
+
+def load_capture(path: str) -> list[bytes]:
+    with open(path) as f:
+        return [base64.b64decode(line) for line in (line.strip() for line in f) if line and not line.startswith("#")]
+
+
+def process_payload(payload: bytes) -> str:
+    try:
+        service_envelope = ServiceEnvelope.FromString(payload)
+    except DecodeError:
+        return "undecodable"
+    processor = PBPacketProcessor(service_envelope, auto_decrypt=False)
+    processor.pki_engine = PKI_ENGINE
+    return processor.process().status.value
+
+
+def run(payloads: list[bytes], rounds: int) -> dict:
+    # Warm up caches such as the handler dispatch table and the crypto context before measuring
+    for payload in payloads:
+        process_payload(payload)
+
+    statuses = Counter()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            statuses[process_payload(payload)] += 1
+    elapsed = time.perf_counter() - start
+
+    # Timing runs without tracing as tracemalloc slows every allocation down
+    peaks = []
+    tracemalloc.start()
+    for payload in payloads:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        process_payload(payload)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    packets = len(payloads) * rounds
+    return {
+        "packets": packets,
+        "statuses": dict(statuses),
+        "us_per_packet": elapsed / packets * 1e6,
+        "mean_peak_bytes": sum(peaks) / len(peaks),
+        "max_peak_bytes": max(peaks),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> dict:
+    parser = ArgumentParser()
+    parser.add_argument("capture", help="File with one base64 encoded ServiceEnvelope per line")
+    parser.add_argument("--rounds", type=int, default=10, help="Times to run over the capture")
+    args = parser.parse_args(argv)
+
+    payloads = load_capture(args.capture)
+    if not payloads:
+        raise SystemExit(f"No packets found in {args.capture}")
+
+    results = run(payloads, args.rounds)
+    print(f"Packets:        {results['packets']}")
+    print(f"Statuses:       {results['statuses']}")
+    print(f"Time:           {results['us_per_packet']:.1f} us per packet")
+    print(f"Peak allocated: {results['mean_peak_bytes']:.0f} bytes per packet on average")
+    print(f"Worst packet:   {results['max_peak_bytes']} bytes")
+    return results
+
+
+if __name__ == "__main__":
+    logger.remove()
+    main()
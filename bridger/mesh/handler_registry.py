@@ -1,10 +1,26 @@
-from collections import defaultdict
-from typing import Type
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Type
 
 from meshtastic.protobuf.portnums_pb2 import PortNum
 
 HANDLER_MAP = defaultdict(list)
 
+# Dense dispatch table indexed by port number, filled by `compile_dispatch` once the handlers are imported
+DISPATCH: list[tuple] = [()] * (PortNum.MAX + 1)
+UNHANDLED = Counter()
+
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    results: int = 0
+    seconds: float = 0.0
+
+
+HANDLER_STATS: dict[str, HandlerStats] = {}
+
 
 def handler(cls: Type) -> Type:
     portnum: PortNum = getattr(cls, "portnum", None)
@@ -12,3 +28,66 @@ def handler(cls: Type) -> Type:
         raise ValueError(f"{cls.__name__} is missing a `portnum` class attribute")
     HANDLER_MAP[portnum].append(cls)
     return cls
+
+
+def timed(handle: Callable, stats: HandlerStats) -> Callable:
+    def call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = handle(*args, **kwargs)
+        finally:
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - start
+        if result:
+            stats.results += 1
+        return result
+
+    return call
+
+
+def compile_dispatch() -> list[tuple]:
+    """Freeze `HANDLER_MAP` into `DISPATCH`, creating a single instance of every handler.
+
+    Handlers registered after this has run are only dispatched to once it is called again.
+    """
+    table = [()] * (PortNum.MAX + 1)
+    for portnum, handler_classes in HANDLER_MAP.items():
+        callables = []
+        for handler_cls in handler_classes:
+            stats = HANDLER_STATS.setdefault(handler_cls.__name__, HandlerStats())
+            call = timed(handler_cls().handle, stats)
+            call.needs_payload_dict = handler_cls.needs_payload_dict
+            callables.append(call)
+        table[portnum] = tuple(callables)
+
+    DISPATCH[:] = table
+    return DISPATCH
+
+
+def handlers_for(portnum: int) -> tuple:
+    if 0 <= portnum < len(DISPATCH):
+        return DISPATCH[portnum]
+    return ()
+
+
+def port_name(portnum: int) -> str:
+    try:
+        return PortNum.Name(portnum)
+    except ValueError:
+        return str(portnum)
+
+
+def drain_handler_stats() -> str:
+    """Summarise the handler calls and unhandled port numbers seen since the last summary, then start counting again."""
+    parts = []
+    for name, stats in sorted(HANDLER_STATS.items()):
+        if stats.calls:
+            mean_ms = stats.seconds / stats.calls * 1000
+            parts.append(f"{name} calls={stats.calls} results={stats.results} mean={mean_ms:.3f}ms")
+            # Reset in place, the dispatch table holds on to these objects
+            stats.calls, stats.results, stats.seconds = 0, 0, 0.0
+
+    if UNHANDLED:
+        parts.append("unhandled " + ", ".join(f"{port_name(portnum)}={count}" for portnum, count in UNHANDLED.most_common()))
+        UNHANDLED.clear()
+    return "; ".join(parts)
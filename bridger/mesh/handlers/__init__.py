@@ -1,6 +1,10 @@
+from .admin import AdminHandler  # noqa: F401
 from .neighborinfo import NeighborInfoHandler  # noqa: F401
 from .nodeinfo import NodeInfoHandler  # noqa: F401
 from .position import PositionHandler  # noqa: F401
+from .rangetest import RangeTestHandler  # noqa: F401
+from .routing import RoutingHandler  # noqa: F401
+from .storeforward import StoreForwardHandler  # noqa: F401
 from .telemetry import TelemetryHandler  # noqa: F401
 from .text import TextHandler  # noqa: F401
 from .traceroute import TracerouteHandler  # noqa: F401
@@ -0,0 +1,22 @@
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.dataclasses import AdminPoint
+from bridger.mesh.base import PacketHandler
+from bridger.mesh.handler_registry import handler
+
+
+@handler
+class AdminHandler(PacketHandler):
+    portnum = PortNum.ADMIN_APP
+
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        # Admin messages can carry passkeys, channel keys and owner details so we only keep which message it was
+        variant = next((key for key in payload_dict if key != "session_passkey"), None)
+        if variant is None:
+            return None
+
+        for key in payload_dict:
+            base_data.pop(key, None)
+
+        want_response = packet.decoded.want_response if packet is not None else None
+        return AdminPoint(**base_data, variant=variant, want_response=want_response)
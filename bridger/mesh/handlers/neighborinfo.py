@@ -10,25 +10,25 @@ from bridger.mesh.handler_registry import handler
 class NeighborInfoHandler(PacketHandler):
     portnum = PortNum.NEIGHBORINFO_APP
 
-    def handle(self):
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
         neighbors = [
             {"neighbor_id": neighbor.get("node_id", None), "snr": neighbor.get("snr", None)}
-            for neighbor in self.base_data.get("neighbors", [])
+            for neighbor in base_data.get("neighbors", [])
         ]
 
         if not neighbors:
-            logger.bind(**self.base_data).debug("No neighbors found in payload")
+            logger.bind(**base_data).debug("No neighbors found in payload")
             return None
 
         neighbor_points = []
-        self.base_data.pop("neighbors")
+        base_data.pop("neighbors")
 
         for neighbor in neighbors:
-            self.base_data["neighbor_id"] = neighbor.get("neighbor_id")
+            base_data["neighbor_id"] = neighbor.get("neighbor_id")
 
             if neighbor.get("snr"):
-                self.base_data["snr"] = neighbor.get("snr")
+                base_data["snr"] = neighbor.get("snr")
 
-            neighbor_points.append(NeighborInfoPacket(**self.base_data))
+            neighbor_points.append(NeighborInfoPacket(**base_data))
 
         return neighbor_points
@@ -9,5 +9,5 @@ from bridger.mesh.handler_registry import handler
 class NodeInfoHandler(PacketHandler):
     portnum = PortNum.NODEINFO_APP
 
-    def handle(self):
-        return NodeInfoPoint(**self.base_data)
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        return NodeInfoPoint(**base_data)
@@ -9,10 +9,10 @@ from bridger.mesh.handler_registry import handler
 class PositionHandler(PacketHandler):
     portnum = PortNum.POSITION_APP
 
-    def handle(self):
-        if "latitude_i" in self.payload_dict and "longitude_i" in self.payload_dict:
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        if "latitude_i" in payload_dict and "longitude_i" in payload_dict:
             # The GPS time field ends up being used by InfluxDB as the record time so we need to rename it
-            if self.base_data.get("time"):
-                self.base_data["gps_time"] = self.base_data.pop("time", None)
+            if base_data.get("time"):
+                base_data["gps_time"] = base_data.pop("time", None)
 
-            return PositionPoint(**self.base_data)
+            return PositionPoint(**base_data)
@@ -0,0 +1,24 @@
+import re
+
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.dataclasses import RangeTestPoint
+from bridger.mesh.base import PacketHandler
+from bridger.mesh.handler_registry import handler
+
+# ASCII digits only, str.isdigit() also accepts characters like "²" that int() can't parse
+SEQUENCE = re.compile(r"seq ([0-9]+)")
+
+
+@handler
+class RangeTestHandler(PacketHandler):
+    portnum = PortNum.RANGE_TEST_APP
+
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        text = base_data.pop("text", None)
+        if text is None:
+            return None
+
+        # The range test module sends "seq <n>" so receivers can tell which packets they missed
+        match = SEQUENCE.fullmatch(text)
+        return RangeTestPoint(**base_data, sequence=int(match.group(1)) if match else None)
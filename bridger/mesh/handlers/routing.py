@@ -0,0 +1,30 @@
+from meshtastic.protobuf.mesh_pb2 import Routing
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.dataclasses import RoutingPoint
+from bridger.mesh.base import PacketHandler
+from bridger.mesh.handler_registry import handler
+
+
+@handler
+class RoutingHandler(PacketHandler):
+    portnum = PortNum.ROUTING_APP
+
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        # The route discovery variants carry a RouteDiscovery message whose fields we don't store here
+        for variant in ("route_request", "route_reply"):
+            if base_data.pop(variant, None) is not None:
+                return RoutingPoint(**base_data, variant=variant)
+
+        if "error_reason" not in payload_dict:
+            return None
+
+        error_reason = base_data.pop("error_reason")
+        return RoutingPoint(
+            **base_data,
+            variant="error_reason",
+            error_reason=Routing.Error.Name(error_reason),
+            ack=error_reason == Routing.Error.NONE,
+            # An ACK or NAK refers to the packet it answers through the request ID
+            request_id=packet.decoded.request_id if packet is not None else None,
+        )
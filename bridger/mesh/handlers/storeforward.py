@@ -0,0 +1,23 @@
+from meshtastic.protobuf.portnums_pb2 import PortNum
+from meshtastic.protobuf.storeforward_pb2 import StoreAndForward
+
+from bridger.dataclasses import StoreForwardPoint
+from bridger.mesh.base import PacketHandler
+from bridger.mesh.handler_registry import handler
+
+
+@handler
+class StoreForwardHandler(PacketHandler):
+    portnum = PortNum.STORE_FORWARD_APP
+
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        # Stored messages are relayed in the text variant and we never keep message contents
+        base_data.pop("text", None)
+
+        # Pop every variant before merging as the statistics message has a `heartbeat` field of its own
+        variants = [base_data.pop(variant, None) for variant in ("stats", "history", "heartbeat")]
+        for values in variants:
+            base_data.update(values or {})
+
+        rr = base_data.pop("rr", StoreAndForward.RequestResponse.UNSET)
+        return StoreForwardPoint(**base_data, rr=StoreAndForward.RequestResponse.Name(rr))
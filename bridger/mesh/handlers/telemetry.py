@@ -1,36 +1,125 @@
+import math
+import struct
+from dataclasses import fields
+from typing import Optional
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
 from meshtastic.protobuf.portnums_pb2 import PortNum
+from meshtastic.protobuf.telemetry_pb2 import Telemetry
 
-from bridger.dataclasses import DeviceTelemetryPoint, PowerTelemetryPoint, SensorTelemetryPoint
+from bridger.dataclasses import (
+    AirQualityPoint,
+    DeviceTelemetryPoint,
+    HealthPoint,
+    HostMetricsPoint,
+    LocalStatsPoint,
+    PowerTelemetryPoint,
+    SensorTelemetryPoint,
+    TelemetryPoint,
+    TrafficManagementPoint,
+)
 from bridger.mesh.base import PacketHandler
 from bridger.mesh.handler_registry import handler
 
+# Telemetry variant -> point class, the fields copied are the ones the point class and the metrics message share
+TELEMETRY_POINTS: dict[str, type[TelemetryPoint]] = {
+    "device_metrics": DeviceTelemetryPoint,
+    "environment_metrics": SensorTelemetryPoint,
+    "air_quality_metrics": AirQualityPoint,
+    "local_stats": LocalStatsPoint,
+    "health_metrics": HealthPoint,
+    "host_metrics": HostMetricsPoint,
+    "traffic_management_stats": TrafficManagementPoint,
+}
+POWER_CHANNELS = tuple(f"ch{channel}" for channel in range(1, 9))
+
+
+def field_table(variant: str, point_cls: type[TelemetryPoint]) -> tuple[tuple[str, bool, bool], ...]:
+    """(name, has presence, is a float) for every metrics field the point class stores."""
+    message_fields = Telemetry.DESCRIPTOR.fields_by_name[variant].message_type.fields_by_name
+    return tuple(
+        (
+            f.name,
+            message_fields[f.name].has_presence,
+            message_fields[f.name].cpp_type == FieldDescriptor.CPPTYPE_FLOAT,
+        )
+        for f in fields(point_cls)
+        if f.name in message_fields
+    )
+
+
+FIELD_TABLES = {variant: (point_cls, field_table(variant, point_cls)) for variant, point_cls in TELEMETRY_POINTS.items()}
+
+
+def shortest_float(value: float) -> float:
+    """The shortest decimal that reads back as the same single precision float, the form MessageToDict gives."""
+    if not math.isfinite(value):
+        return value
+
+    for precision in range(6, 10):
+        short = float(f"{value:.{precision}g}")
+        if struct.unpack("<f", struct.pack("<f", short))[0] == value:
+            return short
+    return value
+
+
+def finite_float(value: float) -> Optional[float]:
+    """The short form of a float, or None for NaN and infinity which InfluxDB rejects and would fail the whole batch."""
+    return shortest_float(value) if math.isfinite(value) else None
+
+
+def metric_values(metrics: Message, table: tuple[tuple[str, bool, bool], ...]) -> dict:
+    values = {}
+    for name, has_presence, is_float in table:
+        if has_presence and not metrics.HasField(name):
+            continue
+
+        value = getattr(metrics, name)
+        if is_float:
+            # Floats are single precision on the wire, keep the short form MessageToDict would have given
+            value = finite_float(value)
+            if value is None:
+                continue
+        values[name] = value
+    return values
+
 
 @handler
 class TelemetryHandler(PacketHandler):
     portnum = PortNum.TELEMETRY_APP
+    # Telemetry is the most common packet so it is read straight from the message instead of a dict
+    needs_payload_dict = False
+
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        telemetry = Telemetry.FromString(packet.decoded.payload)
+        variant = telemetry.WhichOneof("variant")
+        if variant is None:
+            return None
+
+        metrics = getattr(telemetry, variant)
+        if variant == "power_metrics":
+            return self.power_points(metrics, base_data)
+
+        if variant not in FIELD_TABLES:
+            return None
+
+        point_cls, table = FIELD_TABLES[variant]
+        return point_cls(**base_data, **metric_values(metrics, table))
+
+    @staticmethod
+    def power_points(metrics: Message, base_data: dict) -> list[PowerTelemetryPoint]:
+        power_points = []
+        for channel in POWER_CHANNELS:
+            if not metrics.HasField(f"{channel}_voltage") or not metrics.HasField(f"{channel}_current"):
+                continue
 
-    def handle(self):
-        if "environment_metrics" in self.payload_dict:
-            self.base_data.update(self.payload_dict["environment_metrics"])
-            return SensorTelemetryPoint(**self.base_data)
-        elif "device_metrics" in self.payload_dict:
-            self.base_data.update(self.payload_dict["device_metrics"])
-            return DeviceTelemetryPoint(**self.base_data)
-        elif "power_metrics" in self.payload_dict:
-            power_metrics = self.payload_dict["power_metrics"]
-            power_points = []
-            channels = set(key.split("_")[0] for key in power_metrics.keys())
-
-            for channel in channels:
-                if f"{channel}_voltage" not in power_metrics or f"{channel}_current" not in power_metrics:
-                    continue
-
-                power_points.append(
-                    PowerTelemetryPoint(
-                        **self.base_data,
-                        channel=channel,
-                        voltage=power_metrics[f"{channel}_voltage"],
-                        current=power_metrics[f"{channel}_current"],
-                    )
+            power_points.append(
+                PowerTelemetryPoint(
+                    **base_data,
+                    channel=channel,
+                    voltage=finite_float(getattr(metrics, f"{channel}_voltage")),
+                    current=finite_float(getattr(metrics, f"{channel}_current")),
                 )
-            return power_points
+            )
+        return power_points
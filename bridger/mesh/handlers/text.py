@@ -9,10 +9,10 @@ from bridger.mesh.handler_registry import handler
 class TextHandler(PacketHandler):
     portnum = PortNum.TEXT_MESSAGE_APP
 
-    def handle(self):
-        if "text" in self.payload_dict:
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        if "text" in payload_dict:
             # We are leaving out the actual text property here as we don't want to store actual messages
-            if self.strip_text:
-                self.base_data.pop("text", None)
-            return TextMessagePoint(**self.base_data)
+            if strip_text:
+                base_data.pop("text", None)
+            return TextMessagePoint(**base_data)
         return None
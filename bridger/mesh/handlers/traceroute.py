@@ -1,14 +1,58 @@
+from itertools import chain, repeat
+from typing import Optional
+
 from meshtastic.protobuf.portnums_pb2 import PortNum
 
-from bridger.dataclasses import TraceroutePoint
+from bridger.dataclasses import TracerouteHopPoint, TraceroutePoint
 from bridger.mesh.base import PacketHandler
 from bridger.mesh.handler_registry import handler
 
+UNKNOWN_SNR = -128  # Value firmware records when a hop has no SNR
+
+
+def decode_route(origin: int, destination: int, route: list, snrs: list) -> list[tuple[int, int, int, Optional[float]]]:
+    """Expand a route into `(hop, from, to, snr)` tuples in a single pass.
+
+    Every relay appends itself to the route along with the SNR it heard the packet at. The destination only appends its
+    SNR, so a route with one more SNR than relays reached the destination. SNR values are stored in quarter dB steps.
+    """
+    path = [origin, *route]
+    if len(snrs) > len(route):
+        path.append(destination)
+
+    return [
+        (hop, hop_from, hop_to, None if snr == UNKNOWN_SNR else snr / 4)
+        for hop, (hop_from, hop_to, snr) in enumerate(zip(path, path[1:], chain(snrs, repeat(UNKNOWN_SNR))))
+    ]
+
 
 @handler
 class TracerouteHandler(PacketHandler):
     portnum = PortNum.TRACEROUTE_APP
 
-    def handle(self):
-        # TODO: The fields could be lists so we need to send each list item as a separate point
-        return TraceroutePoint(**self.base_data)
+    def handle(self, packet, payload_dict, base_data, strip_text=True):
+        route = base_data.pop("route", [])
+        snr_towards = base_data.pop("snr_towards", [])
+        route_back = base_data.pop("route_back", [])
+        snr_back = base_data.pop("snr_back", [])
+        sender = base_data["_from"]
+        recipient = base_data["to"]
+
+        if len(snr_towards) > len(route):
+            # This is the reply so it travels from the traceroute destination back to the node that asked for it
+            hops = [("towards", decode_route(recipient, sender, route, snr_towards))]
+            hops.append(("back", decode_route(sender, recipient, route_back, snr_back)))
+        else:
+            hops = [("towards", decode_route(sender, recipient, route, snr_towards))]
+
+        # One row per packet like every other measurement, followed by a row for each hop
+        counts = {direction: len(decoded) for direction, decoded in hops}
+        traceroute = TraceroutePoint(**base_data, hops_towards=counts["towards"], hops_back=counts.get("back"))
+
+        hop_points = [
+            TracerouteHopPoint(**base_data, direction=direction, hop=hop, hop_from=hop_from, hop_to=hop_to, snr=snr)
+            for direction, decoded in hops
+            for hop, hop_from, hop_to, snr in decoded
+        ]
+
+        return [traceroute, *hop_points]
@@ -1,39 +1,146 @@
+import asyncio
+import json
+import time
 from collections import defaultdict
+from typing import Optional
 
-from aiocache import cached
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession
 
-from bridger.config import MESHTASTIC_API_CACHE_TTL, MESHTASTIC_API_ENDPOINT
+from bridger.config import MESHTASTIC_API_CACHE_TTL, MESHTASTIC_API_ENDPOINT, MESHTASTIC_CATALOG_PATH
+from bridger.log import logger
+from bridger.utils import atomic_write_json
+
+REFRESH_RETRY_INTERVAL = 60
 
 
 class DeviceModel:
+    """Meshtastic hardware catalog served from memory and persisted to disk.
+
+    The catalog is loaded from `catalog_path` at startup so we can serve without reaching the Meshtastic API.
+    Once the snapshot is older than `ttl` the stale data keeps being served while a refresh runs in the background.
+    """
+
     device_hardware_path = "/resource/deviceHardware"
 
-    def __init__(self, session: ClientSession = None):
+    def __init__(
+        self, session: ClientSession = None, catalog_path: str = MESHTASTIC_CATALOG_PATH, ttl: int = MESHTASTIC_API_CACHE_TTL
+    ):
         self.session = session
+        self.catalog_path = catalog_path
+        self.ttl = ttl
+        self.models: list = []
+        self.models_by_hw_model: dict[int, list] = {}
+        self.displaynames: dict[int, list] = {}
+        self.all_displaynames: list = []
+        self.all_displaynames_joined: list = []
+        self.fetched_at: float = 0
+        self.last_attempt: float = 0
+        self.version: int = 0
+        self._refresh_task: Optional[asyncio.Task] = None
 
-    @cached(ttl=MESHTASTIC_API_CACHE_TTL)
-    async def make_request(self) -> list:
+        self.load()
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl
+
+    def load(self) -> bool:
+        try:
+            with open(self.catalog_path) as f:
+                snapshot = json.load(f)
+            self._index(snapshot["models"], snapshot["fetched_at"])
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Unable to load hardware catalog from {self.catalog_path}: {e}")
+            return False
+
+        logger.info(f"Loaded {len(self.models)} hardware models from {self.catalog_path}")
+        return True
+
+    def save(self) -> None:
+        try:
+            atomic_write_json(self.catalog_path, {"fetched_at": self.fetched_at, "models": self.models})
+        except OSError as e:
+            logger.warning(f"Unable to persist hardware catalog to {self.catalog_path}: {e}")
+
+    def _index(self, models: list, fetched_at: float) -> None:
+        models_by_hw_model = defaultdict(list)
+        for model in models:
+            models_by_hw_model[int(model["hwModel"])].append(model)
+
+        displaynames = {
+            hw_model: [model["displayName"] for model in group] for hw_model, group in models_by_hw_model.items()
+        }
+
+        self.models = models
+        self.models_by_hw_model = dict(models_by_hw_model)
+        self.displaynames = displaynames
+        self.all_displaynames = [{"hw_model": hw_model, "names": names} for hw_model, names in displaynames.items()]
+        self.all_displaynames_joined = [
+            {"hw_model": hw_model, "names": ", ".join(names)} for hw_model, names in displaynames.items()
+        ]
+        self.fetched_at = fetched_at
+        self.version += 1
+
+    async def fetch(self) -> list:
         async with self.session.get(MESHTASTIC_API_ENDPOINT + self.device_hardware_path) as response:
+            response.raise_for_status()
             return await response.json()
 
+    async def refresh(self) -> bool:
+        self.last_attempt = time.time()
+
+        try:
+            models = await self.fetch()
+        except (ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Failed to refresh hardware catalog, serving stale data: {e}")
+            return False
+
+        try:
+            self._index(models, time.time())
+        except (KeyError, TypeError, ValueError) as e:
+            # The index is only replaced once it has been fully built, so the previous catalog is still served
+            logger.warning(f"Unexpected hardware catalog from the Meshtastic API, serving stale data: {e!r}")
+            return False
+
+        self.save()
+        logger.info(f"Refreshed hardware catalog with {len(models)} models")
+        return True
+
+    def schedule_refresh(self) -> Optional[asyncio.Task]:
+        if self._refresh_task and not self._refresh_task.done():
+            return self._refresh_task
+
+        if time.time() - self.last_attempt < REFRESH_RETRY_INTERVAL:
+            return None
+
+        self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def start(self) -> None:
+        if self.is_stale:
+            self.schedule_refresh()
+
+    async def make_request(self) -> list:
+        if not self.models:
+            # Nothing to serve yet so we have to wait for the first fetch
+            task = self.schedule_refresh() or self._refresh_task
+            if task:
+                await task
+        elif self.is_stale:
+            self.schedule_refresh()
+
+        return self.models
+
     async def get_models(self, model_id: int = None) -> list:
-        response = await self.make_request()
-        return [model for model in response if model["hwModel"] == model_id]
+        await self.make_request()
+        return self.models_by_hw_model.get(model_id, [])
 
     async def get_displaynames(self, model_id: int) -> list:
-        models = await self.get_models(model_id)
-        return [model["displayName"] for model in models]
+        await self.make_request()
+        return self.displaynames.get(model_id, [])
 
     async def get_all_displaynames(self, names_as_list=False) -> list:
-        models_dict = defaultdict(list)
-        response = await self.make_request()
-        for model in response:
-            models_dict[int(model["hwModel"])].append(model["displayName"])
-
-        if names_as_list:
-            result = [{"hw_model": hwModel, "names": names} for hwModel, names in models_dict.items()]
-        else:
-            result = [{"hw_model": hwModel, "names": ", ".join(names)} for hwModel, names in models_dict.items()]
-
-        return result
+        await self.make_request()
+        return self.all_displaynames if names_as_list else self.all_displaynames_joined
@@ -8,9 +8,17 @@ from sentry_sdk import add_breadcrumb, set_user
 
 from bridger.config import MQTT_TOPIC
 from bridger.deduplication import PacketDeduplicator
+from bridger.distance import LinkDistanceAggregator
+from bridger.filters import PacketFilter
 from bridger.influx.interfaces import InfluxWriter
+from bridger.linkquality import LinkQualityAggregator
 from bridger.log import logger
-from bridger.mesh import PacketProcessorError, PBPacketProcessor
+from bridger.mesh import PBPacketProcessor, ProcessStatus, pki_engine
+from bridger.nodestate import NodeStateCache
+from bridger.reception import ReceptionAggregator
+from bridger.rollup import RollupEngine
+from bridger.spatial import SpatialIndex
+from bridger.stats import PacketStats
 from bridger.utils import should_ignore_pki_message
 
 
@@ -19,6 +27,14 @@ class BridgerMQTT(Client):
         self.influx_client = influx_client  # Before super().__init__ call so it isn't passed to the parent class
         super().__init__(*args, **kwargs)
         self.deduplicator = PacketDeduplicator(maxlen=100)
+        self.packet_filter = PacketFilter.from_config()
+        self.stats = PacketStats("Ingest")
+        self.node_states = NodeStateCache()
+        self.receptions = ReceptionAggregator()
+        self.link_quality = LinkQualityAggregator()
+        self.rollups = RollupEngine()
+        self.positions = SpatialIndex()
+        self.link_distance = LinkDistanceAggregator(self.positions)
 
     def on_connect(self, client, userdata, flags, reason_code, properties):
         if reason_code != 0:
@@ -45,37 +61,94 @@ class BridgerMQTT(Client):
         )
         add_breadcrumb(level="info", data=breadcrumb_data, category="mqtt", message="Received message")
 
-        # Ignoring PKI messages for now as we cannot decrypt them without storing keys somewhere
-        if should_ignore_pki_message(message.topic):
-            logger.bind(**breadcrumb_data).debug(f"Ignoring PKI message on topic {message.topic}")
+        # PKI messages can only be decrypted when they are sent to our own node with a key configured
+        if should_ignore_pki_message(message.topic) and not pki_engine.enabled:
+            self.stats.record(ProcessStatus.PKI.value)
+            return
+
+        if not self.packet_filter.allow_topic(message.topic):
+            self.stats.record(ProcessStatus.FILTERED.value)
             return
 
         try:
             service_envelope = ServiceEnvelope.FromString(message.payload)
+            self.link_quality.observe(service_envelope)
+            self.link_distance.observe(service_envelope)
+
+            if self.receptions.add_reception(service_envelope):
+                self.stats.record("reception")
+                return
 
             if not self.deduplicator.should_process(service_envelope):
+                self.stats.record("duplicate")
                 return
 
-            packet_id = service_envelope.packet.id
-            pb_processor = PBPacketProcessor(service_envelope)
-            influx_writer = InfluxWriter(self.influx_client)
             set_user({"id": getattr(service_envelope.packet, "from")})
-
-            data = pb_processor.data
-
-            if data:
-                logger.bind(envelope_id=packet_id).debug(f"Trying to write data: {data}")
-                influx_writer.write_point(data)
+            pb_processor = PBPacketProcessor(service_envelope, auto_decrypt=False)
+            result = pb_processor.process(self.packet_filter.allow_portnum)
+
+            if result.status is ProcessStatus.DECODED:
+                for point in result.data if isinstance(result.data, list) else [result.data]:
+                    self.positions.ingest(point)
+
+                data = self.node_states.filter(result.data)
+                if data:
+                    # Written once the other gateways' copies have had a chance to arrive
+                    self.write_timed_points(self.receptions.open(service_envelope, data))
+                    self.rollups.observe(data)
+                    self.stats.record("stored")
+                else:
+                    self.stats.record("unchanged")
             else:
-                logger.bind(envelope_id=packet_id).debug("No data to write")
+                self.stats.record(result.status.value)
 
         except DecodeError as e:
+            self.stats.record(ProcessStatus.FAILED.value)
             self._handle_decode_error(e, breadcrumb_data, message.payload)
         except (TypeError, AttributeError) as e:
+            self.stats.record(ProcessStatus.FAILED.value)
             logger.bind(**breadcrumb_data).exception(f"Error: {e}")
             logger.bind(**breadcrumb_data).debug(f"Message payload: \n{message.payload}")
-        except PacketProcessorError as e:
-            logger.info(e)
+
+    def loop_misc(self):
+        # The network loop calls this at least once a second, so held packets are written when the broker goes quiet
+        result = super().loop_misc()
+        self.flush_due()
+        return result
+
+    def flush_due(self):
+        self.flush_receptions()
+        self.write_points(self.link_quality.flush())
+        self.write_points(self.link_distance.flush())
+        self.flush_rollups()
+
+    def shutdown(self):
+        """Write everything still held in memory, called once the network loop has stopped."""
+        # Windows that haven't closed yet are saved before anything is written, so a failing write can't lose them
+        records = self.rollups.flush()
+        self.rollups.save()
+
+        self.flush_receptions(force=True)
+        self.write_points(self.link_quality.flush(force=True))
+        self.write_points(self.link_distance.flush(force=True))
+        if records:
+            InfluxWriter(self.influx_client).write_rollups(records)
+
+    def flush_receptions(self, force: bool = False):
+        self.write_timed_points(self.receptions.flush(force=force))
+
+    def flush_rollups(self):
+        records = self.rollups.flush()
+        if records:
+            InfluxWriter(self.influx_client).write_rollups(records)
+
+    def write_points(self, points):
+        if points:
+            InfluxWriter(self.influx_client).write_points(points)
+
+    def write_timed_points(self, timed_points):
+        if timed_points:
+            InfluxWriter(self.influx_client).write_timed_points(timed_points)
 
     def _handle_decode_error(self, error, breadcrumb_data, payload):
         logger.bind(**breadcrumb_data).warning(f"We received a message that can't be decoded as a protobuf: {error}")
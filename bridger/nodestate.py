@@ -0,0 +1,70 @@
+import time
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from bridger.config import NODE_STATE_INTERVAL, NODE_STATE_POLICY
+from bridger.dataclasses import NodeInfoPoint, TelemetryPoint
+
+POLICIES = ("always", "change", "interval")
+
+
+@dataclass
+class NodeState:
+    identity: tuple
+    written_at: float
+    heartbeats: int = 0
+
+
+class NodeStateCache:
+    """Last written nodeinfo per node, used to skip writing nodeinfo that hasn't changed.
+
+    Policies:
+    - `always` writes every nodeinfo packet.
+    - `change` writes when the node's names, hardware or role change, or when the last write is older than
+      `interval` so the node keeps showing up in time bounded queries.
+    - `interval` writes at most once per `interval` seconds, even when something changed.
+
+    Skipped packets are counted and the count is written as `heartbeats` with the next point for that node.
+    """
+
+    def __init__(self, policy: str = NODE_STATE_POLICY, interval: int = NODE_STATE_INTERVAL):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown node state policy {policy!r}, expected one of: {', '.join(POLICIES)}")
+
+        self.policy = policy
+        self.interval = interval
+        self.states: dict[int, NodeState] = {}
+
+    @staticmethod
+    def identity(point: NodeInfoPoint) -> tuple:
+        return (point.id, point.long_name, point.short_name, point.macaddr, point.hw_model, point.role)
+
+    def should_write(self, point: NodeInfoPoint, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        identity = self.identity(point)
+        state = self.states.get(point._from)
+
+        if state is None:
+            write = True
+        elif self.policy == "always":
+            write = True
+        elif self.policy == "change":
+            write = identity != state.identity or now - state.written_at >= self.interval
+        else:
+            write = now - state.written_at >= self.interval
+
+        if not write:
+            state.heartbeats += 1
+            return False
+
+        point.heartbeats = (state.heartbeats if state else 0) + 1
+        self.states[point._from] = NodeState(identity, now)
+        return True
+
+    def filter(
+        self, data: Union[TelemetryPoint, list[TelemetryPoint], None], now: Optional[float] = None
+    ) -> Union[TelemetryPoint, list[TelemetryPoint], None]:
+        """Drop nodeinfo points that don't need writing and pass everything else through."""
+        if isinstance(data, NodeInfoPoint) and not self.should_write(data, now):
+            return None
+        return data
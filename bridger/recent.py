@@ -0,0 +1,139 @@
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+
+from bridger.config import RECENT_STORE_CAPACITY, RECENT_STORE_MEMORY
+from bridger.dataclasses import TelemetryPoint
+from bridger.rollup import numeric_field_names
+
+# Largest number of buckets a series may be downsampled into, each one is allocated whether or not it holds samples
+MAX_SERIES_BUCKETS = 10_000
+
+
+class RingBuffer:
+    """The last `capacity` samples of one node's measurement, one column per numeric field.
+
+    Fields a point didn't carry are stored as NaN so every query can ignore them.
+    """
+
+    def __init__(self, field_names: tuple[str, ...], capacity: int):
+        self.field_names = field_names
+        self.columns = {name: index for index, name in enumerate(field_names)}
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.full((capacity, len(field_names)), np.nan, dtype=np.float64)
+        self.head = 0
+        self.size = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def append(self, timestamp: float, values: dict[str, float]) -> None:
+        self.times[self.head] = timestamp
+        row = self.values[self.head]
+        row.fill(np.nan)
+        for name, value in values.items():
+            row[self.columns[name]] = value
+
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self, field: str, since: float) -> tuple[np.ndarray, np.ndarray]:
+        """Timestamps and values of `field` at or after `since`, oldest first and without missing values."""
+        # Oldest sample first, the buffer has wrapped once it is full
+        order = np.arange(self.head - self.size, self.head) % self.capacity
+        times = self.times[order]
+        values = self.values[order, self.columns[field]]
+        keep = (times >= since) & ~np.isnan(values)
+        return times[keep], values[keep]
+
+
+def summarise(times: np.ndarray, values: np.ndarray, percentiles: Iterable[float] = (50, 90)) -> dict:
+    if not len(values):
+        return {"count": 0}
+
+    summary = {
+        "count": int(len(values)),
+        "last": float(values[-1]),
+        "last_time": float(times[-1]),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+    percentiles = list(percentiles)
+    if percentiles:
+        for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+            summary[f"p{percentile:g}"] = float(value)
+    return summary
+
+
+def downsample(times: np.ndarray, values: np.ndarray, since: float, step: float) -> list[list[float]]:
+    """Mean of `values` in `step` second buckets starting at `since`, skipping empty buckets."""
+    if not len(values):
+        return []
+
+    buckets = ((times - since) // step).astype(np.int64)
+    counts = np.bincount(buckets)
+    sums = np.bincount(buckets, weights=values)
+    filled = np.nonzero(counts)[0]
+    return [[since + bucket * step, mean] for bucket, mean in zip(filled.tolist(), (sums[filled] / counts[filled]).tolist())]
+
+
+class RecentTelemetryStore:
+    """Recent numeric telemetry per node and measurement, kept in memory for "last few hours" queries.
+
+    Every series is a ring buffer of `capacity` samples. When adding a series would take the store over
+    `memory_budget` bytes the least recently updated series are dropped to make room.
+    """
+
+    def __init__(self, capacity: int = RECENT_STORE_CAPACITY, memory_budget: int = RECENT_STORE_MEMORY * 1024 * 1024):
+        self.capacity = capacity
+        self.memory_budget = memory_budget
+        self.series: OrderedDict[tuple[int, str], RingBuffer] = OrderedDict()
+        self.nbytes = 0
+        self.version = 0
+
+    def ingest(self, point: TelemetryPoint, now: Optional[float] = None) -> None:
+        field_names = numeric_field_names(type(point))
+        if not field_names:
+            return
+
+        values = {
+            name: getattr(point, name)
+            for name in field_names
+            if getattr(point, name) is not None and not isinstance(getattr(point, name), bool)
+        }
+        if not values:
+            return
+
+        key = (point._from, point.measurement_name)
+        buffer = self.series.get(key)
+
+        if buffer is None:
+            buffer = RingBuffer(field_names, self.capacity)
+            while self.series and self.nbytes + buffer.nbytes > self.memory_budget:
+                _, evicted = self.series.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+            self.series[key] = buffer
+            self.nbytes += buffer.nbytes
+        else:
+            self.series.move_to_end(key)
+
+        buffer.append(now or time.time(), values)
+        self.version += 1
+
+    def measurements(self, node_id: int) -> dict[str, list[str]]:
+        return {
+            measurement: list(buffer.field_names) for (node, measurement), buffer in self.series.items() if node == node_id
+        }
+
+    def window(self, node_id: int, measurement: str, field: str, since: float) -> tuple[np.ndarray, np.ndarray]:
+        """Raise KeyError when the node, measurement or field isn't known."""
+        return self.series[(node_id, measurement)].window(field, since)
@@ -0,0 +1,163 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.config import RECEPTION_PER_GATEWAY, RECEPTION_WINDOW
+from bridger.dataclasses import ReceptionPoint, ReceptionSummaryPoint, TelemetryPoint
+
+
+@dataclass
+class Reception:
+    gateway_id: str
+    rx_snr: float
+    rx_rssi: float
+    hop_limit: int
+    hop_start: int
+
+    @property
+    def hops_away(self) -> Optional[int]:
+        # Firmware older than 2.3 doesn't set hop_start so the hop count is unknown
+        return self.hop_start - self.hop_limit if self.hop_start else None
+
+    @classmethod
+    def from_envelope(cls, service_envelope: ServiceEnvelope) -> "Reception":
+        packet = service_envelope.packet
+        return cls(service_envelope.gateway_id, packet.rx_snr, packet.rx_rssi, packet.hop_limit, packet.hop_start)
+
+
+@dataclass
+class OpenPacket:
+    base_data: dict
+    data: Union[TelemetryPoint, list[TelemetryPoint]]
+    opened_at: float
+    # Unix time the first copy arrived, points are written with it rather than the time the window closes
+    received_at: float
+    receptions: dict[str, Reception] = field(default_factory=dict)
+
+    @property
+    def packet_type(self) -> str:
+        first = self.data[0] if isinstance(self.data, list) else self.data
+        return first.measurement_name
+
+
+class ReceptionAggregator:
+    """Hold each decoded packet open for `window` seconds to collect the copies other gateways hear.
+
+    The decoded point is written once when the window closes, together with a reception summary and optionally a
+    row per gateway, so coverage data costs one batched write per packet instead of one write per copy. Closed packets
+    are returned as `(point, received_at)` pairs so they can be written with the time the packet arrived.
+    """
+
+    def __init__(self, window: float = RECEPTION_WINDOW, per_gateway: bool = RECEPTION_PER_GATEWAY, max_open: int = 1024):
+        self.window = window
+        self.per_gateway = per_gateway
+        self.max_open = max_open
+        self.packets: OrderedDict[tuple[int, int], OpenPacket] = OrderedDict()
+
+    @staticmethod
+    def key(service_envelope: ServiceEnvelope) -> tuple[int, int]:
+        packet = service_envelope.packet
+        return getattr(packet, "from"), packet.id
+
+    def add_reception(self, service_envelope: ServiceEnvelope) -> bool:
+        """Record another gateway's copy of an open packet, returning False when the packet isn't open."""
+        open_packet = self.packets.get(self.key(service_envelope))
+        if open_packet is None:
+            return False
+
+        # A gateway can hear the same packet again when it is relayed, keep the copy it heard first
+        open_packet.receptions.setdefault(service_envelope.gateway_id, Reception.from_envelope(service_envelope))
+        return True
+
+    def open(
+        self,
+        service_envelope: ServiceEnvelope,
+        data: Union[TelemetryPoint, list[TelemetryPoint]],
+        now: Optional[float] = None,
+    ) -> list[tuple[TelemetryPoint, float]]:
+        """Start collecting receptions for a decoded packet, returning anything pushed out to stay under `max_open`."""
+        now = now or time.monotonic()
+        packet = service_envelope.packet
+        base_data = {
+            "_from": getattr(packet, "from"),
+            "to": packet.to,
+            "packet_id": packet.id,
+            "rx_time": packet.rx_time,
+            "rx_snr": packet.rx_snr,
+            "rx_rssi": packet.rx_rssi,
+            "hop_limit": packet.hop_limit,
+            "hop_start": packet.hop_start,
+            "channel_id": service_envelope.channel_id,
+            "gateway_id": service_envelope.gateway_id,
+        }
+
+        open_packet = OpenPacket(base_data, data, now, time.time())
+        open_packet.receptions[service_envelope.gateway_id] = Reception.from_envelope(service_envelope)
+        self.packets[self.key(service_envelope)] = open_packet
+
+        points = []
+        while len(self.packets) > self.max_open:
+            points.extend(self.close(self.packets.popitem(last=False)[1]))
+        return points
+
+    def flush(self, now: Optional[float] = None, force: bool = False) -> list[tuple[TelemetryPoint, float]]:
+        """Close every packet whose window has passed, or all of them when `force` is set."""
+        now = now or time.monotonic()
+        points = []
+
+        # Packets are opened in time order so the oldest is always first
+        while self.packets:
+            open_packet = next(iter(self.packets.values()))
+            if not force and now - open_packet.opened_at < self.window:
+                break
+
+            self.packets.popitem(last=False)
+            points.extend(self.close(open_packet))
+
+        return points
+
+    def close(self, open_packet: OpenPacket) -> list[tuple[TelemetryPoint, float]]:
+        points = list(open_packet.data) if isinstance(open_packet.data, list) else [open_packet.data]
+        points.append(self.summarise(open_packet))
+
+        if self.per_gateway:
+            for reception in open_packet.receptions.values():
+                points.append(
+                    ReceptionPoint(
+                        **{
+                            **open_packet.base_data,
+                            "gateway_id": reception.gateway_id,
+                            "rx_snr": reception.rx_snr,
+                            "rx_rssi": reception.rx_rssi,
+                            "hop_limit": reception.hop_limit,
+                            "hop_start": reception.hop_start,
+                        },
+                        packet_type=open_packet.packet_type,
+                        hops_away=reception.hops_away,
+                    )
+                )
+
+        return [(point, open_packet.received_at) for point in points]
+
+    @staticmethod
+    def summarise(open_packet: OpenPacket) -> ReceptionSummaryPoint:
+        receptions = list(open_packet.receptions.values())
+        # A node uplinking its own packet reports no RSSI since it never heard it over the air
+        heard = [reception for reception in receptions if reception.rx_rssi]
+        snrs = [reception.rx_snr for reception in heard]
+        rssis = [reception.rx_rssi for reception in heard]
+        hops = [reception.hops_away for reception in receptions if reception.hops_away is not None]
+
+        return ReceptionSummaryPoint(
+            **open_packet.base_data,
+            packet_type=open_packet.packet_type,
+            gateway_count=len(receptions),
+            snr_best=max(snrs, default=None),
+            snr_worst=min(snrs, default=None),
+            rssi_best=max(rssis, default=None),
+            rssi_worst=min(rssis, default=None),
+            hops_away_min=min(hops) if hops else None,
+        )
@@ -0,0 +1,196 @@
+import json
+import os
+import time
+from dataclasses import fields
+from functools import lru_cache
+from typing import Optional, Union
+
+from bridger.config import ROLLUP_INTERVALS, ROLLUP_STATE_PATH
+from bridger.dataclasses import DeviceTelemetryPoint, PowerTelemetryPoint, SensorTelemetryPoint, TelemetryPoint
+from bridger.filters import split_setting
+from bridger.log import logger
+from bridger.utils import atomic_write_json
+
+ROLLUP_POINTS = (DeviceTelemetryPoint, SensorTelemetryPoint, PowerTelemetryPoint)
+# Packet metadata describes the reception rather than the node so it isn't rolled up
+PACKET_FIELDS = frozenset(f.name for f in fields(TelemetryPoint))
+NUMERIC_TYPES = (int, float, Optional[int], Optional[float])
+
+
+@lru_cache(maxsize=64)
+def numeric_field_names(cls) -> tuple[str, ...]:
+    """Influx fields of a point class typed as a number, leaving out packet metadata."""
+    return tuple(
+        f.name
+        for f in fields(cls)
+        if f.metadata.get("influx_kind") == "field" and f.name not in PACKET_FIELDS and f.type in NUMERIC_TYPES
+    )
+
+
+def numeric_fields(point) -> dict[str, float]:
+    """Influx fields of a point that hold a number, skipping unset values, booleans and packet metadata."""
+    values = {}
+    for name in numeric_field_names(type(point)):
+        value = getattr(point, name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def interval_label(seconds: int) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+class Accumulator:
+    __slots__ = ("count", "total", "minimum", "maximum", "last")
+
+    def __init__(self, value: float):
+        self.count = 1
+        self.total = self.minimum = self.maximum = self.last = value
+
+    @classmethod
+    def from_list(cls, values: list) -> "Accumulator":
+        accumulator = cls(0)
+        accumulator.count, accumulator.total, accumulator.minimum, accumulator.maximum, accumulator.last = values
+        return accumulator
+
+    def to_list(self) -> list:
+        return [self.count, self.total, self.minimum, self.maximum, self.last]
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.last = value
+
+
+class RollupEngine:
+    """Downsample device, sensor and power telemetry into per node min, mean, max and last values.
+
+    Windows are aligned to the clock, so the 15 minute window that starts at 12:00 covers 12:00 until 12:15, and each
+    node only holds one accumulator per field for every open window. A window is returned as an InfluxDB record,
+    stamped with its start time, once it has closed.
+
+    Windows still open at shutdown are saved to `path` and picked up again on start. Writing them early would stamp a
+    partial rollup with the window start, and the rollup written once the window closes would silently replace it.
+    """
+
+    def __init__(self, intervals: Optional[list[int]] = None, path: Optional[str] = ROLLUP_STATE_PATH):
+        if intervals is None:
+            intervals = [int(value) for value in split_setting(ROLLUP_INTERVALS)]
+
+        self.intervals = intervals
+        self.path = path
+        # interval -> window start -> (measurement, tags) -> field -> accumulator
+        self.windows: dict[int, dict[int, dict[tuple, dict[str, Accumulator]]]] = {interval: {} for interval in intervals}
+
+        self.load()
+
+    @staticmethod
+    def series(point: TelemetryPoint) -> tuple:
+        tags = [("_from", point._from)]
+        for f in fields(point):
+            if f.metadata.get("influx_kind") == "tag" and f.name not in PACKET_FIELDS:
+                value = getattr(point, f.name)
+                if value is not None:
+                    tags.append((f.name, value))
+        return point.measurement_name, tuple(tags)
+
+    def observe(self, data: Union[TelemetryPoint, list[TelemetryPoint], None], now: Optional[float] = None) -> None:
+        points = data if isinstance(data, list) else [data]
+        now = now or time.time()
+
+        for point in points:
+            if not isinstance(point, ROLLUP_POINTS):
+                continue
+
+            values = numeric_fields(point)
+            if not values:
+                continue
+
+            key = self.series(point)
+            for interval, windows in self.windows.items():
+                window = windows.setdefault(int(now // interval * interval), {})
+                accumulators = window.setdefault(key, {})
+
+                for name, value in values.items():
+                    accumulator = accumulators.get(name)
+                    if accumulator is None:
+                        accumulators[name] = Accumulator(value)
+                    else:
+                        accumulator.add(value)
+
+    def flush(self, now: Optional[float] = None) -> list[dict]:
+        """Return a record for every series in a window that has closed."""
+        now = now or time.time()
+        records = []
+
+        for interval, windows in self.windows.items():
+            label = interval_label(interval)
+
+            for start in [start for start in windows if start + interval <= now]:
+                for (measurement, tags), accumulators in windows.pop(start).items():
+                    record_fields = {}
+                    for name, accumulator in accumulators.items():
+                        record_fields[f"{name}_min"] = accumulator.minimum
+                        record_fields[f"{name}_mean"] = accumulator.total / accumulator.count
+                        record_fields[f"{name}_max"] = accumulator.maximum
+                        record_fields[f"{name}_last"] = accumulator.last
+                    record_fields["count"] = max(accumulator.count for accumulator in accumulators.values())
+
+                    records.append(
+                        {
+                            "measurement": measurement,
+                            "tags": {**dict(tags), "interval": label},
+                            "fields": record_fields,
+                            "time": start,
+                        }
+                    )
+
+        return records
+
+    def load(self) -> bool:
+        if self.path is None:
+            return False
+
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+
+            for interval, start, measurement, tags, accumulators in snapshot:
+                if interval not in self.windows:
+                    continue
+                key = (measurement, tuple(tuple(tag) for tag in tags))
+                self.windows[interval].setdefault(start, {})[key] = {
+                    name: Accumulator.from_list(values) for name, values in accumulators.items()
+                }
+
+            # Once loaded the windows are written by this run, reloading them after a crash would replace those rollups
+            os.remove(self.path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Unable to load open rollup windows from {self.path}: {e}")
+            return False
+
+        return True
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        snapshot = [
+            [interval, start, measurement, tags, {name: accumulator.to_list() for name, accumulator in accumulators.items()}]
+            for interval, windows in self.windows.items()
+            for start, window in windows.items()
+            for (measurement, tags), accumulators in window.items()
+        ]
+        try:
+            atomic_write_json(self.path, snapshot)
+        except OSError as e:
+            logger.warning(f"Unable to persist open rollup windows to {self.path}: {e}")
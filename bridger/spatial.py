@@ -0,0 +1,204 @@
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from bridger.config import SPATIAL_CELL_SIZE
+from bridger.dataclasses import PositionPoint, TelemetryPoint
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def precision_radius_m(precision_bits: Optional[int], latitude: float) -> float:
+    """Worst case distance from a reported position to the real one when the node truncates it to `precision_bits`.
+
+    Each coordinate is rounded to a multiple of 2^(32 - precision_bits) units of 1e-7 degrees, so the real position
+    can be anywhere in that square. Unset or full precision is treated as exact.
+    """
+    if not precision_bits or precision_bits >= 32:
+        return 0.0
+
+    cell_degrees = (1 << (32 - precision_bits)) * 1e-7
+    height_m = cell_degrees * KM_PER_DEGREE * 1000
+    width_m = height_m * math.cos(math.radians(latitude))
+    return math.hypot(height_m, width_m)
+
+
+@dataclass
+class NodePosition:
+    node_id: int
+    latitude: float
+    longitude: float
+    altitude: Optional[int]
+    precision_bits: Optional[int]
+    accuracy_m: float
+    updated: float
+
+    def to_dict(self, distance_km: Optional[float] = None) -> dict:
+        data = {
+            "node_id": f"!{self.node_id:08x}",
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "altitude": self.altitude,
+            "precision_bits": self.precision_bits,
+            "accuracy_m": round(self.accuracy_m, 1),
+            "updated": self.updated,
+        }
+        if distance_km is not None:
+            data["distance_km"] = round(distance_km, 3)
+        return data
+
+
+class SpatialIndex:
+    """Latest position of every node, bucketed into a grid of `cell_size` degree cells.
+
+    Updating a node only touches the cell it leaves and the cell it moves into. Nodes that stop sharing their position
+    (`precision_bits` of 0) or report 0,0 are removed.
+    """
+
+    def __init__(self, cell_size: float = SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.positions: dict[int, NodePosition] = {}
+        self.cells: dict[tuple[int, int], set[int]] = {}
+        self.version = 0
+
+    def cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self.cell_size), math.floor(longitude / self.cell_size)
+
+    def ingest(self, point: TelemetryPoint, now: Optional[float] = None) -> None:
+        if not isinstance(point, PositionPoint):
+            return
+
+        if point.precision_bits == 0 or (point.latitude_i == 0 and point.longitude_i == 0):
+            self.remove(point._from)
+            return
+
+        latitude, longitude = point.latitude_i * 1e-7, point.longitude_i * 1e-7
+        self.update(
+            NodePosition(
+                node_id=point._from,
+                latitude=latitude,
+                longitude=longitude,
+                altitude=point.altitude,
+                precision_bits=point.precision_bits,
+                accuracy_m=precision_radius_m(point.precision_bits, latitude),
+                updated=now or time.time(),
+            )
+        )
+
+    def update(self, position: NodePosition) -> None:
+        previous = self.positions.get(position.node_id)
+        cell = self.cell(position.latitude, position.longitude)
+
+        if previous is not None:
+            previous_cell = self.cell(previous.latitude, previous.longitude)
+            if previous_cell != cell:
+                self.discard_from_cell(previous_cell, position.node_id)
+
+        self.cells.setdefault(cell, set()).add(position.node_id)
+        self.positions[position.node_id] = position
+        self.version += 1
+
+    def remove(self, node_id: int) -> None:
+        position = self.positions.pop(node_id, None)
+        if position is not None:
+            self.discard_from_cell(self.cell(position.latitude, position.longitude), node_id)
+            self.version += 1
+
+    def discard_from_cell(self, cell: tuple[int, int], node_id: int) -> None:
+        nodes = self.cells.get(cell)
+        if nodes is not None:
+            nodes.discard(node_id)
+            if not nodes:
+                del self.cells[cell]
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> list[NodePosition]:
+        (min_row, min_col), (max_row, max_col) = self.cell(min_lat, min_lon), self.cell(max_lat, max_lon)
+
+        # Walk whichever is smaller, the cells covered by the box or the cells that hold nodes
+        if (max_row - min_row + 1) * (max_col - min_col + 1) <= len(self.cells):
+            cells = ((row, col) for row in range(min_row, max_row + 1) for col in range(min_col, max_col + 1))
+        else:
+            cells = (cell for cell in self.cells if min_row <= cell[0] <= max_row and min_col <= cell[1] <= max_col)
+
+        return [
+            position
+            for cell in cells
+            for position in (self.positions[node_id] for node_id in self.cells.get(cell, ()))
+            if min_lat <= position.latitude <= max_lat and min_lon <= position.longitude <= max_lon
+        ]
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 10, radius_km: Optional[float] = None
+    ) -> list[tuple[float, NodePosition]]:
+        """The `k` nodes closest to a point as (distance in km, position), searching outwards one ring of cells at a time."""
+        if k <= 0 or not self.positions:
+            return []
+
+        row, col = self.cell(latitude, longitude)
+        # Cells are narrowest at the highest latitude they cover, use that for a safe lower bound on distance
+        edge_latitude = min(abs(latitude) + self.cell_size, 89.9)
+        ring_km = self.cell_size * KM_PER_DEGREE * math.cos(math.radians(edge_latitude))
+        max_ring = math.ceil(360 / self.cell_size)
+
+        best: list[tuple[float, int]] = []  # Max heap of the k closest so far as (-distance, node_id)
+        seen = 0
+        ring = 0
+
+        while seen < len(self.positions) and ring <= max_ring:
+            # Anything outside the rings searched so far is at least this far away
+            bound = ring * ring_km - ring_km
+            if len(best) == k and -best[0][0] <= bound:
+                break
+            if radius_km is not None and bound > radius_km:
+                break
+            if (2 * ring + 1) ** 2 > len(self.cells):
+                # The rings would now cover more cells than hold any nodes, checking every node is cheaper
+                return self.scan(latitude, longitude, k, radius_km)
+
+            for cell in self.ring_cells(row, col, ring):
+                for node_id in self.cells.get(cell, ()):
+                    seen += 1
+                    position = self.positions[node_id]
+                    distance = haversine_km(latitude, longitude, position.latitude, position.longitude)
+                    if radius_km is not None and distance > radius_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, node_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, node_id))
+            ring += 1
+
+        return sorted(((-distance, self.positions[node_id]) for distance, node_id in best), key=lambda item: item[0])
+
+    def scan(
+        self, latitude: float, longitude: float, k: int, radius_km: Optional[float]
+    ) -> list[tuple[float, NodePosition]]:
+        distances = (
+            (haversine_km(latitude, longitude, position.latitude, position.longitude), position)
+            for position in self.positions.values()
+        )
+        if radius_km is not None:
+            distances = (item for item in distances if item[0] <= radius_km)
+        return heapq.nsmallest(k, distances, key=lambda item: item[0])
+
+    @staticmethod
+    def ring_cells(row: int, col: int, ring: int):
+        if ring == 0:
+            yield row, col
+            return
+
+        for offset in range(-ring, ring + 1):
+            yield row - ring, col + offset
+            yield row + ring, col + offset
+        for offset in range(-ring + 1, ring):
+            yield row + offset, col - ring
+            yield row + offset, col + ring
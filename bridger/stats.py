@@ -0,0 +1,41 @@
+import time
+from collections import Counter
+from typing import Optional
+
+from bridger.config import PACKET_STATS_INTERVAL
+from bridger.log import logger
+from bridger.mesh.handler_registry import drain_handler_stats
+
+
+class PacketStats:
+    """Count what happened to each packet and log the totals as a single line every `interval` seconds."""
+
+    def __init__(self, name: str, interval: int = PACKET_STATS_INTERVAL):
+        self.name = name
+        self.interval = interval
+        self.counts = Counter()
+        self.totals = Counter()
+        self.last_flush = time.monotonic()
+
+    def record(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+
+        if time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self, now: Optional[float] = None) -> dict[str, int]:
+        now = now or time.monotonic()
+        counts = dict(self.counts)
+
+        if counts:
+            summary = ", ".join(f"{outcome}={count}" for outcome, count in sorted(counts.items()))
+            logger.bind(**counts).info(f"{self.name} packets in the last {now - self.last_flush:.0f}s: {summary}")
+
+        handlers = drain_handler_stats()
+        if handlers:
+            logger.info(f"{self.name} handlers in the last {now - self.last_flush:.0f}s: {handlers}")
+
+        self.totals.update(self.counts)
+        self.counts.clear()
+        self.last_flush = now
+        return counts
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from typing import Callable, Iterable, Optional, Union
+
+import aiomqtt
+from google.protobuf.message import DecodeError
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.config import MQTT_BROKER, MQTT_PASS, MQTT_PORT, MQTT_TOPIC, MQTT_USER, STREAM_CLIENT_BUFFER
+from bridger.dataclasses import TelemetryPoint
+from bridger.deduplication import PacketDeduplicator
+from bridger.filters import PacketFilter
+from bridger.log import logger
+from bridger.mesh import PBPacketProcessor, ProcessStatus, pki_engine
+from bridger.utils import should_ignore_pki_message
+
+MAX_RECONNECT_DELAY = 60
+
+
+def serialize_point(point: TelemetryPoint) -> str:
+    return json.dumps({"measurement": point.measurement_name, **point.to_dict()})
+
+
+class Subscription:
+    def __init__(
+        self,
+        measurements: Optional[Iterable[str]] = None,
+        nodes: Optional[Iterable[int]] = None,
+        gateways: Optional[Iterable[str]] = None,
+        maxsize: int = STREAM_CLIENT_BUFFER,
+    ):
+        self.measurements = frozenset(measurements) if measurements else None
+        self.nodes = frozenset(nodes) if nodes else None
+        self.gateways = frozenset(gateways) if gateways else None
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, point: TelemetryPoint) -> bool:
+        if self.measurements is not None and point.measurement_name not in self.measurements:
+            return False
+        if self.nodes is not None and point._from not in self.nodes:
+            return False
+        if self.gateways is not None and point.gateway_id not in self.gateways:
+            return False
+        return True
+
+    def put(self, payload: str) -> None:
+        # A slow client loses its oldest buffered points rather than holding up everyone else
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+
+class PointBroadcaster:
+    """Fans decoded points out to every matching subscription and to in-process listeners."""
+
+    def __init__(self):
+        self.subscriptions: set[Subscription] = set()
+        self.listeners: list[Callable[[TelemetryPoint], None]] = []
+
+    def subscribe(self, **filters) -> Subscription:
+        subscription = Subscription(**filters)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+        if subscription.dropped:
+            logger.info(f"Stream client disconnected after dropping {subscription.dropped} points")
+
+    def add_listener(self, listener: Callable[[TelemetryPoint], None]) -> None:
+        self.listeners.append(listener)
+
+    def publish(self, data: Union[TelemetryPoint, list[TelemetryPoint], None]) -> None:
+        if not data:
+            return
+
+        for point in data if isinstance(data, list) else [data]:
+            for listener in self.listeners:
+                try:
+                    listener(point)
+                except Exception as e:
+                    logger.exception(f"Stream listener {listener} failed: {e}")
+
+            # Serialize at most once per point no matter how many clients receive it
+            payload = None
+            for subscription in self.subscriptions:
+                if subscription.matches(point):
+                    payload = payload or serialize_point(point)
+                    subscription.put(payload)
+
+
+class LivePacketFeed:
+    """A single MQTT subscription that decodes packets and publishes them to a broadcaster."""
+
+    def __init__(self, broadcaster: PointBroadcaster):
+        self.broadcaster = broadcaster
+        self.deduplicator = PacketDeduplicator(maxlen=100)
+        self.packet_filter = PacketFilter.from_config()
+        self.envelope_listeners: list[Callable[[ServiceEnvelope], None]] = []
+        self.reconnect_delay = 1
+
+    def add_envelope_listener(self, listener: Callable[[ServiceEnvelope], None]) -> None:
+        """Call `listener` with every envelope, including copies of a packet uplinked by other gateways."""
+        self.envelope_listeners.append(listener)
+
+    def handle_payload(self, topic: str, payload: bytes) -> None:
+        if (should_ignore_pki_message(topic) and not pki_engine.enabled) or not self.packet_filter.allow_topic(topic):
+            return
+
+        try:
+            service_envelope = ServiceEnvelope.FromString(payload)
+
+            for listener in self.envelope_listeners:
+                try:
+                    listener(service_envelope)
+                except Exception as e:
+                    logger.exception(f"Envelope listener {listener} failed: {e}")
+
+            if not self.deduplicator.should_process(service_envelope):
+                return
+
+            result = PBPacketProcessor(service_envelope, auto_decrypt=False).process(self.packet_filter.allow_portnum)
+            if result.status is ProcessStatus.DECODED:
+                self.broadcaster.publish(result.data)
+        except DecodeError:
+            logger.bind(topic=topic).debug("Skipping undecodable packet for live stream")
+        except Exception as e:
+            # One bad packet must not end the feed every HTTP endpoint is built from
+            logger.bind(topic=topic).exception(f"Error handling packet for live stream: {e}")
+
+    async def run(self) -> None:
+        """Keep the feed subscribed for as long as the service runs, reconnecting with a capped backoff."""
+        while True:
+            try:
+                await self.subscribe()
+            except aiomqtt.MqttError as e:
+                logger.warning(f"Live feed lost its MQTT connection: {e}")
+            except OSError as e:
+                logger.warning(f"Live feed could not connect to MQTT: {e}")
+
+            logger.info(f"Live feed reconnecting in {self.reconnect_delay}s")
+            await asyncio.sleep(self.reconnect_delay)
+            self.reconnect_delay = min(self.reconnect_delay * 2, MAX_RECONNECT_DELAY)
+
+    async def subscribe(self) -> None:
+        logger.info(f"Live feed connecting to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
+        async with aiomqtt.Client(
+            MQTT_BROKER,
+            int(MQTT_PORT),
+            username=MQTT_USER,
+            password=MQTT_PASS,
+            clean_session=True,
+        ) as client:
+            await client.subscribe(MQTT_TOPIC)
+            logger.info(f"Live feed subscribed to {MQTT_TOPIC}")
+            self.reconnect_delay = 1
+
+            async for mqtt_message in client.messages:
+                self.handle_payload(str(mqtt_message.topic), mqtt_message.payload)
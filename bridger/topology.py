@@ -0,0 +1,122 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from bridger.config import TOPOLOGY_EDGE_MAX_AGE
+from bridger.dataclasses import NeighborInfoPacket, TelemetryPoint, TracerouteHopPoint
+
+PRUNE_INTERVAL = 60
+
+
+def node_key(node_id: int) -> str:
+    return f"!{node_id:08x}"
+
+
+@dataclass
+class TopologyEdge:
+    source: int
+    target: int
+    snr: Optional[float]
+    first_seen: float
+    last_seen: float
+    count: int = 1
+    snr_mean: Optional[float] = None
+    snr_samples: int = 0
+
+    def observe_snr(self, snr: Optional[float]) -> None:
+        if snr is None:
+            return
+        self.snr = snr
+        self.snr_samples += 1
+        self.snr_mean = snr if self.snr_mean is None else self.snr_mean + (snr - self.snr_mean) / self.snr_samples
+
+
+class TopologyGraph:
+    """Mesh topology kept up to date from neighborinfo and traceroute points.
+
+    Edges are directed from the transmitting node to the node that heard it, with the latest and mean SNR measured by the
+    receiver.
+    Edges that have not been seen for `max_age` seconds are dropped.
+    """
+
+    def __init__(self, max_age: int = TOPOLOGY_EDGE_MAX_AGE):
+        self.max_age = max_age
+        self.nodes: dict[int, float] = {}
+        self.edges: dict[tuple[int, int], TopologyEdge] = {}
+        self.version = 0
+        self.last_prune = 0.0
+
+    def add_edge(
+        self, source: Optional[int], target: Optional[int], snr: Optional[float], now: Optional[float] = None
+    ) -> None:
+        # Neighbor ids are left out of packets when they are zero or missing, there is no node to connect
+        if source is None or target is None or source == target:
+            return
+
+        now = now or time.time()
+        edge = self.edges.get((source, target))
+
+        if edge is None:
+            edge = self.edges[(source, target)] = TopologyEdge(source, target, None, first_seen=now, last_seen=now)
+        else:
+            edge.last_seen = now
+            edge.count += 1
+        edge.observe_snr(snr)
+
+        self.nodes[source] = now
+        self.nodes[target] = now
+        self.version += 1
+
+    def ingest(self, point: TelemetryPoint, now: Optional[float] = None) -> None:
+        now = now or time.time()
+
+        if isinstance(point, NeighborInfoPacket):
+            self.add_edge(point.neighbor_id, point.node_id, point.snr, now)
+        elif isinstance(point, TracerouteHopPoint):
+            self.add_edge(point.hop_from, point.hop_to, point.snr, now)
+
+        if now - self.last_prune >= PRUNE_INTERVAL:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        cutoff = now - self.max_age
+        self.last_prune = now
+
+        expired = [key for key, edge in self.edges.items() if edge.last_seen < cutoff]
+        for key in expired:
+            del self.edges[key]
+
+        connected = {node for key in self.edges for node in key}
+        for node in [node for node in self.nodes if node not in connected]:
+            del self.nodes[node]
+
+        if expired:
+            self.version += 1
+        return len(expired)
+
+    def to_node_graph(self) -> dict:
+        """Nodes and edges in the shape the Grafana node graph panel expects."""
+        degree = dict.fromkeys(self.nodes, 0)
+        for source, target in self.edges:
+            degree[source] += 1
+            degree[target] += 1
+
+        nodes = [
+            {"id": node_key(node), "title": node_key(node), "mainstat": degree[node], "last_seen": int(last_seen)}
+            for node, last_seen in self.nodes.items()
+        ]
+        edges = [
+            {
+                "id": f"{node_key(edge.source)}_{node_key(edge.target)}",
+                "source": node_key(edge.source),
+                "target": node_key(edge.target),
+                "mainstat": edge.snr,
+                "secondarystat": edge.count,
+                "snr_mean": edge.snr_mean,
+                "first_seen": int(edge.first_seen),
+                "last_seen": int(edge.last_seen),
+            }
+            for edge in self.edges.values()
+        ]
+        return {"nodes": nodes, "edges": edges}
@@ -1,6 +1,30 @@
+import json
+import os
+import tempfile
+
 from bridger.config import MQTT_TOPIC
 
 
 def should_ignore_pki_message(topic: str) -> bool:
     pki_topic = MQTT_TOPIC.removesuffix("/#") + "/PKI/"
     return topic.startswith(pki_topic)
+
+
+def parse_node_id(value: str) -> int:
+    """Parse a node ID given either as `!hex` or as a decimal node number."""
+    value = value.strip()
+    if value.startswith("!"):
+        return int(value[1:], 16)
+    return int(value)
+
+
+def atomic_write_json(path: str, data) -> None:
+    """Write JSON to a temporary file next to `path` and rename it into place so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+        json.dump(data, f)
+        temp_path = f.name
+
+    os.replace(temp_path, path)
@@ -0,0 +1,43 @@
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.dataclasses import RangeTestPoint
+from bridger.mesh.handler_registry import handlers_for
+from bridger.mesh.handlers.rangetest import RangeTestHandler
+
+
+class TestRangeTestHandler:
+    def setup_method(self):
+        self.base_data = {
+            "_from": 1,
+            "to": 2,
+            "packet_id": 1234,
+            "rx_time": 1725990585,
+            "rx_snr": 5.0,
+            "rx_rssi": -50,
+            "hop_limit": 3,
+            "hop_start": 3,
+            "channel_id": "test",
+            "gateway_id": "test_gateway",
+        }
+
+    def handle(self, payload_dict):
+        return RangeTestHandler().handle(
+            packet=None, payload_dict=payload_dict, base_data={**self.base_data, **payload_dict}
+        )
+
+    def test_sequence(self):
+        result = self.handle({"text": "seq 42"})
+        assert isinstance(result, RangeTestPoint)
+        assert result.sequence == 42
+
+    def test_other_text(self):
+        assert self.handle({"text": "hello"}).sequence is None
+        assert self.handle({"data": "AAE="}) is None
+
+    def test_malformed_sequence(self):
+        for text in ("seq ²", "seq ٣", "seq -1", "seq 1 2"):
+            assert self.handle({"text": text}).sequence is None
+
+
+def test_handler_is_registered():
+    assert handlers_for(PortNum.RANGE_TEST_APP)
@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+from meshtastic.protobuf.mesh_pb2 import Routing
+from meshtastic.protobuf.portnums_pb2 import PortNum
+from meshtastic.protobuf.storeforward_pb2 import StoreAndForward
+
+from bridger.dataclasses import AdminPoint, RoutingPoint, StoreForwardPoint
+from bridger.mesh.handler_registry import handlers_for
+from bridger.mesh.handlers.admin import AdminHandler
+from bridger.mesh.handlers.routing import RoutingHandler
+from bridger.mesh.handlers.storeforward import StoreForwardHandler
+
+
+class HandlerTest:
+    def setup_method(self):
+        self.base_data = {
+            "_from": 1,
+            "to": 2,
+            "packet_id": 1234,
+            "rx_time": 1725990585,
+            "rx_snr": 5.0,
+            "rx_rssi": -50,
+            "hop_limit": 3,
+            "hop_start": 3,
+            "channel_id": "test",
+            "gateway_id": "test_gateway",
+        }
+
+    def handle(self, handler_cls, payload_dict, packet=None):
+        return handler_cls().handle(packet=packet, payload_dict=payload_dict, base_data={**self.base_data, **payload_dict})
+
+
+class TestRoutingHandler(HandlerTest):
+    def test_ack(self):
+        packet = MagicMock()
+        packet.decoded.request_id = 4321
+        result = self.handle(RoutingHandler, {"error_reason": Routing.Error.NONE}, packet=packet)
+        assert isinstance(result, RoutingPoint)
+        assert (result.variant, result.error_reason, result.ack, result.request_id) == ("error_reason", "NONE", True, 4321)
+
+    def test_nak(self):
+        result = self.handle(RoutingHandler, {"error_reason": Routing.Error.MAX_RETRANSMIT})
+        assert (result.error_reason, result.ack, result.request_id) == ("MAX_RETRANSMIT", False, None)
+
+    def test_route_request(self):
+        result = self.handle(RoutingHandler, {"route_request": {"route": [3]}})
+        assert result.variant == "route_request"
+        assert result.error_reason is None
+
+    def test_empty(self):
+        assert self.handle(RoutingHandler, {}) is None
+
+
+class TestAdminHandler(HandlerTest):
+    def test_only_the_variant_is_kept(self):
+        payload = {"session_passkey": "c2VjcmV0", "set_owner": {"long_name": "Secret"}}
+        result = self.handle(AdminHandler, payload)
+        assert isinstance(result, AdminPoint)
+        assert result.variant == "set_owner"
+        assert "c2VjcmV0" not in str(result.to_dict())
+        assert "Secret" not in str(result.to_dict())
+
+    def test_passkey_only(self):
+        assert self.handle(AdminHandler, {"session_passkey": "c2VjcmV0"}) is None
+
+
+class TestStoreForwardHandler(HandlerTest):
+    def test_stats(self):
+        payload = {
+            "rr": StoreAndForward.RequestResponse.ROUTER_STATS,
+            "stats": {"messages_total": 10, "messages_saved": 4, "heartbeat": True},
+        }
+        result = self.handle(StoreForwardHandler, payload)
+        assert isinstance(result, StoreForwardPoint)
+        assert (result.rr, result.messages_total, result.messages_saved) == ("ROUTER_STATS", 10, 4)
+
+    def test_heartbeat(self):
+        payload = {"rr": StoreAndForward.RequestResponse.ROUTER_HEARTBEAT, "heartbeat": {"period": 900}}
+        result = self.handle(StoreForwardHandler, payload)
+        assert (result.rr, result.period) == ("ROUTER_HEARTBEAT", 900)
+
+    def test_text_is_dropped(self):
+        result = self.handle(StoreForwardHandler, {"rr": StoreAndForward.RequestResponse.ROUTER_TEXT_DIRECT, "text": "aGk="})
+        assert not hasattr(result, "text")
+
+
+def test_handlers_are_registered():
+    for portnum in (PortNum.ROUTING_APP, PortNum.ADMIN_APP, PortNum.STORE_FORWARD_APP):
+        assert handlers_for(portnum)
@@ -1,5 +1,27 @@
-from bridger.dataclasses import DeviceTelemetryPoint, PowerTelemetryPoint, SensorTelemetryPoint
-from bridger.mesh.handlers.telemetry import TelemetryHandler
+import math
+
+from google.protobuf.json_format import MessageToDict
+from meshtastic.protobuf.mesh_pb2 import MeshPacket
+from meshtastic.protobuf.portnums_pb2 import PortNum
+from meshtastic.protobuf.telemetry_pb2 import DeviceMetrics, Telemetry
+
+from bridger.dataclasses import (
+    AirQualityPoint,
+    DeviceTelemetryPoint,
+    HealthPoint,
+    HostMetricsPoint,
+    LocalStatsPoint,
+    PowerTelemetryPoint,
+    SensorTelemetryPoint,
+)
+from bridger.mesh.handlers.telemetry import FIELD_TABLES, TelemetryHandler, shortest_float
+
+
+def telemetry_packet(telemetry: Telemetry) -> MeshPacket:
+    packet = MeshPacket()
+    packet.decoded.portnum = PortNum.TELEMETRY_APP
+    packet.decoded.payload = telemetry.SerializeToString()
+    return packet
 
 
 class TestTelemetryHandler:
@@ -17,56 +39,122 @@ class TestTelemetryHandler:
             "gateway_id": "test_gateway",
         }
 
-    def test_environment_metrics(self):
-        handler = TelemetryHandler(
-            packet=None,
-            payload_dict={"environment_metrics": {"temperature": 25.3, "humidity": 50.2}},
-            base_data=self.base_data.copy(),
+    def handle(self, telemetry: Telemetry):
+        return TelemetryHandler().handle(
+            packet=telemetry_packet(telemetry), payload_dict={}, base_data=self.base_data.copy()
         )
-        result = handler.handle()
+
+    def test_environment_metrics(self):
+        telemetry = Telemetry()
+        telemetry.environment_metrics.temperature = 25.3
+        telemetry.environment_metrics.lux = 120.5
+        result = self.handle(telemetry)
         assert isinstance(result, SensorTelemetryPoint)
         assert result.temperature == 25.3
+        assert result.lux == 120.5
+        assert result.relative_humidity is None
 
     def test_device_metrics(self):
-        handler = TelemetryHandler(
-            packet=None,
-            payload_dict={"device_metrics": {"voltage": 3.7, "battery_level": 85}},
-            base_data=self.base_data.copy(),
-        )
-        result = handler.handle()
+        telemetry = Telemetry()
+        telemetry.device_metrics.voltage = 3.7
+        telemetry.device_metrics.battery_level = 85
+        result = self.handle(telemetry)
         assert isinstance(result, DeviceTelemetryPoint)
+        # Single precision floats come back in their short form
         assert result.voltage == 3.7
+        assert result.battery_level == 85
+
+    def test_zero_is_kept_when_set(self):
+        telemetry = Telemetry()
+        telemetry.device_metrics.battery_level = 0
+        assert self.handle(telemetry).battery_level == 0
+
+    def test_non_finite_floats_are_dropped(self):
+        telemetry = Telemetry()
+        telemetry.environment_metrics.temperature = float("nan")
+        telemetry.environment_metrics.lux = float("inf")
+        telemetry.environment_metrics.relative_humidity = 40.5
+        result = self.handle(telemetry)
+        assert (result.temperature, result.lux, result.relative_humidity) == (None, None, 40.5)
+
+        telemetry = Telemetry()
+        telemetry.power_metrics.ch1_voltage = float("-inf")
+        telemetry.power_metrics.ch1_current = 0.5
+        (point,) = self.handle(telemetry)
+        assert (point.voltage, point.current) == (None, 0.5)
 
     def test_power_metrics_complete(self):
-        payload = {
-            "power_metrics": {
-                "ch1_voltage": 5.0,
-                "ch1_current": 0.4,
-                "ch2_voltage": 6.1,
-                "ch2_current": 0.8,
-            }
-        }
-        handler = TelemetryHandler(packet=None, payload_dict=payload, base_data=self.base_data.copy())
-        result = handler.handle()
+        telemetry = Telemetry()
+        telemetry.power_metrics.ch1_voltage = 5.0
+        telemetry.power_metrics.ch1_current = 0.4
+        telemetry.power_metrics.ch2_voltage = 6.1
+        telemetry.power_metrics.ch2_current = 0.8
+        result = self.handle(telemetry)
         assert isinstance(result, list)
         assert all(isinstance(p, PowerTelemetryPoint) for p in result)
-        assert len(result) == 2
+        assert [(p.channel, p.voltage, p.current) for p in result] == [("ch1", 5.0, 0.4), ("ch2", 6.1, 0.8)]
 
     def test_power_metrics_incomplete(self):
-        payload = {
-            "power_metrics": {
-                "ch1_voltage": 5.0,
-                # Missing ch1_current
-                "ch2_current": 0.8,
-                # Missing ch2_voltage
-                "ch3_voltage": 4.1,
-                "ch3_current": 0.5,
-            }
-        }
-        handler = TelemetryHandler(packet=None, payload_dict=payload, base_data=self.base_data.copy())
-        result = handler.handle()
+        telemetry = Telemetry()
+        telemetry.power_metrics.ch1_voltage = 5.0
+        telemetry.power_metrics.ch2_current = 0.8
+        telemetry.power_metrics.ch3_voltage = 4.1
+        telemetry.power_metrics.ch3_current = 0.5
+        result = self.handle(telemetry)
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0].channel == "ch3"
         assert result[0].voltage == 4.1
         assert result[0].current == 0.5
+
+    def test_air_quality_metrics(self):
+        telemetry = Telemetry()
+        telemetry.air_quality_metrics.pm25_standard = 12
+        telemetry.air_quality_metrics.co2 = 450
+        result = self.handle(telemetry)
+        assert isinstance(result, AirQualityPoint)
+        assert (result.pm25_standard, result.co2, result.pm10_standard) == (12, 450, None)
+
+    def test_local_stats(self):
+        telemetry = Telemetry()
+        telemetry.local_stats.num_packets_rx = 100
+        telemetry.local_stats.noise_floor = -110
+        result = self.handle(telemetry)
+        assert isinstance(result, LocalStatsPoint)
+        assert (result.num_packets_rx, result.noise_floor, result.num_packets_rx_bad) == (100, -110, 0)
+
+    def test_health_and_host_metrics(self):
+        telemetry = Telemetry()
+        telemetry.health_metrics.heart_bpm = 60
+        assert isinstance(self.handle(telemetry), HealthPoint)
+
+        telemetry = Telemetry()
+        telemetry.host_metrics.load1 = 150
+        telemetry.host_metrics.user_string = "private"
+        result = self.handle(telemetry)
+        assert isinstance(result, HostMetricsPoint)
+        assert result.load1 == 150
+        assert "private" not in str(result.to_dict())
+
+    def test_no_variant(self):
+        assert self.handle(Telemetry(time=1)) is None
+
+    def test_every_point_field_is_mapped(self):
+        # A point field that doesn't match the metrics message would silently never be filled in
+        base_fields = set(self.base_data)
+        for point_cls, table in FIELD_TABLES.values():
+            point_fields = {name for name in point_cls.__dataclass_fields__ if name not in base_fields}
+            if point_cls is SensorTelemetryPoint:
+                point_fields.discard("channel_utilization")
+            assert point_fields == {name for name, _, _ in table}, point_cls.__name__
+
+
+def test_shortest_float_matches_message_to_dict():
+    for value in (3.7, 0.1, 4.199999809265137, 1e-7, 123456.789, -20.25, 0.0):
+        metrics = DeviceMetrics(voltage=value)
+        assert shortest_float(metrics.voltage) == MessageToDict(metrics)["voltage"]
+
+
+def test_shortest_float_non_finite():
+    assert math.isnan(shortest_float(float("nan")))
+    assert shortest_float(float("inf")) == float("inf")
@@ -0,0 +1,59 @@
+from bridger.dataclasses import TracerouteHopPoint, TraceroutePoint
+from bridger.mesh.handlers.traceroute import TracerouteHandler, decode_route
+
+
+def test_decode_route_request_in_flight():
+    assert decode_route(0x0A, 0x0B, [0x01], [8]) == [(0, 0x0A, 0x01, 2.0)]
+
+
+def test_decode_route_reached_destination():
+    assert decode_route(0x0A, 0x0B, [0x01], [8, -128]) == [(0, 0x0A, 0x01, 2.0), (1, 0x01, 0x0B, None)]
+
+
+def test_decode_route_missing_snr():
+    assert decode_route(0x0A, 0x0B, [0x01, 0x02], [-6]) == [(0, 0x0A, 0x01, -1.5), (1, 0x01, 0x02, None)]
+
+
+class TestTracerouteHandler:
+    def setup_method(self):
+        self.base_data = {
+            "_from": 0x0A,
+            "to": 0x0B,
+            "packet_id": 1234,
+            "rx_time": 1725990585,
+            "rx_snr": 5.0,
+            "rx_rssi": -50,
+            "hop_limit": 3,
+            "hop_start": 3,
+            "channel_id": "test",
+            "gateway_id": "test_gateway",
+        }
+
+    def handle(self, **route):
+        return TracerouteHandler().handle(packet=None, payload_dict={}, base_data={**self.base_data, **route})
+
+    def test_request(self):
+        traceroute, *result = self.handle(route=[0x01], snr_towards=[8])
+        assert isinstance(traceroute, TraceroutePoint)
+        assert (traceroute.hops_towards, traceroute.hops_back) == (1, None)
+        assert len(result) == 1
+        assert isinstance(result[0], TracerouteHopPoint)
+        assert (result[0].direction, result[0].hop_from, result[0].hop_to, result[0].snr) == ("towards", 0x0A, 0x01, 2.0)
+        assert result[0].packet_id == 1234
+
+    def test_reply(self):
+        # A reply travels from the destination (0x0A) back to the origin (0x0B)
+        traceroute, *result = self.handle(route=[0x01], snr_towards=[8, 12], route_back=[0x02], snr_back=[4, -128])
+        assert (traceroute.hops_towards, traceroute.hops_back) == (2, 2)
+        assert [(p.direction, p.hop, p.hop_from, p.hop_to, p.snr) for p in result] == [
+            ("towards", 0, 0x0B, 0x01, 2.0),
+            ("towards", 1, 0x01, 0x0A, 3.0),
+            ("back", 0, 0x0A, 0x02, 1.0),
+            ("back", 1, 0x02, 0x0B, None),
+        ]
+
+    def test_no_hops(self):
+        # A traceroute to a direct neighbour that hasn't been answered yet still gets its traceroute row
+        (traceroute,) = self.handle()
+        assert isinstance(traceroute, TraceroutePoint)
+        assert traceroute.hops_towards == 0
@@ -0,0 +1,36 @@
+import os
+from unittest.mock import patch
+
+from meshtastic.protobuf.mesh_pb2 import User
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.mesh import benchmark
+
+CAPTURE = os.path.join(os.path.dirname(__file__), "fixtures", "capture.txt")
+
+
+def test_load_capture_skips_comments():
+    assert len(benchmark.load_capture(CAPTURE)) == 9
+
+
+def test_main(capsys):
+    results = benchmark.main([CAPTURE, "--rounds", "2"])
+
+    assert results["packets"] == 18
+    assert results["statuses"] == {"decoded": 16, "pki": 2}
+    assert results["max_peak_bytes"] > 0
+    assert "us per packet" in capsys.readouterr().out
+
+
+def test_learned_keys_stay_in_memory():
+    envelope = ServiceEnvelope.FromString(benchmark.load_capture(CAPTURE)[1])
+    user = User.FromString(envelope.packet.decoded.payload)
+    user.public_key = bytes(range(32))
+    envelope.packet.decoded.payload = user.SerializeToString()
+
+    with patch("bridger.mesh.pki_engine") as pki_engine:
+        assert benchmark.process_payload(envelope.SerializeToString()) == "decoded"
+
+    pki_engine.learn_public_key.assert_not_called()
+    assert benchmark.PKI_ENGINE.public_keys[getattr(envelope.packet, "from")] == bytes(range(32))
+    assert benchmark.PKI_ENGINE.public_keys.path is None
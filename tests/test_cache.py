@@ -0,0 +1,84 @@
+import gzip
+from unittest.mock import MagicMock
+
+import brotli
+
+from bridger.cache import CachedResponse, ResponseCache, accepted_encodings
+
+BODY = b'{"names": "' + b"x" * 1024 + b'"}'
+
+
+def make_request(**headers):
+    request = MagicMock()
+    request.headers = headers
+    return request
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("gzip;q=1.0, br;q=0") == {"gzip"}
+    assert accepted_encodings("") == set()
+
+
+def test_cached_response_variants():
+    cached = CachedResponse.build(BODY, "application/json")
+    assert brotli.decompress(cached.encoded["br"]) == BODY
+    assert gzip.decompress(cached.encoded["gzip"]) == BODY
+
+
+def test_small_bodies_are_not_compressed():
+    cached = CachedResponse.build(b"[]", "application/json")
+    response = cached.respond(make_request(**{"Accept-Encoding": "gzip, br"}), 60)
+    assert cached.encoded == {}
+    assert "Content-Encoding" not in response.headers
+
+
+def test_respond_picks_preferred_encoding():
+    cached = CachedResponse.build(BODY, "application/json")
+
+    response = cached.respond(make_request(**{"Accept-Encoding": "gzip"}), 60)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+
+    response = cached.respond(make_request(**{"Accept-Encoding": "gzip, br"}), 60)
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_respond_not_modified():
+    cached = CachedResponse.build(BODY, "application/json")
+    etag = cached.respond(make_request(), 60).headers["ETag"]
+
+    assert cached.respond(make_request(**{"If-None-Match": etag}), 60).status == 304
+    # The gzip representation has a different ETag so the plain one doesn't match it
+    assert cached.respond(make_request(**{"If-None-Match": etag, "Accept-Encoding": "gzip"}), 60).status == 200
+
+
+def test_response_cache_rebuilds_on_new_version():
+    cache = ResponseCache()
+    build = MagicMock(return_value=(BODY, "application/json"))
+
+    first = cache.get("displaynames", 1, build)
+    assert cache.get("displaynames", 1, build) is first
+    assert build.call_count == 1
+
+    assert cache.get("displaynames", 2, build) is not first
+    assert build.call_count == 2
+
+    cache.invalidate()
+    assert cache.entries == {}
+
+
+def test_response_cache_drops_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    build = MagicMock(return_value=(BODY, "application/json"))
+
+    cache.get(1, 1, build)
+    cache.get(2, 1, build)
+    cache.get(1, 1, build)
+    cache.get(3, 1, build)
+    assert list(cache.entries) == [1, 3]
+
+
+def test_respond_extra_vary_headers():
+    response = CachedResponse.build(BODY, "text/plain").respond(make_request(), 60, vary=("User-Agent",))
+    assert response.headers["Vary"] == "Accept, Accept-Encoding, User-Agent"
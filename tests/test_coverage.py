@@ -0,0 +1,104 @@
+import struct
+import zlib
+
+import pytest
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.coverage import CoverageMap, encode_png, tile_for
+from bridger.spatial import NodePosition, SpatialIndex
+
+AUSTIN = (30.2672, -97.7431)
+
+
+def envelope(gateway_id="!00000001", rx_snr=5.0, rx_rssi=-80, hop_limit=3, hop_start=3, node_id=0x0A):
+    service_envelope = ServiceEnvelope(channel_id="LongFast", gateway_id=gateway_id)
+    packet = service_envelope.packet
+    setattr(packet, "from", node_id)
+    packet.rx_snr = rx_snr
+    packet.rx_rssi = rx_rssi
+    packet.hop_limit = hop_limit
+    packet.hop_start = hop_start
+    return service_envelope
+
+
+@pytest.fixture
+def positions():
+    index = SpatialIndex()
+    index.update(NodePosition(0x0A, *AUSTIN, None, None, 0.0, updated=1000))
+    return index
+
+
+@pytest.fixture
+def coverage(positions):
+    return CoverageMap(positions, zoom=12, max_position_age=3600, path=None)
+
+
+def test_tile_for():
+    assert tile_for(*AUSTIN, 12) == (935, 1686)
+    assert tile_for(0, 0, 0) == (0, 0)
+
+
+def test_observe_bins_direct_receptions(coverage):
+    assert coverage.observe(envelope(rx_snr=2.0), now=1100)
+    assert coverage.observe(envelope(rx_snr=6.5, rx_rssi=-70), now=1200)
+    assert coverage.observe(envelope(gateway_id="!00000002", rx_snr=-10, rx_rssi=-120), now=1200)
+
+    tile = coverage.tile(12, 935, 1686)
+    assert tile["count"] == 3
+    assert tile["gateways"]["!00000001"] == {"count": 2, "snr_best": 6.5, "rssi_best": -70, "last_heard": 1200}
+
+
+def test_observe_skips_unusable_receptions(coverage, positions):
+    assert not coverage.observe(envelope(hop_limit=1), now=1100)
+    assert not coverage.observe(envelope(node_id=0x0B), now=1100)
+    assert not coverage.observe(envelope(), now=5000)
+
+    positions.update(NodePosition(0x0B, *AUSTIN, None, 10, 20000.0, updated=1000))
+    assert not coverage.observe(envelope(node_id=0x0B), now=1100)
+    assert coverage.tiles == {}
+
+
+def test_lower_zoom_merges_children(coverage, positions):
+    positions.update(NodePosition(0x0B, 30.35, -97.70, None, None, 0.0, updated=1000))
+    coverage.observe(envelope(rx_snr=2.0), now=1100)
+    coverage.observe(envelope(node_id=0x0B, rx_snr=8.0), now=1100)
+    assert len(coverage.tiles) == 2
+
+    tile = coverage.tile(8, 935 >> 4, 1686 >> 4)
+    assert tile["gateways"]["!00000001"]["count"] == 2
+    assert tile["gateways"]["!00000001"]["snr_best"] == 8.0
+
+    with pytest.raises(ValueError):
+        coverage.tile(13, 0, 0)
+
+
+def test_render_png(coverage):
+    coverage.observe(envelope(rx_snr=10.0), now=1100)
+    png = coverage.render_png(4, 935 >> 8, 1686 >> 8)
+
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    assert (width, height) == (256, 256)
+
+    with pytest.raises(ValueError):
+        coverage.render_png(3, 0, 0)
+
+
+def test_encode_png_roundtrip():
+    png = encode_png(2, 1, bytes([255, 0, 0, 255, 0, 255, 0, 128]))
+    length = struct.unpack(">I", png[33:37])[0]
+    raw = zlib.decompress(png[41 : 41 + length])
+    assert raw == b"\x00" + bytes([255, 0, 0, 255, 0, 255, 0, 128])
+
+
+def test_save_and_load(tmp_path, positions):
+    path = tmp_path / "coverage.json"
+    coverage = CoverageMap(positions, zoom=12, max_position_age=3600, path=path, save_interval=3600)
+    coverage.observe(envelope(), now=1100)
+    coverage.save()
+
+    restored = CoverageMap(positions, zoom=12, path=path)
+    assert restored.tile(12, 935, 1686) == coverage.tile(12, 935, 1686)
+
+    # Tiles stored at another zoom level can't be reused
+    assert CoverageMap(positions, zoom=10, path=path).tiles == {}
@@ -1,6 +1,13 @@
+import base64
+import hashlib
+
 import pytest
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
 
-from bridger.crypto import CryptoEngine
+from bridger.crypto import CryptoEngine, PKICryptoEngine
 
 
 @pytest.fixture
@@ -59,3 +66,64 @@ def test_nonce_generation(crypto_engine):
     crypto_engine.init_nonce(from_node, packet_id)
 
     assert crypto_engine.nonce == expected_nonce, "Nonce generation is incorrect"
+
+
+def test_decrypt_multiple_blocks(crypto_engine):
+    # The counter is the whole nonce read big endian, with every low byte set the second block carries into the packet id
+    from_node, packet_id = 2**64 - 1, 1
+    nonce = packet_id.to_bytes(8, "little") + from_node.to_bytes(8, "little")
+    counters = b"".join(((int.from_bytes(nonce, "big") + block) % 2**128).to_bytes(16, "big") for block in range(2))
+    ecb = Cipher(algorithms.AES(crypto_engine.key), modes.ECB()).encryptor()
+    plaintext = bytes(range(32))
+    encrypted_data = bytes(a ^ b for a, b in zip(plaintext, ecb.update(counters)))
+
+    assert crypto_engine.decrypt(from_node, packet_id, encrypted_data) == plaintext
+    assert crypto_engine.decrypt(1, 2, b"") == b""
+
+
+class TestPKICryptoEngine:
+    def setup_method(self):
+        self.our_key = X25519PrivateKey.generate()
+        self.peer_key = X25519PrivateKey.generate()
+        self.peer_public = self.peer_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+        our_private = self.our_key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+        self.engine = PKICryptoEngine(base64.b64encode(our_private).decode("ascii"), node_id="!0000000b")
+
+    def encrypt(self, from_node, packet_id, plaintext, extra_nonce=b"\x01\x02\x03\x04"):
+        # Encrypt the way the firmware does from the peer's side of the key exchange
+        shared_secret = self.peer_key.exchange(self.our_key.public_key())
+        key = hashlib.sha256(shared_secret).digest()
+        nonce = PKICryptoEngine.nonce(from_node, packet_id, extra_nonce)
+        return AESCCM(key, tag_length=8).encrypt(nonce, plaintext, None) + extra_nonce
+
+    def test_decrypt_with_learned_key(self):
+        self.engine.learn_public_key(0x0A, self.peer_public)
+        encrypted = self.encrypt(0x0A, 1234, b"hello")
+
+        assert self.engine.can_decrypt(0x0A, 0x0B)
+        assert self.engine.decrypt(0x0A, 1234, encrypted) == b"hello"
+
+    def test_shared_key_is_cached_per_peer(self):
+        self.engine.learn_public_key(0x0A, self.peer_public)
+        for packet_id in range(5):
+            assert self.engine.decrypt(0x0A, packet_id, self.encrypt(0x0A, packet_id, b"data")) == b"data"
+
+        assert self.engine.shared_key.cache_info().misses == 1
+        assert self.engine.shared_key.cache_info().hits == 4
+
+    def test_unknown_peer_or_other_recipient(self):
+        assert not self.engine.can_decrypt(0x0A, 0x0B)
+        assert self.engine.decrypt(0x0A, 1234, self.encrypt(0x0A, 1234, b"hello")) is None
+
+        self.engine.learn_public_key(0x0A, self.peer_public)
+        assert not self.engine.can_decrypt(0x0A, 0x0C)
+
+    def test_tampered_packet(self):
+        self.engine.learn_public_key(0x0A, self.peer_public)
+        encrypted = bytearray(self.encrypt(0x0A, 1234, b"hello"))
+        encrypted[0] ^= 0xFF
+
+        assert self.engine.decrypt(0x0A, 1234, bytes(encrypted)) is None
+
+    def test_disabled_without_key(self):
+        assert not PKICryptoEngine(None, node_id="!0000000b").enabled
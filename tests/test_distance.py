@@ -0,0 +1,52 @@
+import pytest
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.distance import LinkDistanceAggregator
+from bridger.spatial import NodePosition, SpatialIndex
+
+
+def envelope(gateway_id="!00000001", rx_snr=5.0, rx_rssi=-80, hop_limit=3, hop_start=3, node_id=0x0A):
+    service_envelope = ServiceEnvelope(channel_id="LongFast", gateway_id=gateway_id)
+    packet = service_envelope.packet
+    setattr(packet, "from", node_id)
+    packet.rx_snr = rx_snr
+    packet.rx_rssi = rx_rssi
+    packet.hop_limit = hop_limit
+    packet.hop_start = hop_start
+    return service_envelope
+
+
+@pytest.fixture
+def positions():
+    index = SpatialIndex()
+    index.update(NodePosition(0x01, 30.2672, -97.7431, None, None, 0.0, updated=1000))
+    index.update(NodePosition(0x0A, 30.2852, -97.7431, None, None, 0.0, updated=1000))
+    return index
+
+
+def test_samples_are_bucketed_by_distance(positions):
+    aggregator = LinkDistanceAggregator(positions, interval=60, bucket_km=1, max_position_age=3600)
+    aggregator.last_flush = 0
+
+    assert aggregator.observe(envelope(rx_snr=4.0), now=1100) == pytest.approx(2.0, abs=0.01)
+    aggregator.observe(envelope(rx_snr=-2.0, rx_rssi=-100), now=1100)
+
+    assert aggregator.flush(now=59) == []
+    (point,) = aggregator.flush(now=60)
+    assert point.measurement_name == "link_distance"
+    assert (point._from, point.gateway_id, point.distance_bucket_km, point.count) == (0x0A, "!00000001", 2, 2)
+    assert (point.snr_mean, point.snr_min, point.snr_max, point.rssi_mean) == (1.0, -2.0, 4.0, -90)
+    assert aggregator.buckets == {}
+
+
+def test_needs_usable_positions_for_both_ends(positions):
+    aggregator = LinkDistanceAggregator(positions, interval=60, bucket_km=1, max_position_age=3600)
+
+    assert aggregator.observe(envelope(hop_limit=2), now=1100) is None
+    assert aggregator.observe(envelope(gateway_id="!00000002"), now=1100) is None
+    assert aggregator.observe(envelope(gateway_id="not a node"), now=1100) is None
+    assert aggregator.observe(envelope(), now=9000) is None
+
+    positions.update(NodePosition(0x0A, 30.2852, -97.7431, None, 13, 7700.0, updated=1000))
+    assert aggregator.observe(envelope(), now=1100) is None
+    assert aggregator.buckets == {}
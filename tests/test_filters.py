@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.filters import PacketFilter, parse_portnum, split_setting
+
+PREFIX = "msh/US/2/e/"
+
+
+def test_split_setting():
+    assert split_setting(" LongFast, ,MediumSlow ") == ["LongFast", "MediumSlow"]
+    assert split_setting("") == []
+
+
+def test_parse_portnum():
+    assert parse_portnum("routing_app") == PortNum.ROUTING_APP
+    assert parse_portnum("67") == PortNum.TELEMETRY_APP
+
+
+def test_empty_filter_allows_everything():
+    packet_filter = PacketFilter(topic_prefix=PREFIX)
+    assert packet_filter.allow_topic(f"{PREFIX}LongFast/!0c18aaf4")
+    assert packet_filter.allow_portnum(PortNum.ADMIN_APP)
+    assert not packet_filter.skipped
+
+
+def test_channel_allow_list():
+    packet_filter = PacketFilter(channels_allow=["LongFast"], topic_prefix=PREFIX)
+    assert packet_filter.allow_topic(f"{PREFIX}LongFast/!0c18aaf4")
+    assert not packet_filter.allow_topic(f"{PREFIX}MediumSlow/!0c18aaf4")
+    assert packet_filter.skipped == {"channel:MediumSlow": 1}
+
+
+def test_gateway_deny_list_ignores_case():
+    packet_filter = PacketFilter(gateways_deny=["!0C18AAF4"], topic_prefix=PREFIX)
+    assert not packet_filter.allow_topic(f"{PREFIX}LongFast/!0c18aaf4")
+    assert packet_filter.allow_topic(f"{PREFIX}LongFast/!deadbeef")
+    assert packet_filter.skipped == {"gateway:!0c18aaf4": 1}
+
+
+def test_topic_outside_prefix_is_allowed():
+    packet_filter = PacketFilter(channels_allow=["LongFast"], topic_prefix=PREFIX)
+    assert packet_filter.allow_topic("other/topic")
+
+
+def test_portnum_deny_wins_over_allow():
+    packet_filter = PacketFilter(
+        portnums_allow=[PortNum.TEXT_MESSAGE_APP, PortNum.ROUTING_APP], portnums_deny=[PortNum.ROUTING_APP]
+    )
+    assert packet_filter.allow_portnum(PortNum.TEXT_MESSAGE_APP)
+    assert not packet_filter.allow_portnum(PortNum.ROUTING_APP)
+    assert not packet_filter.allow_portnum(PortNum.ADMIN_APP)
+    assert packet_filter.skipped == {"portnum:ROUTING_APP": 1, "portnum:ADMIN_APP": 1}
+
+
+@patch("bridger.filters.FILTER_CHANNELS_DENY", "MediumSlow")
+@patch("bridger.filters.FILTER_PORTNUMS_DENY", "ROUTING_APP,6")
+def test_from_config():
+    packet_filter = PacketFilter.from_config()
+    assert packet_filter.channels_deny == {"MediumSlow"}
+    assert packet_filter.portnums_deny == {PortNum.ROUTING_APP, PortNum.ADMIN_APP}
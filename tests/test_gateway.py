@@ -1,10 +1,11 @@
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 import pytest
 from discord import User
 from requests import HTTPError
 
-from bridger.gateway import GatewayData, GatewayError, GatewayManagerEMQX
+from bridger.gateway import GatewayData, GatewayError, GatewayHealthMonitor, GatewayManagerEMQX
 
 # Sample data for mocking
 state_mock = MagicMock()
@@ -281,3 +282,38 @@ def test_update_gateway_user_rules_emqx_error(gateway_manager, emqx_mock):
 
     # Verify that create was not called due to the exception
     emqx_mock.create_user_authorization_rules_built_in_database.assert_not_called()
+
+
+def test_gateway_health_snapshot(gateway_manager):
+    influx_reader = MagicMock()
+    influx_reader.get_gateway_stats.return_value = {
+        "!1a2b3c4d": {"packets": 120, "last_seen": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    }
+    monitor = GatewayHealthMonitor(gateway_manager, influx_reader, window=3600)
+
+    snapshot = monitor.build_snapshot()
+
+    influx_reader.get_gateway_stats.assert_called_once_with("-3600s")
+    assert snapshot == [
+        {
+            "gateway_id": "!1a2b3c4d",
+            "owner_id": "1234567890",
+            "last_seen": "2024-01-01T00:00:00+00:00",
+            "packets": 120,
+            "packets_per_minute": 2.0,
+        }
+    ]
+
+
+def test_gateway_health_refresh_sets_etag(gateway_manager):
+    influx_reader = MagicMock()
+    influx_reader.get_gateway_stats.return_value = {}
+    monitor = GatewayHealthMonitor(gateway_manager, influx_reader)
+
+    monitor.refresh()
+    first_etag = monitor.etag
+    assert monitor.body.startswith(b"[")
+    assert first_etag.startswith('"')
+
+    monitor.refresh()
+    assert monitor.etag == first_etag
@@ -5,7 +5,7 @@ from meshtastic.protobuf.portnums_pb2 import PortNum
 
 from bridger.dataclasses import NeighborInfoPacket
 from bridger.mesh.base import PacketHandler
-from bridger.mesh.handler_registry import HANDLER_MAP, handler
+from bridger.mesh.handler_registry import HANDLER_MAP, HANDLER_STATS, compile_dispatch, handler, handlers_for
 from bridger.mesh.handlers.neighborinfo import NeighborInfoHandler
 
 
@@ -15,6 +15,7 @@ def test_handler_decorator_registers_class():
 
     handler(DummyHandler)
     assert DummyHandler in HANDLER_MAP[PortNum.TEXT_MESSAGE_APP]
+    HANDLER_MAP[PortNum.TEXT_MESSAGE_APP].remove(DummyHandler)
 
 
 def test_handler_decorator_raises_if_missing_portnum():
@@ -27,16 +28,37 @@ def test_handler_decorator_raises_if_missing_portnum():
 
 def test_packet_handler_abstract_instantiation():
     with pytest.raises(TypeError):
-        PacketHandler(packet=None, payload_dict={}, base_data={})
+        PacketHandler()
 
 
 def test_concrete_packet_handler_usage():
     class ConcreteHandler(PacketHandler):
-        def handle(self):
+        def handle(self, packet, payload_dict, base_data, strip_text=True):
             return {"status": "ok"}
 
-    handler = ConcreteHandler(packet=MagicMock(), payload_dict={}, base_data={})
-    assert handler.handle() == {"status": "ok"}
+    handler = ConcreteHandler()
+    assert handler.handle(packet=MagicMock(), payload_dict={}, base_data={}) == {"status": "ok"}
+
+
+def test_compile_dispatch_indexes_handlers_by_portnum():
+    class CountingHandler(PacketHandler):
+        portnum = PortNum.PRIVATE_APP
+
+        def handle(self, packet, payload_dict, base_data, strip_text=True):
+            return {"status": "ok"}
+
+    handler(CountingHandler)
+    try:
+        compile_dispatch()
+        (handle,) = handlers_for(PortNum.PRIVATE_APP)
+        assert handle(None, {}, {}) == {"status": "ok"}
+        assert HANDLER_STATS["CountingHandler"].calls == 1
+        assert HANDLER_STATS["CountingHandler"].results == 1
+        assert handlers_for(PortNum.PAXCOUNTER_APP) == ()
+        assert handlers_for(PortNum.MAX + 1) == ()
+    finally:
+        HANDLER_MAP.pop(PortNum.PRIVATE_APP)
+        compile_dispatch()
 
 
 def test_neighbor_info_handler_generates_points():
@@ -59,8 +81,7 @@ def test_neighbor_info_handler_generates_points():
         ],
     }
 
-    handler = NeighborInfoHandler(packet=MagicMock(), payload_dict={}, base_data=base_data.copy())
-    result = handler.handle()
+    result = NeighborInfoHandler().handle(packet=MagicMock(), payload_dict={}, base_data=base_data.copy())
 
     assert isinstance(result, list)
     assert all(isinstance(p, NeighborInfoPacket) for p in result)
@@ -1,18 +1,43 @@
-from unittest.mock import AsyncMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import pytest_asyncio
 
+import bridger.http
+from bridger.dataclasses import DeviceTelemetryPoint, PositionPoint
 from bridger.http import create_app
 
+BASE_POINT = {
+    "_from": 0x1A2B3C4D,
+    "to": 4294967295,
+    "packet_id": 1234,
+    "rx_time": 1725990585,
+    "rx_snr": 5.0,
+    "rx_rssi": -50,
+    "hop_limit": 3,
+    "hop_start": 3,
+    "channel_id": "LongFast",
+    "gateway_id": "!0c18aaf4",
+}
+
 
 @pytest_asyncio.fixture
 async def test_client(aiohttp_client):
-    with patch("bridger.http.DeviceModel") as mock_device:
+    with (
+        patch("bridger.http.DeviceModel") as mock_device,
+        patch("bridger.http.InfluxDBClient"),
+        patch("bridger.http.GatewayHealthMonitor") as mock_health,
+        patch("bridger.http.LivePacketFeed") as mock_feed,
+    ):
+        mock_feed.return_value.run = AsyncMock()
         mock_instance = AsyncMock()
         mock_device.return_value = mock_instance
+        mock_health_instance = MagicMock(body=None, etag=None, run=AsyncMock())
+        mock_health.return_value = mock_health_instance
         app = create_app()
         app["device"] = mock_instance  # Set state before starting client to avoid deprecation warning
+        app["gateway_health"] = mock_health_instance
         client = await aiohttp_client(app)
         yield client
 
@@ -25,6 +50,7 @@ class TestHttpAPI:
         text = await resp.text()
         assert "Bridger API" in text
         assert "/model/displaynames" in text
+        assert "User-Agent" in resp.headers["Vary"]
 
     async def test_get_displaynames(self, test_client):
         test_client.app["device"].get_displaynames.return_value = ["Test Board"]
@@ -39,3 +65,135 @@ class TestHttpAPI:
         assert resp.status == 200
         json_data = await resp.json()
         assert json_data == [{"hw_model": 1, "names": ["Device A"]}]
+
+    async def test_gateways_health_unavailable(self, test_client):
+        resp = await test_client.get("/gateways/health")
+        assert resp.status == 503
+
+    async def test_gateways_health(self, test_client):
+        test_client.app["gateway_health"].body = b'[{"gateway_id": "!1a2b3c4d"}]'
+        test_client.app["gateway_health"].etag = '"abc"'
+        resp = await test_client.get("/gateways/health")
+        assert resp.status == 200
+        assert "ETag" in resp.headers
+        assert await resp.json() == [{"gateway_id": "!1a2b3c4d"}]
+
+    async def test_gateways_health_not_modified(self, test_client):
+        test_client.app["gateway_health"].body = b"[]"
+        test_client.app["gateway_health"].etag = '"abc"'
+        resp = await test_client.get("/gateways/health")
+        etag = resp.headers["ETag"]
+        resp = await test_client.get("/gateways/health", headers={"If-None-Match": etag})
+        assert resp.status == 304
+
+    async def test_get_displaynames_all_compressed(self, test_client):
+        names = [{"hw_model": i, "names": f"Device {i}"} for i in range(100)]
+        test_client.app["device"].get_all_displaynames.return_value = names
+        resp = await test_client.get("/model/displaynames", headers={"Accept-Encoding": "gzip, br"})
+        assert resp.status == 200
+        assert resp.headers["Content-Encoding"] == "br"
+        assert "max-age" in resp.headers["Cache-Control"]
+        assert await resp.json() == names
+
+    async def test_get_displaynames_all_rebuilt_on_catalog_refresh(self, test_client):
+        device = test_client.app["device"]
+        device.version = 1
+        device.get_all_displaynames.return_value = [{"hw_model": 1, "names": "Device A"}]
+        first = await test_client.get("/model/displaynames")
+
+        device.version = 2
+        device.get_all_displaynames.return_value = [{"hw_model": 2, "names": "Device B"}]
+        second = await test_client.get("/model/displaynames")
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+        assert await second.json() == [{"hw_model": 2, "names": "Device B"}]
+
+    async def test_index_view_json(self, test_client):
+        resp = await test_client.get("/", headers={"Accept": "application/json"})
+        assert resp.status == 200
+        assert {"method": "GET", "path": "/health"} in await resp.json()
+
+    async def test_stream_filters_points(self, test_client):
+        resp = await test_client.get("/stream?measurement=battery&node=!1a2b3c4d")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "text/event-stream"
+
+        bridger.http.broadcaster.publish(DeviceTelemetryPoint(**{**BASE_POINT, "_from": 1}, battery_level=10))
+        bridger.http.broadcaster.publish(DeviceTelemetryPoint(**BASE_POINT, battery_level=85))
+
+        line = await resp.content.readline()
+        assert line.startswith(b"data: ")
+        assert b'"battery_level": 85' in line
+        resp.close()
+
+    async def test_stream_rejects_bad_node(self, test_client):
+        resp = await test_client.get("/stream?node=nothex")
+        assert resp.status == 400
+
+    async def test_topology(self, test_client):
+        bridger.http.topology.add_edge(1, 2, 6.0)
+        resp = await test_client.get("/topology")
+        assert resp.status == 200
+        json_data = await resp.json()
+        assert json_data["edges"][0]["source"] == "!00000001"
+
+    async def test_recent_summary_and_series(self, test_client):
+        now = time.time()
+        bridger.http.recent.ingest(DeviceTelemetryPoint(**BASE_POINT, battery_level=80), now=now - 120)
+        bridger.http.recent.ingest(DeviceTelemetryPoint(**BASE_POINT, battery_level=90), now=now - 60)
+
+        resp = await test_client.get("/recent/!1a2b3c4d")
+        assert "battery_level" in (await resp.json())["battery"]
+
+        resp = await test_client.get("/recent/!1a2b3c4d/battery?field=battery_level&percentile=50")
+        assert resp.status == 200
+        summary = (await resp.json())["battery_level"]
+        assert (summary["count"], summary["last"], summary["mean"], summary["p50"]) == (2, 90, 85, 85)
+
+        resp = await test_client.get("/recent/!1a2b3c4d/battery/series?field=battery_level&since=3600&step=3600")
+        assert [value for _, value in (await resp.json())["battery_level"]] == [85]
+
+    async def test_recent_unknown_series(self, test_client):
+        resp = await test_client.get("/recent/!1a2b3c4d/battery?field=battery_level")
+        assert resp.status == 404
+
+        resp = await test_client.get("/recent/!1a2b3c4d/battery/series?step=0")
+        assert resp.status == 400
+        resp = await test_client.get("/recent/!1a2b3c4d/battery/series?step=0.000001")
+        assert resp.status == 400
+        resp = await test_client.get("/recent/!1a2b3c4d/battery/series?since=inf")
+        assert resp.status == 400
+        resp = await test_client.get("/recent/!1a2b3c4d/battery?percentile=101")
+        assert resp.status == 400
+
+    async def test_positions(self, test_client):
+        bridger.http.positions.ingest(PositionPoint(**BASE_POINT, latitude_i=302672000, longitude_i=-977431000))
+
+        resp = await test_client.get("/positions/bbox?min_lat=30&min_lon=-98&max_lat=31&max_lon=-97")
+        assert [node["node_id"] for node in await resp.json()] == ["!1a2b3c4d"]
+
+        resp = await test_client.get("/positions/nearest?lat=30.2&lon=-97.7&k=1")
+        (nearest,) = await resp.json()
+        assert nearest["distance_km"] == pytest.approx(8.5, abs=0.5)
+
+        resp = await test_client.get("/positions/bbox?min_lat=31&min_lon=-98&max_lat=30&max_lon=-97")
+        assert resp.status == 400
+        resp = await test_client.get("/positions/nearest?lat=north")
+        assert resp.status == 400
+        for query in ("lat=nan&lon=0", "lat=91&lon=0", "lat=0&lon=0&radius_km=nan"):
+            resp = await test_client.get(f"/positions/nearest?{query}")
+            assert resp.status == 400
+        resp = await test_client.get("/positions/bbox?min_lat=-inf&min_lon=-98&max_lat=31&max_lon=-97")
+        assert resp.status == 400
+
+    async def test_coverage_tiles(self, test_client):
+        resp = await test_client.get("/coverage/12/935/1686.json")
+        assert resp.status == 200
+        assert (await resp.json())["count"] == 0
+
+        resp = await test_client.get("/coverage/8/58/105.png")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "image/png"
+
+        resp = await test_client.get("/coverage/20/0/0.json")
+        assert resp.status == 400
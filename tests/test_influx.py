@@ -2,8 +2,10 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from bridger.dataclasses import PositionPoint
-from bridger.influx.interfaces import InfluxWriter
+from bridger.config import ROLLUP_BUCKET
+from bridger.dataclasses import NodeInfoPoint, PositionPoint, ReceptionSummaryPoint
+from bridger.influx.interfaces import InfluxReader, InfluxWriter
+from bridger.influx.routing import BucketRouter
 
 
 @pytest.fixture
@@ -88,3 +90,112 @@ class TestInfluxWriter:
         assert "rx_time" in fields
         assert "latitude_i" in fields
         assert "altitude" in fields
+
+    def test_write_points_mixes_measurements(self, influx_writer, mock_write_api, position_point):
+        summary = ReceptionSummaryPoint(
+            **{key: getattr(position_point, key) for key in ("_from", "to", "packet_id", "rx_time", "rx_snr", "rx_rssi")},
+            hop_limit=3,
+            hop_start=3,
+            channel_id="Test",
+            gateway_id="!abcd1234",
+            packet_type="position",
+            gateway_count=2,
+        )
+        influx_writer.write_points([position_point, summary])
+
+        mock_write_api.write.assert_called_once()
+        records = mock_write_api.write.call_args.kwargs["record"]
+        assert [record["measurement"] for record in records] == ["position", "reception"]
+        assert records[1]["tags"]["packet_type"] == "position"
+        assert records[1]["fields"]["gateway_count"] == 2
+        # Unset optional fields are left out rather than written as nulls
+        assert "snr_best" not in records[1]["fields"]
+
+    def test_write_rollups_goes_to_rollup_bucket(self, influx_writer, mock_write_api):
+        record = {"measurement": "battery", "tags": {"interval": "1m"}, "fields": {"count": 1}, "time": 60}
+        influx_writer.write_rollups([record])
+
+        _, kwargs = mock_write_api.write.call_args
+        assert kwargs["bucket"] == ROLLUP_BUCKET
+        assert kwargs["record"] == [record]
+        assert kwargs["write_precision"] == "s"
+
+
+@pytest.fixture
+def router():
+    return BucketRouter(default="main", hot_bucket="hot", hot_measurements="position,reception", routes="message=messages")
+
+
+class TestBucketRouter:
+    def test_routes(self, router):
+        assert router.bucket("position") == "hot"
+        assert router.bucket("message") == "messages"
+        assert router.bucket("node") == "main"
+        assert router.buckets == ["main", "hot", "messages"]
+
+    def test_without_hot_bucket(self):
+        router = BucketRouter(default="main", hot_bucket="", hot_measurements="position", routes="")
+        assert router.bucket("position") == "main"
+        assert router.buckets == ["main"]
+
+    def test_invalid_route(self):
+        with pytest.raises(ValueError):
+            BucketRouter(default="main", hot_bucket="", routes="position")
+
+
+class TestRouting:
+    def test_write_points_splits_by_bucket(self, influx_client, mock_write_api, router, position_point):
+        node = NodeInfoPoint(
+            **{key: getattr(position_point, key) for key in ("_from", "to", "packet_id", "rx_time", "rx_snr", "rx_rssi")},
+            hop_limit=3,
+            hop_start=3,
+            channel_id="Test",
+            gateway_id="!abcd1234",
+            id="!00000001",
+            long_name="Base",
+            short_name="BS",
+        )
+        InfluxWriter(influx_client, router).write_points([position_point, node, position_point])
+
+        writes = {call.kwargs["bucket"]: call.kwargs["record"] for call in mock_write_api.write.call_args_list}
+        assert [record["measurement"] for record in writes["hot"]] == ["position", "position"]
+        assert [record["measurement"] for record in writes["main"]] == ["node"]
+
+    def test_write_point_uses_measurement_bucket(self, influx_client, mock_write_api, router, position_point):
+        InfluxWriter(influx_client, router).write_point(position_point)
+        assert mock_write_api.write.call_args.kwargs["bucket"] == "hot"
+
+    def test_reader_source(self, router):
+        reader = InfluxReader(MagicMock(), router)
+        assert reader.source("-6h", "node") == 'from(bucket: "main") |> range(start: -6h)'
+        assert reader.source("-1h") == (
+            'union(tables: [from(bucket: "main") |> range(start: -1h), from(bucket: "hot") |> range(start: -1h), '
+            'from(bucket: "messages") |> range(start: -1h)])'
+        )
+
+    def test_node_queries_read_node_bucket(self, router):
+        client = MagicMock()
+        InfluxReader(client, router).get_node_info(1)
+        query = client.query_api().query.call_args.args[0]
+        assert 'from(bucket: "main")' in query
+        assert "hot" not in query
+
+
+@pytest.mark.parametrize("method, args", [("get_gateway_stats", ()), ("get_recent_packets", ("!abcd1234",))])
+def test_packet_queries_skip_reception_rows(method, args):
+    # A packet heard by three gateways has a row of its own plus reception rows with the same packet_id
+    client = MagicMock()
+    getattr(InfluxReader(client), method)(*args)
+    query = client.query_api().query.call_args.args[0]
+    assert 'r._field == "packet_id"' in query
+    assert 'r._measurement != "reception"' in query
+    assert 'r._measurement != "reception_gateway"' in query
+
+
+@pytest.mark.parametrize("method, args", [("get_node_info", (1,)), ("get_all_node_ids", ())])
+def test_node_queries_filter_fields_in_storage(method, args):
+    client = MagicMock()
+    getattr(InfluxReader(client), method)(*args)
+    query = client.query_api().query.call_args.args[0]
+    assert "contains(" not in query
+    assert 'r._field == "packet_id" or r._field == "long_name"' in query
@@ -0,0 +1,87 @@
+import json
+
+from bridger.keys import PublicKeyDirectory
+
+KEY_A = bytes(range(32))
+KEY_B = bytes(range(1, 33))
+
+
+def test_update_deduplicates_unchanged_keys(tmp_path):
+    directory = PublicKeyDirectory(tmp_path / "keys.json", save_interval=3600)
+
+    assert directory.update(0x0A, KEY_A)
+    assert not directory.update(0x0A, KEY_A)
+    assert directory.update(0x0A, KEY_B)
+    assert directory.get(0x0A) == KEY_B
+    assert 0x0A in directory
+
+
+def test_update_ignores_invalid_keys(tmp_path):
+    directory = PublicKeyDirectory(tmp_path / "keys.json")
+
+    assert not directory.update(0x0A, b"short")
+    assert len(directory) == 0
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "keys.json"
+    directory = PublicKeyDirectory(path, save_interval=3600)
+    directory.update(0x0A, KEY_A)
+    assert not path.exists()
+
+    directory.save()
+    assert json.loads(path.read_text()) == {"!0000000a": "AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8="}
+    assert PublicKeyDirectory(path).get(0x0A) == KEY_A
+
+
+def test_update_saves_after_interval(tmp_path):
+    path = tmp_path / "keys.json"
+    directory = PublicKeyDirectory(path, save_interval=0)
+    directory.update(0x0A, KEY_A)
+
+    assert path.exists()
+    assert not directory.dirty
+
+
+def test_reload_if_changed(tmp_path):
+    path = tmp_path / "keys.json"
+    reader = PublicKeyDirectory(path)
+    assert not reader.reload_if_changed()
+
+    writer = PublicKeyDirectory(path, save_interval=0)
+    writer.update(0x0A, KEY_A)
+
+    assert reader.reload_if_changed()
+    assert reader.get(0x0A) == KEY_A
+    assert not reader.reload_if_changed()
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text("not json")
+
+    assert len(PublicKeyDirectory(path)) == 0
+
+
+def test_in_memory_directory_never_writes(tmp_path):
+    directory = PublicKeyDirectory(path=None, save_interval=0)
+    directory.update(0x0A, KEY_A)
+
+    assert directory.get(0x0A) == KEY_A
+    assert directory.dirty
+
+
+def test_save_keeps_keys_saved_by_another_process(tmp_path):
+    path = tmp_path / "keys.json"
+    ingest = PublicKeyDirectory(path, save_interval=3600)
+    live_feed = PublicKeyDirectory(path, save_interval=3600)
+
+    ingest.update(0x0A, KEY_A)
+    ingest.save()
+    live_feed.update(0x0B, KEY_B)
+    live_feed.update(0x0A, KEY_B)
+    live_feed.save()
+
+    # Both keys survive and the key learned most recently wins
+    assert PublicKeyDirectory(path).keys == {0x0A: KEY_B, 0x0B: KEY_B}
+    assert live_feed.keys == {0x0A: KEY_B, 0x0B: KEY_B}
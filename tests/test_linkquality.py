@@ -0,0 +1,78 @@
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.linkquality import Histogram, LinkQualityAggregator
+
+
+def envelope(gateway_id="!00000001", rx_snr=5.0, rx_rssi=-80, hop_limit=3, hop_start=3, node_id=0x0A):
+    service_envelope = ServiceEnvelope(channel_id="LongFast", gateway_id=gateway_id)
+    packet = service_envelope.packet
+    setattr(packet, "from", node_id)
+    packet.rx_snr = rx_snr
+    packet.rx_rssi = rx_rssi
+    packet.hop_limit = hop_limit
+    packet.hop_start = hop_start
+    return service_envelope
+
+
+def test_only_direct_receptions_are_observed():
+    aggregator = LinkQualityAggregator(interval=60)
+
+    assert aggregator.observe(envelope())
+    assert not aggregator.observe(envelope(hop_limit=2))
+    assert not aggregator.observe(envelope(hop_limit=0, hop_start=0))
+    assert not aggregator.observe(envelope(rx_snr=0, rx_rssi=0))
+    assert list(aggregator.links) == [(0x0A, "!00000001")]
+
+
+def test_flush_summarises_the_interval():
+    aggregator = LinkQualityAggregator(interval=60, alpha=0.5)
+    aggregator.last_flush = 100
+    for snr, rssi in ((4.0, -90), (8.0, -70), (-2.0, -110)):
+        aggregator.observe(envelope(rx_snr=snr, rx_rssi=rssi))
+
+    assert aggregator.flush(now=159) == []
+
+    (point,) = aggregator.flush(now=160)
+    assert point.measurement_name == "link_quality"
+    assert (point._from, point.gateway_id, point.count) == (0x0A, "!00000001", 3)
+    assert (point.snr_min, point.snr_max) == (-2.0, 8.0)
+    assert (point.rssi_min, point.rssi_max) == (-110, -70)
+    assert point.snr_ewma == 2.0
+    assert point.snr_p50 == 4.25
+
+    # Links that stayed quiet since the last flush aren't written again
+    assert aggregator.flush(now=220) == []
+
+
+def test_ewma_carries_over_between_flushes():
+    aggregator = LinkQualityAggregator(interval=60, alpha=0.5)
+    aggregator.observe(envelope(rx_snr=10.0))
+    aggregator.flush(force=True)
+    aggregator.observe(envelope(rx_snr=0.0))
+
+    (point,) = aggregator.flush(force=True)
+    assert point.count == 1
+    assert point.snr_ewma == 5.0
+    assert point.snr_min == 0.0
+
+
+def test_max_links_drops_the_least_recently_heard():
+    aggregator = LinkQualityAggregator(interval=60, max_links=2)
+    aggregator.observe(envelope(node_id=1))
+    aggregator.observe(envelope(node_id=2))
+    aggregator.observe(envelope(node_id=1))
+    aggregator.observe(envelope(node_id=3))
+
+    assert list(aggregator.links) == [(1, "!00000001"), (3, "!00000001")]
+
+
+def test_histogram_quantiles_clamp_to_range():
+    histogram = Histogram(0, 10, 1)
+    assert histogram.quantile(0.5) is None
+
+    for value in (-5, 2.2, 2.7, 3.1, 50):
+        histogram.add(value)
+
+    assert histogram.quantile(0.0) == 0.5
+    assert histogram.quantile(0.5) == 2.5
+    assert histogram.quantile(1.0) == 9.5
@@ -1,15 +1,18 @@
 import base64
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import pytest
-from meshtastic.protobuf.mesh_pb2 import Position
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from meshtastic.protobuf.mesh_pb2 import Data, Position, User
 from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
 from meshtastic.protobuf.portnums_pb2 import PortNum
 
 import bridger.mesh.handlers  # noqa: F401
-from bridger.crypto import CryptoEngine
+from bridger.crypto import CryptoEngine, PKICryptoEngine
 from bridger.dataclasses import PositionPoint
-from bridger.mesh import PacketProcessorError, PBPacketProcessor
+from bridger.mesh import PacketProcessorError, PBPacketProcessor, ProcessStatus
 
 encrypted_key_test = "ujlQw7lG0zMZVjP7gYfs7A=="
 
@@ -59,17 +62,94 @@ def nodeinfo_encrypted():
 class TestPBPacketProcessor:
     def test_init_success(self, service_envelope: ServiceEnvelope):
         with patch.object(Position, "FromString", return_value=MagicMock()):
-            processor = PBPacketProcessor(service_envelope, force_decode=True)
+            processor = PBPacketProcessor(service_envelope)
             assert processor.portnum == PortNum.POSITION_APP
-            assert processor.force_decode is True
 
     def test_init_failure(self, service_envelope: ServiceEnvelope):
         modified_envelope = ServiceEnvelope.FromString(node_info2)
-        modified_envelope.packet.decoded.portnum = 6
+        modified_envelope.packet.decoded.portnum = PortNum.PAXCOUNTER_APP
         with pytest.raises(PacketProcessorError):
             processor = PBPacketProcessor(modified_envelope)
             processor.payload
 
+    def test_process_skips_unhandled_portnum(self):
+        modified_envelope = ServiceEnvelope.FromString(node_info2)
+        modified_envelope.packet.decoded.portnum = PortNum.PAXCOUNTER_APP
+        processor = PBPacketProcessor(modified_envelope)
+
+        with patch.object(PBPacketProcessor, "payload_dict", new_callable=PropertyMock) as payload_dict:
+            assert processor.process().status is ProcessStatus.UNSUPPORTED
+        payload_dict.assert_not_called()
+
+    def test_process_pki(self, text_pki_service_envelope: ServiceEnvelope):
+        result = PBPacketProcessor(text_pki_service_envelope, auto_decrypt=False).process()
+        assert result.status is ProcessStatus.PKI
+        assert result.data is None
+
+    def test_process_filtered_portnum(self):
+        processor = PBPacketProcessor(ServiceEnvelope.FromString(node_info2))
+        result = processor.process(allow_portnum=lambda portnum: portnum != PortNum.NODEINFO_APP)
+        assert result.status is ProcessStatus.FILTERED
+
+    def test_process_decrypts(self, nodeinfo_encrypted: ServiceEnvelope):
+        processor = PBPacketProcessor(nodeinfo_encrypted, auto_decrypt=False)
+        result = processor.process()
+        assert result.status is ProcessStatus.DECODED
+        assert result.data.long_name == "egrme.sh Palm"
+        assert not processor.encrypted
+
+    def test_process_pki_for_our_node(self):
+        our_key, peer_key = X25519PrivateKey.generate(), X25519PrivateKey.generate()
+        our_private = our_key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+        engine = PKICryptoEngine(base64.b64encode(our_private).decode("ascii"), node_id="!0000000b")
+        engine.learn_public_key(0x0A, peer_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw))
+
+        data = Data(portnum=PortNum.TEXT_MESSAGE_APP, payload=b"hello").SerializeToString()
+        nonce = PKICryptoEngine.nonce(0x0A, 1234, b"\x00\x00\x00\x01")
+        key = engine.shared_key(engine.public_keys[0x0A])
+        encrypted = AESCCM(key, tag_length=8).encrypt(nonce, data, None) + b"\x00\x00\x00\x01"
+
+        envelope = ServiceEnvelope(channel_id="PKI", gateway_id="!0c18aaf4")
+        setattr(envelope.packet, "from", 0x0A)
+        envelope.packet.to = 0x0B
+        envelope.packet.id = 1234
+        envelope.packet.encrypted = encrypted
+
+        with patch("bridger.mesh.pki_engine", engine):
+            result = PBPacketProcessor(envelope, auto_decrypt=False).process()
+
+        assert result.status is ProcessStatus.DECODED
+        assert result.data.channel_id == "PKI"
+
+    def test_process_learns_public_keys(self):
+        envelope = ServiceEnvelope.FromString(node_info2)
+        user = User.FromString(envelope.packet.decoded.payload)
+        user.public_key = bytes(range(32))
+        envelope.packet.decoded.payload = user.SerializeToString()
+
+        engine = PKICryptoEngine(None, node_id=None)
+        with patch("bridger.mesh.pki_engine", engine):
+            PBPacketProcessor(envelope).process()
+
+        assert engine.public_keys[getattr(envelope.packet, "from")] == bytes(range(32))
+
+    def test_process_parses_payload_once(self):
+        engine = PKICryptoEngine(None, node_id=None)
+        with (
+            patch("bridger.mesh.pki_engine", engine),
+            patch.object(User, "FromString", wraps=User.FromString) as from_string,
+        ):
+            result = PBPacketProcessor(ServiceEnvelope.FromString(node_info2)).process()
+
+        assert result.status is ProcessStatus.DECODED
+        from_string.assert_called_once()
+
+    def test_process_decrypt_failure(self, nodeinfo_encrypted: ServiceEnvelope):
+        with patch("bridger.mesh.CryptoEngine.decrypt", return_value=b"\xff\xff\xff"):
+            result = PBPacketProcessor(nodeinfo_encrypted, auto_decrypt=False).process()
+        assert result.status is ProcessStatus.FAILED
+        assert nodeinfo_encrypted.packet.encrypted == ServiceEnvelope.FromString(node_info_encrypted).packet.encrypted
+
     def test_payload_dict(self, service_envelope: ServiceEnvelope):
         with patch.object(Position, "FromString", return_value=MagicMock()):
             processor = PBPacketProcessor(service_envelope)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import ClientError
+
+from bridger.meshtastic import DeviceModel
+
+CATALOG = [
+    {"hwModel": 9, "displayName": "RAK WisBlock 4631"},
+    {"hwModel": 9, "displayName": "RAK WisBlock 19007"},
+    {"hwModel": 43, "displayName": "Heltec V3"},
+]
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    return str(tmp_path / "device_hardware.json")
+
+
+@pytest.fixture
+def persisted_catalog(catalog_path):
+    with open(catalog_path, "w") as f:
+        json.dump({"fetched_at": time.time(), "models": CATALOG}, f)
+    return catalog_path
+
+
+@pytest.mark.asyncio
+class TestDeviceModel:
+    async def test_loads_persisted_catalog_without_network(self, persisted_catalog):
+        device = DeviceModel(catalog_path=persisted_catalog)
+        device.fetch = AsyncMock()
+
+        assert await device.get_displaynames(9) == ["RAK WisBlock 4631", "RAK WisBlock 19007"]
+        assert await device.get_displaynames(1) == []
+        assert len(await device.get_models(43)) == 1
+        device.fetch.assert_not_called()
+
+    async def test_get_all_displaynames(self, persisted_catalog):
+        device = DeviceModel(catalog_path=persisted_catalog)
+
+        assert await device.get_all_displaynames() == [
+            {"hw_model": 9, "names": "RAK WisBlock 4631, RAK WisBlock 19007"},
+            {"hw_model": 43, "names": "Heltec V3"},
+        ]
+        assert (await device.get_all_displaynames(names_as_list=True))[1] == {"hw_model": 43, "names": ["Heltec V3"]}
+
+    async def test_first_request_fetches_and_persists(self, catalog_path):
+        device = DeviceModel(catalog_path=catalog_path)
+        device.fetch = AsyncMock(return_value=CATALOG)
+
+        assert await device.get_displaynames(43) == ["Heltec V3"]
+        assert device.version == 1
+
+        with open(catalog_path) as f:
+            assert json.load(f)["models"] == CATALOG
+
+    async def test_stale_catalog_is_served_while_refreshing(self, persisted_catalog):
+        device = DeviceModel(catalog_path=persisted_catalog, ttl=0)
+        device.fetch = AsyncMock(return_value=[{"hwModel": 1, "displayName": "TLORA V2"}])
+        version = device.version
+
+        # The stale data is returned immediately and the refresh happens in the background
+        assert await device.get_displaynames(9) == ["RAK WisBlock 4631", "RAK WisBlock 19007"]
+        await asyncio.sleep(0)
+        await device._refresh_task
+
+        assert device.version == version + 1
+        assert await device.get_displaynames(1) == ["TLORA V2"]
+
+    async def test_failed_refresh_keeps_stale_catalog(self, persisted_catalog):
+        device = DeviceModel(catalog_path=persisted_catalog, ttl=0)
+        device.fetch = AsyncMock(side_effect=ClientError("offline"))
+
+        assert await device.refresh() is False
+        assert await device.get_displaynames(43) == ["Heltec V3"]
+
+    @pytest.mark.parametrize(
+        "models",
+        [
+            [{"hwModel": 1}],
+            [{"displayName": "TLORA V2"}],
+            [{"hwModel": None, "displayName": "TLORA V2"}],
+            [{"hwModel": "TLORA_V2", "displayName": "TLORA V2"}],
+            {"models": []},
+        ],
+    )
+    async def test_unexpected_response_keeps_stale_catalog(self, persisted_catalog, models):
+        device = DeviceModel(catalog_path=persisted_catalog, ttl=0)
+        device.fetch = AsyncMock(return_value=models)
+        version = device.version
+
+        assert await device.refresh() is False
+        assert device.version == version
+        assert await device.get_displaynames(43) == ["Heltec V3"]
+
+    async def test_corrupt_catalog_is_ignored(self, catalog_path):
+        with open(catalog_path, "w") as f:
+            f.write("not json")
+
+        with patch("bridger.meshtastic.logger") as mock_logger:
+            device = DeviceModel(catalog_path=catalog_path)
+            mock_logger.warning.assert_called_once()
+
+        assert device.models == []
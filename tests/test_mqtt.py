@@ -6,7 +6,7 @@ from influxdb_client import InfluxDBClient
 from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
 from paho.mqtt.client import CallbackAPIVersion, MQTTMessage
 
-from bridger.mesh import PBPacketProcessor
+from bridger.mesh import PBPacketProcessor, ProcessResult, ProcessStatus
 from bridger.mqtt import BridgerMQTT
 
 
@@ -44,10 +44,94 @@ class TestBridgerMQTT:
 
     def test_on_message(self, mqtt_client, mqtt_message):
         mqtt_client._handle_decode_error = MagicMock()
-        with patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, _from="test_user"))):
+        with patch.object(
+            ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0, _from="test_user"))
+        ):
             mqtt_client.on_message(mqtt_client, None, mqtt_message)
             assert len(mqtt_client.deduplicator.message_queue) == 1
 
+    def test_on_message_records_outcome(self, mqtt_client, mqtt_message):
+        result = ProcessResult(ProcessStatus.DECODED, data=MagicMock())
+        with (
+            patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0))),
+            patch.object(PBPacketProcessor, "process", return_value=result),
+            patch("bridger.mqtt.InfluxWriter") as influx_writer,
+        ):
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+            # Nothing is written until the reception window closes
+            influx_writer.assert_not_called()
+            mqtt_client.flush_receptions(force=True)
+
+        points = [point for point, _ in influx_writer.return_value.write_timed_points.call_args.args[0]]
+        assert points[0] is result.data
+        assert points[1].measurement_name == "reception"
+        assert mqtt_client.stats.counts == {"stored": 1}
+
+    def test_loop_misc_flushes_closed_windows(self, mqtt_client, mqtt_message):
+        result = ProcessResult(ProcessStatus.DECODED, data=MagicMock())
+        with (
+            patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0))),
+            patch.object(PBPacketProcessor, "process", return_value=result),
+            patch("bridger.mqtt.InfluxWriter") as influx_writer,
+        ):
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+            mqtt_client.loop_misc()
+            influx_writer.return_value.write_timed_points.assert_not_called()
+
+            mqtt_client.receptions.window = 0
+            mqtt_client.loop_misc()
+
+        influx_writer.return_value.write_timed_points.assert_called_once()
+        assert not mqtt_client.receptions.packets
+
+    def test_shutdown_writes_open_packets(self, mqtt_client, mqtt_message):
+        result = ProcessResult(ProcessStatus.DECODED, data=MagicMock())
+        with (
+            patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0))),
+            patch.object(PBPacketProcessor, "process", return_value=result),
+            patch("bridger.mqtt.InfluxWriter") as influx_writer,
+        ):
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+            with patch.object(mqtt_client.rollups, "save") as save:
+                mqtt_client.shutdown()
+
+        influx_writer.return_value.write_timed_points.assert_called_once()
+        assert not mqtt_client.receptions.packets
+        save.assert_called_once()
+
+    def test_on_message_collects_other_gateways(self, mqtt_client, mqtt_message):
+        result = ProcessResult(ProcessStatus.DECODED, data=MagicMock())
+        envelope = MagicMock(packet=MagicMock(id=1, hop_start=0), gateway_id="!00000001")
+        with (
+            patch.object(ServiceEnvelope, "FromString", return_value=envelope),
+            patch.object(PBPacketProcessor, "process", return_value=result) as process,
+            patch("bridger.mqtt.InfluxWriter"),
+        ):
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+            envelope.gateway_id = "!00000002"
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+
+        process.assert_called_once()
+        assert mqtt_client.stats.counts == {"stored": 1, "reception": 1}
+        assert len(next(iter(mqtt_client.receptions.packets.values())).receptions) == 2
+
+    def test_on_message_unsupported_is_not_written(self, mqtt_client, mqtt_message):
+        with (
+            patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0))),
+            patch.object(PBPacketProcessor, "process", return_value=ProcessResult(ProcessStatus.UNSUPPORTED)),
+            patch("bridger.mqtt.InfluxWriter") as influx_writer,
+        ):
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+
+        influx_writer.assert_not_called()
+        assert mqtt_client.stats.counts == {"unsupported": 1}
+
+    def test_on_message_filtered_topic(self, mqtt_client, mqtt_message):
+        mqtt_client.packet_filter.allow_topic = MagicMock(return_value=False)
+        with patch.object(ServiceEnvelope, "FromString") as from_string:
+            mqtt_client.on_message(mqtt_client, None, mqtt_message)
+            from_string.assert_not_called()
+
     def test_on_message_decode_error(self, mqtt_client, mqtt_message):
         mqtt_client._handle_decode_error = MagicMock()
         with patch.object(ServiceEnvelope, "FromString", side_effect=DecodeError):
@@ -55,7 +139,7 @@ class TestBridgerMQTT:
             mqtt_client._handle_decode_error.assert_called_once()
 
     def test_on_message_type_error(self, mqtt_client, mqtt_message):
-        with patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1))):
+        with patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0))):
             with patch.object(PBPacketProcessor, "__init__", side_effect=TypeError):
                 mqtt_client.on_message(mqtt_client, None, mqtt_message)
 
@@ -65,7 +149,9 @@ class TestBridgerMQTT:
 
     def test_second_packet_skipped(self, mqtt_client, mqtt_message):
         mqtt_client._handle_decode_error = MagicMock()
-        with patch.object(ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, _from="test_user"))):
+        with patch.object(
+            ServiceEnvelope, "FromString", return_value=MagicMock(packet=MagicMock(id=1, hop_start=0, _from="test_user"))
+        ):
             mqtt_client.on_message(mqtt_client, None, mqtt_message)
             assert len(mqtt_client.deduplicator.message_queue) == 1
             mqtt_client.on_message(mqtt_client, None, mqtt_message)
@@ -0,0 +1,72 @@
+import pytest
+
+from bridger.dataclasses import NodeInfoPoint, PositionPoint
+from bridger.nodestate import NodeStateCache
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 0x0A,
+        "to": 4294967295,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def nodeinfo(base_data, long_name="Node A"):
+    return NodeInfoPoint(**base_data, id="!0000000a", long_name=long_name, short_name="A", hw_model=9, role=1)
+
+
+def test_change_policy_skips_identical_nodeinfo(base_data):
+    cache = NodeStateCache(policy="change", interval=3600)
+
+    assert cache.should_write(nodeinfo(base_data), now=100)
+    assert not cache.should_write(nodeinfo(base_data), now=200)
+    assert not cache.should_write(nodeinfo(base_data), now=300)
+
+    changed = nodeinfo(base_data, long_name="Renamed")
+    assert cache.should_write(changed, now=400)
+    assert changed.heartbeats == 3
+
+
+def test_change_policy_refreshes_after_interval(base_data):
+    cache = NodeStateCache(policy="change", interval=3600)
+
+    assert cache.should_write(nodeinfo(base_data), now=100)
+    assert cache.should_write(nodeinfo(base_data), now=3700)
+
+
+def test_interval_policy_limits_changes(base_data):
+    cache = NodeStateCache(policy="interval", interval=3600)
+
+    assert cache.should_write(nodeinfo(base_data), now=100)
+    assert not cache.should_write(nodeinfo(base_data, long_name="Renamed"), now=200)
+    assert cache.should_write(nodeinfo(base_data, long_name="Renamed"), now=3700)
+
+
+def test_always_policy(base_data):
+    cache = NodeStateCache(policy="always")
+
+    assert cache.should_write(nodeinfo(base_data), now=100)
+    assert cache.should_write(nodeinfo(base_data), now=101)
+
+
+def test_filter_passes_other_points_through(base_data):
+    cache = NodeStateCache(policy="change")
+    position = PositionPoint(**base_data, latitude_i=1, longitude_i=2)
+
+    assert cache.filter(position) is position
+    assert cache.filter(nodeinfo(base_data), now=100) is not None
+    assert cache.filter(nodeinfo(base_data), now=101) is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError, match="Unknown node state policy"):
+        NodeStateCache(policy="sometimes")
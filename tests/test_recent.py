@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from bridger.dataclasses import DeviceTelemetryPoint, PositionPoint, TextMessagePoint
+from bridger.recent import RecentTelemetryStore, RingBuffer, downsample, summarise
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 0x0A,
+        "to": 4294967295,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def test_ring_buffer_wraps_and_keeps_order():
+    buffer = RingBuffer(("voltage",), capacity=3)
+    for timestamp in range(5):
+        buffer.append(timestamp, {"voltage": timestamp * 10})
+
+    times, values = buffer.window("voltage", since=0)
+    assert times.tolist() == [2, 3, 4]
+    assert values.tolist() == [20, 30, 40]
+
+    times, _ = buffer.window("voltage", since=3)
+    assert times.tolist() == [3, 4]
+
+
+def test_ring_buffer_skips_missing_values():
+    buffer = RingBuffer(("battery_level", "voltage"), capacity=4)
+    buffer.append(1, {"battery_level": 90, "voltage": 4.1})
+    buffer.append(2, {"battery_level": 80})
+
+    _, values = buffer.window("voltage", since=0)
+    assert values.tolist() == [4.1]
+
+
+def test_summarise():
+    summary = summarise(np.array([1.0, 2.0, 3.0, 4.0]), np.array([10.0, 40.0, 20.0, 30.0]), percentiles=[50])
+    assert summary == {"count": 4, "last": 30.0, "last_time": 4.0, "mean": 25.0, "min": 10.0, "max": 40.0, "p50": 25.0}
+    assert summarise(np.array([]), np.array([])) == {"count": 0}
+
+
+def test_downsample_skips_empty_buckets():
+    times = np.array([100.0, 110.0, 130.0, 250.0])
+    values = np.array([1.0, 3.0, 5.0, 7.0])
+    assert downsample(times, values, since=100, step=60) == [[100, 3.0], [220, 7.0]]
+
+
+def test_store_ingests_numeric_fields(base_data):
+    store = RecentTelemetryStore(capacity=8)
+    store.ingest(DeviceTelemetryPoint(**base_data, battery_level=90, voltage=4.1), now=100)
+    store.ingest(DeviceTelemetryPoint(**base_data, battery_level=85), now=200)
+    store.ingest(TextMessagePoint(**base_data, text="hello"), now=200)
+
+    assert store.measurements(0x0A) == {
+        "battery": ["battery_level", "voltage", "air_util_tx", "channel_utilization", "uptime_seconds"]
+    }
+    _, values = store.window(0x0A, "battery", "battery_level", since=0)
+    assert values.tolist() == [90, 85]
+
+    with pytest.raises(KeyError):
+        store.window(0x0B, "battery", "battery_level", since=0)
+
+
+def test_store_evicts_least_recently_updated_series(base_data):
+    size = RingBuffer(("a",) * 5, 8).nbytes
+    store = RecentTelemetryStore(capacity=8, memory_budget=size * 2)
+
+    for node_id in (1, 2, 1, 3):
+        store.ingest(DeviceTelemetryPoint(**{**base_data, "_from": node_id}, battery_level=50), now=100)
+
+    assert list(store.series) == [(1, "battery"), (3, "battery")]
+    assert store.nbytes == size * 2
+
+
+def test_store_position_fields(base_data):
+    store = RecentTelemetryStore(capacity=8)
+    store.ingest(PositionPoint(**base_data, latitude_i=302660000, longitude_i=-977500000, gps_time="x"), now=100)
+    assert "gps_time" not in store.measurements(0x0A)["position"]
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import pytest
+from meshtastic.protobuf.mqtt_pb2 import ServiceEnvelope
+
+from bridger.dataclasses import PositionPoint, ReceptionPoint, ReceptionSummaryPoint
+from bridger.reception import ReceptionAggregator
+
+
+def envelope(gateway_id, rx_snr=5.0, rx_rssi=-80, hop_limit=3, hop_start=3, packet_id=1234):
+    service_envelope = ServiceEnvelope(channel_id="LongFast", gateway_id=gateway_id)
+    packet = service_envelope.packet
+    setattr(packet, "from", 0x0A)
+    packet.to = 4294967295
+    packet.id = packet_id
+    packet.rx_snr = rx_snr
+    packet.rx_rssi = rx_rssi
+    packet.hop_limit = hop_limit
+    packet.hop_start = hop_start
+    return service_envelope
+
+
+@pytest.fixture
+def position_point():
+    return PositionPoint(
+        _from=0x0A,
+        to=4294967295,
+        packet_id=1234,
+        rx_time=0,
+        rx_snr=5.0,
+        rx_rssi=-80,
+        hop_limit=3,
+        hop_start=3,
+        channel_id="LongFast",
+        gateway_id="!00000001",
+        latitude_i=302660000,
+        longitude_i=-977500000,
+    )
+
+
+def test_collects_receptions_until_the_window_closes(position_point):
+    aggregator = ReceptionAggregator(window=5)
+
+    assert not aggregator.add_reception(envelope("!00000001"))
+    aggregator.open(envelope("!00000001"), position_point, now=100)
+    assert aggregator.add_reception(envelope("!00000002", rx_snr=-7.5, rx_rssi=-120, hop_limit=1))
+    assert aggregator.add_reception(envelope("!00000003", rx_snr=1.0, rx_rssi=-100, hop_limit=2))
+
+    assert aggregator.flush(now=104) == []
+
+    points = [point for point, _ in aggregator.flush(now=105)]
+    assert points[0] is position_point
+    summary = points[1]
+    assert isinstance(summary, ReceptionSummaryPoint)
+    assert summary.packet_type == "position"
+    assert summary.gateway_count == 3
+    assert (summary.snr_best, summary.snr_worst) == (5.0, -7.5)
+    assert (summary.rssi_best, summary.rssi_worst) == (-80, -120)
+    assert summary.hops_away_min == 0
+    assert len(points) == 2
+    assert not aggregator.packets
+
+
+def test_same_gateway_keeps_its_first_copy(position_point):
+    aggregator = ReceptionAggregator(window=5)
+    aggregator.open(envelope("!00000001"), position_point, now=100)
+    aggregator.add_reception(envelope("!00000001", rx_snr=-10, hop_limit=1))
+
+    summary = aggregator.flush(force=True)[1][0]
+    assert summary.gateway_count == 1
+    assert summary.snr_worst == 5.0
+
+
+def test_own_uplink_is_not_counted_as_signal(position_point):
+    aggregator = ReceptionAggregator(window=5)
+    aggregator.open(envelope("!0000000a", rx_snr=0, rx_rssi=0), position_point, now=100)
+
+    summary = aggregator.flush(force=True)[1][0]
+    assert summary.gateway_count == 1
+    assert summary.snr_best is None and summary.rssi_best is None
+
+
+def test_per_gateway_rows(position_point):
+    aggregator = ReceptionAggregator(window=5, per_gateway=True)
+    aggregator.open(envelope("!00000001"), position_point, now=100)
+    aggregator.add_reception(envelope("!00000002", rx_snr=-3, hop_limit=1))
+
+    rows = [point for point, _ in aggregator.flush(force=True) if isinstance(point, ReceptionPoint)]
+    assert [(row.gateway_id, row.rx_snr, row.hops_away) for row in rows] == [("!00000001", 5.0, 0), ("!00000002", -3, 2)]
+
+
+def test_max_open_closes_the_oldest(position_point):
+    aggregator = ReceptionAggregator(window=5, max_open=1)
+    assert aggregator.open(envelope("!00000001", packet_id=1), position_point, now=100) == []
+
+    points = aggregator.open(envelope("!00000001", packet_id=2), position_point, now=101)
+    assert points[0][0] is position_point
+    assert list(aggregator.packets) == [(0x0A, 2)]
+
+
+def test_points_keep_the_time_the_packet_arrived(position_point):
+    aggregator = ReceptionAggregator(window=5)
+    with patch("bridger.reception.time.time", return_value=1700000000.0):
+        aggregator.open(envelope("!00000001"), position_point, now=100)
+
+    assert {received_at for _, received_at in aggregator.flush(now=200)} == {1700000000.0}
@@ -0,0 +1,106 @@
+import pytest
+
+from bridger.dataclasses import DeviceTelemetryPoint, PositionPoint, PowerTelemetryPoint
+from bridger.rollup import RollupEngine, interval_label, numeric_fields
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 0x0A,
+        "to": 4294967295,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def test_numeric_fields_skip_packet_metadata_and_unset_values(base_data):
+    point = DeviceTelemetryPoint(**base_data, battery_level=90, voltage=4.1)
+    assert numeric_fields(point) == {"battery_level": 90, "voltage": 4.1}
+
+
+def test_interval_label():
+    assert [interval_label(seconds) for seconds in (30, 60, 900, 3600, 7200)] == ["30s", "1m", "15m", "1h", "2h"]
+
+
+def test_window_closes_with_min_mean_max_last(base_data):
+    engine = RollupEngine(intervals=[60])
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=90, voltage=4.0), now=120)
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=80), now=150)
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=85, voltage=4.2), now=179)
+
+    assert engine.flush(now=179) == []
+
+    (record,) = engine.flush(now=180)
+    assert record["measurement"] == "battery"
+    assert record["time"] == 120
+    assert record["tags"] == {"_from": 0x0A, "interval": "1m"}
+    assert record["fields"]["battery_level_min"] == 80
+    assert record["fields"]["battery_level_mean"] == 85
+    assert record["fields"]["battery_level_max"] == 90
+    assert record["fields"]["battery_level_last"] == 85
+    assert record["fields"]["voltage_mean"] == pytest.approx(4.1)
+    assert record["fields"]["count"] == 3
+    assert engine.windows == {60: {}}
+
+
+def test_each_interval_has_its_own_windows(base_data):
+    engine = RollupEngine(intervals=[60, 900])
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=90), now=30)
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=70), now=90)
+
+    records = engine.flush(now=120)
+    assert [(record["tags"]["interval"], record["time"]) for record in records] == [("1m", 0), ("1m", 60)]
+
+    (record,) = engine.flush(now=900)
+    assert record["tags"]["interval"] == "15m"
+    assert record["fields"]["battery_level_mean"] == 80
+
+
+def test_point_tags_split_series(base_data):
+    engine = RollupEngine(intervals=[60])
+    engine.observe(
+        [
+            PowerTelemetryPoint(**base_data, voltage=5.0, channel="ch1"),
+            PowerTelemetryPoint(**base_data, voltage=12.0, channel="ch2"),
+        ],
+        now=0,
+    )
+
+    records = engine.flush(now=float("inf"))
+    assert sorted(record["tags"]["channel"] for record in records) == ["ch1", "ch2"]
+
+
+def test_other_points_are_ignored(base_data):
+    engine = RollupEngine(intervals=[60])
+    engine.observe(PositionPoint(**base_data, latitude_i=1, longitude_i=2), now=0)
+    engine.observe(None, now=0)
+
+    assert engine.flush(now=float("inf")) == []
+
+
+def test_open_windows_survive_a_restart(base_data, tmp_path):
+    path = tmp_path / "rollups.json"
+    engine = RollupEngine(intervals=[60], path=path)
+    engine.observe(DeviceTelemetryPoint(**base_data, battery_level=90), now=120)
+    engine.observe(PowerTelemetryPoint(**base_data, voltage=5.0, channel="ch1"), now=120)
+    engine.save()
+
+    restarted = RollupEngine(intervals=[60], path=path)
+    assert not path.exists()
+    restarted.observe(DeviceTelemetryPoint(**base_data, battery_level=70), now=150)
+
+    records = {record["measurement"]: record for record in restarted.flush(now=180)}
+    assert records["battery"]["fields"]["battery_level_mean"] == 80
+    assert records["battery"]["fields"]["count"] == 2
+    assert records["power"]["tags"] == {"_from": 0x0A, "channel": "ch1", "interval": "1m"}
+
+    # Windows for intervals that are no longer configured are dropped
+    engine.save()
+    assert RollupEngine(intervals=[900], path=path).windows == {900: {}}
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from influxdb_client.client.flux_table import FluxColumn, FluxRecord, FluxTable
+
+from bridger.dataclasses import NodeInfoPoint, PositionPoint
+from bridger.influx.interfaces import InfluxWriter
+from bridger.influx.schema import migration_records, parse_duration, point_classes, time_chunks
+
+TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def flux_table(tags: list[str], rows: list[dict]) -> FluxTable:
+    table = FluxTable()
+    for label in ("result", "table", "_start", "_stop", "_time", "_measurement"):
+        table.columns.append(FluxColumn(label=label, group=label in ("_start", "_stop", "_measurement")))
+    table.columns.extend(FluxColumn(label=tag, group=True) for tag in tags)
+    table.records = [FluxRecord(0, {"_time": TIME, **row}) for row in rows]
+    return table
+
+
+class TestExtractKeys:
+    def test_legacy_keeps_descriptive_tags(self):
+        tag_keys, field_keys = InfluxWriter.extract_keys(NodeInfoPoint, "legacy")
+        assert {"to", "channel_id", "long_name", "short_name", "hw_model"} <= set(tag_keys)
+        assert "heartbeats" in field_keys
+
+    def test_compact_moves_descriptive_tags_to_fields(self):
+        tag_keys, field_keys = InfluxWriter.extract_keys(NodeInfoPoint, "compact")
+        assert set(tag_keys) == {"_from", "gateway_id"}
+        assert {"to", "channel_id", "long_name", "short_name", "macaddr", "hw_model", "role"} <= set(field_keys)
+
+    def test_unknown_schema(self):
+        with pytest.raises(ValueError):
+            InfluxWriter.extract_keys(PositionPoint, "wide")
+
+
+def test_point_classes():
+    classes = point_classes()
+    assert classes["node"] is NodeInfoPoint
+    assert classes["position"] is PositionPoint
+
+
+def test_parse_duration():
+    assert parse_duration("30d") == timedelta(days=30)
+    assert parse_duration("6H") == timedelta(hours=6)
+    with pytest.raises(ValueError):
+        parse_duration("-1d")
+
+
+def test_time_chunks():
+    chunks = list(time_chunks(TIME, TIME + timedelta(hours=14), timedelta(hours=6)))
+    assert [(start - TIME, stop - TIME) for start, stop in chunks] == [
+        (timedelta(hours=0), timedelta(hours=6)),
+        (timedelta(hours=6), timedelta(hours=12)),
+        (timedelta(hours=12), timedelta(hours=14)),
+    ]
+
+
+class TestMigrationRecords:
+    def setup_method(self):
+        row = {
+            "_measurement": "node",
+            "_from": "1",
+            "to": "4294967295",
+            "channel_id": "LongFast",
+            "gateway_id": "!abcd1234",
+            "long_name": "Base",
+            "short_name": "BS",
+            "role": "2",
+            "hw_model": None,
+            "packet_id": 1234,
+            "heartbeats": 3,
+        }
+        self.tables = [flux_table(["_from", "to", "channel_id", "gateway_id", "long_name", "short_name", "role"], [row])]
+
+    def test_compact(self):
+        (record,) = migration_records(self.tables, "compact")
+        assert record["measurement"] == "node"
+        assert record["time"] == TIME
+        assert record["tags"] == {"_from": "1", "gateway_id": "!abcd1234"}
+        # Values that were tags get their point class type back so they match newly written fields
+        assert record["fields"] == {
+            "to": 4294967295,
+            "channel_id": "LongFast",
+            "long_name": "Base",
+            "short_name": "BS",
+            "role": 2,
+            "packet_id": 1234,
+            "heartbeats": 3,
+        }
+
+    def test_legacy_keeps_tags(self):
+        (record,) = migration_records(self.tables, "legacy")
+        assert record["tags"]["to"] == "4294967295"
+        assert set(record["fields"]) == {"packet_id", "heartbeats"}
+
+    def test_unknown_measurement_is_copied(self):
+        table = flux_table(["gateway_id"], [{"_measurement": "custom", "gateway_id": "!abcd1234", "value": 1}])
+        (record,) = migration_records([table], "compact")
+        assert record == {"measurement": "custom", "tags": {"gateway_id": "!abcd1234"}, "fields": {"value": 1}, "time": TIME}
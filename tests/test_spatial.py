@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from bridger.dataclasses import DeviceTelemetryPoint, PositionPoint
+from bridger.spatial import NodePosition, SpatialIndex, haversine_km, precision_radius_m
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 0x0A,
+        "to": 4294967295,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def position(node_id, latitude, longitude):
+    return NodePosition(node_id, latitude, longitude, None, None, 0.0, 0.0)
+
+
+def test_haversine_km():
+    # Austin to Dallas
+    assert haversine_km(30.2672, -97.7431, 32.7767, -96.7970) == pytest.approx(293.1, abs=0.5)
+
+
+def test_precision_radius():
+    assert precision_radius_m(None, 30) == 0
+    assert precision_radius_m(32, 30) == 0
+    assert precision_radius_m(13, 30) == pytest.approx(7712, rel=0.01)
+
+
+def test_ingest_moves_node_between_cells(base_data):
+    index = SpatialIndex(cell_size=0.05)
+    index.ingest(PositionPoint(**base_data, latitude_i=302672000, longitude_i=-977431000, precision_bits=13), now=1)
+    assert index.positions[0x0A].accuracy_m > 0
+    assert index.cells == {index.cell(30.2672, -97.7431): {0x0A}}
+
+    index.ingest(PositionPoint(**base_data, latitude_i=327767000, longitude_i=-967970000), now=2)
+    assert index.cells == {index.cell(32.7767, -96.797): {0x0A}}
+
+    index.ingest(PositionPoint(**base_data, latitude_i=327767000, longitude_i=-967970000, precision_bits=0), now=3)
+    assert index.positions == {}
+    assert index.cells == {}
+
+    index.ingest(DeviceTelemetryPoint(**base_data, battery_level=50))
+    assert index.positions == {}
+
+
+def test_bbox():
+    index = SpatialIndex(cell_size=0.05)
+    index.update(position(1, 30.27, -97.74))
+    index.update(position(2, 30.30, -97.70))
+    index.update(position(3, 32.78, -96.80))
+
+    found = index.bbox(30.0, -98.0, 30.28, -97.0)
+    assert [found.node_id for found in found] == [1]
+    assert {found.node_id for found in index.bbox(30.0, -98.0, 33.0, -96.0)} == {1, 2, 3}
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(1)
+    index = SpatialIndex(cell_size=0.05)
+    points = [position(node_id, 30 + rng.uniform(-1, 1), -97 + rng.uniform(-1, 1)) for node_id in range(300)]
+    for point in points:
+        index.update(point)
+
+    expected = sorted(points, key=lambda point: haversine_km(30.1, -97.2, point.latitude, point.longitude))[:5]
+    nearest = index.nearest(30.1, -97.2, k=5)
+    assert [found.node_id for _, found in nearest] == [point.node_id for point in expected]
+    assert [distance for distance, _ in nearest] == sorted(distance for distance, _ in nearest)
+
+
+def test_nearest_radius():
+    index = SpatialIndex(cell_size=0.05)
+    index.update(position(1, 30.27, -97.74))
+    index.update(position(2, 32.78, -96.80))
+
+    assert [found.node_id for _, found in index.nearest(30.27, -97.74, k=5, radius_km=5)] == [1]
+    assert index.nearest(0, 0, k=0) == []
+
+
+def test_nearest_far_from_every_node():
+    index = SpatialIndex(cell_size=0.05)
+    for node_id in range(50):
+        index.update(position(node_id, 30.2 + node_id * 0.01, -97.7))
+
+    # Asking for more nodes than there are far from any of them scans them instead of walking thousands of rings
+    rings = []
+    ring_cells = index.ring_cells
+    index.ring_cells = lambda row, col, ring: rings.append(ring) or ring_cells(row, col, ring)
+    nearest = index.nearest(-80, 80, k=1000)
+    assert len(rings) < 5
+    assert len(nearest) == 50
+    assert [distance for distance, _ in nearest] == sorted(distance for distance, _ in nearest)
+    assert index.nearest(-80, 80, k=1000, radius_km=100) == []
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from meshtastic.protobuf.portnums_pb2 import PortNum
+
+from bridger.mesh.handler_registry import HANDLER_STATS, UNHANDLED, HandlerStats
+from bridger.stats import PacketStats
+
+
+def test_flush_returns_counts_and_resets():
+    stats = PacketStats("Test", interval=3600)
+    stats.record("stored")
+    stats.record("stored")
+    stats.record("unsupported")
+
+    assert stats.flush() == {"stored": 2, "unsupported": 1}
+    assert not stats.counts
+    assert stats.totals == {"stored": 2, "unsupported": 1}
+
+
+def test_record_flushes_after_interval():
+    stats = PacketStats("Test", interval=60)
+    with patch("bridger.stats.time.monotonic", return_value=stats.last_flush + 61):
+        stats.record("stored")
+
+    assert not stats.counts
+    assert stats.totals == {"stored": 1}
+
+
+def test_flush_logs_handler_stats():
+    stats = PacketStats("Test", interval=3600)
+    HANDLER_STATS["SummaryHandler"] = HandlerStats(calls=4, results=3, seconds=0.002)
+    UNHANDLED[PortNum.ATAK_PLUGIN] += 2
+
+    with patch("bridger.stats.logger") as logger:
+        stats.flush()
+
+    (message,) = [call.args[0] for call in logger.info.call_args_list]
+    assert "SummaryHandler calls=4 results=3 mean=0.500ms" in message
+    assert "unhandled ATAK_PLUGIN=2" in message
+    assert HANDLER_STATS["SummaryHandler"].calls == 0
+    assert not UNHANDLED
+    del HANDLER_STATS["SummaryHandler"]
@@ -0,0 +1,138 @@
+import asyncio
+import base64
+from unittest.mock import MagicMock
+
+import aiomqtt
+import pytest
+
+from bridger.dataclasses import DeviceTelemetryPoint, PositionPoint
+from bridger.mesh import PBPacketProcessor
+from bridger.stream import LivePacketFeed, PointBroadcaster, Subscription
+
+device_telemetry1 = base64.b64decode(
+    b"CjANZNgWDBX/////IhkIQxIVDTIAAAASDghlHU8bxEAl9dyRPCgyNdyT2zZIBVgKeAUSCExvbmdGYXN0GgkhMGMxNmQ4NjQ="
+)
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 1,
+        "to": 4294967295,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def test_subscription_matches(base_data):
+    point = DeviceTelemetryPoint(**base_data, battery_level=50)
+
+    assert Subscription().matches(point)
+    assert Subscription(measurements=["battery"], nodes=[1], gateways=["!0c18aaf4"]).matches(point)
+    assert not Subscription(measurements=["position"]).matches(point)
+    assert not Subscription(nodes=[2]).matches(point)
+    assert not Subscription(gateways=["!00000000"]).matches(point)
+
+
+def test_subscription_drops_oldest_when_full():
+    subscription = Subscription(maxsize=2)
+    for payload in ("a", "b", "c"):
+        subscription.put(payload)
+
+    assert subscription.dropped == 1
+    assert subscription.queue.get_nowait() == "b"
+    assert subscription.queue.get_nowait() == "c"
+
+
+@pytest.mark.asyncio
+async def test_broadcaster_fans_out_and_serializes_once(base_data, monkeypatch):
+    serialize = MagicMock(return_value="{}")
+    monkeypatch.setattr("bridger.stream.serialize_point", serialize)
+    broadcaster = PointBroadcaster()
+    battery = broadcaster.subscribe(measurements=["battery"])
+    everything = broadcaster.subscribe()
+    listener = MagicMock()
+    broadcaster.add_listener(listener)
+
+    broadcaster.publish(
+        [DeviceTelemetryPoint(**base_data, battery_level=50), PositionPoint(**base_data, latitude_i=1, longitude_i=2)]
+    )
+
+    assert battery.queue.qsize() == 1
+    assert everything.queue.qsize() == 2
+    assert serialize.call_count == 2
+    assert listener.call_count == 2
+
+    broadcaster.unsubscribe(battery)
+    assert battery not in broadcaster.subscriptions
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_live_feed_publishes_decoded_packets_once():
+    broadcaster = PointBroadcaster()
+    subscription = broadcaster.subscribe()
+    feed = LivePacketFeed(broadcaster)
+
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", device_telemetry1)
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", device_telemetry1)
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", b"not a protobuf")
+
+    assert subscription.queue.qsize() == 1
+    assert '"measurement": "battery"' in subscription.queue.get_nowait()
+
+
+def test_live_feed_envelope_listeners_see_every_copy():
+    feed = LivePacketFeed(PointBroadcaster())
+    envelopes = []
+    feed.add_envelope_listener(envelopes.append)
+    feed.add_envelope_listener(lambda envelope: 1 / 0)
+
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", device_telemetry1)
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", device_telemetry1)
+
+    assert len(envelopes) == 2
+
+
+def test_live_feed_survives_handler_errors(monkeypatch):
+    broadcaster = PointBroadcaster()
+    subscription = broadcaster.subscribe()
+    feed = LivePacketFeed(broadcaster)
+
+    def fail(*args, **kwargs):
+        raise ValueError("bad packet")
+
+    monkeypatch.setattr(PBPacketProcessor, "process", fail)
+    feed.handle_payload("fake/2/e/LongFast/!0c16d864", device_telemetry1)
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_live_feed_reconnects_with_capped_backoff(monkeypatch):
+    feed = LivePacketFeed(PointBroadcaster())
+    delays = []
+    attempts = iter([aiomqtt.MqttError("gone")] * 8 + [None, OSError("refused"), asyncio.CancelledError()])
+
+    async def subscribe():
+        error = next(attempts)
+        if error is None:
+            # A successful subscribe starts the backoff over
+            feed.reconnect_delay = 1
+        else:
+            raise error
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(feed, "subscribe", subscribe)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    with pytest.raises(asyncio.CancelledError):
+        await feed.run()
+
+    assert delays == [1, 2, 4, 8, 16, 32, 60, 60, 1, 2]
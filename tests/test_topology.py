@@ -0,0 +1,77 @@
+import pytest
+
+from bridger.dataclasses import NeighborInfoPacket, TracerouteHopPoint
+from bridger.topology import TopologyGraph
+
+
+@pytest.fixture
+def base_data():
+    return {
+        "_from": 0x0A,
+        "to": 0x0B,
+        "packet_id": 1234,
+        "rx_time": 1725990585,
+        "rx_snr": 5.0,
+        "rx_rssi": -50,
+        "hop_limit": 3,
+        "hop_start": 3,
+        "channel_id": "LongFast",
+        "gateway_id": "!0c18aaf4",
+    }
+
+
+def neighbor(base_data, node_id, neighbor_id, snr):
+    return NeighborInfoPacket(**base_data, node_id=node_id, last_sent_by_id=node_id, neighbor_id=neighbor_id, snr=snr)
+
+
+def test_neighbor_edges_are_directed_towards_the_receiver(base_data):
+    graph = TopologyGraph()
+    graph.ingest(neighbor(base_data, 0x0A, 0x0B, 6.0), now=100)
+    graph.ingest(neighbor(base_data, 0x0A, 0x0B, -2.5), now=200)
+
+    edge = graph.edges[(0x0B, 0x0A)]
+    assert edge.snr == -2.5
+    assert edge.first_seen == 100
+    assert edge.last_seen == 200
+    assert edge.count == 2
+    assert edge.snr_mean == pytest.approx(1.75)
+
+
+def test_traceroute_hops_become_edges(base_data):
+    graph = TopologyGraph()
+    graph.ingest(TracerouteHopPoint(**base_data, direction="towards", hop=0, hop_from=0x0B, hop_to=0x01, snr=2.0), now=100)
+    graph.ingest(TracerouteHopPoint(**base_data, direction="towards", hop=1, hop_from=0x01, hop_to=0x0A, snr=None), now=100)
+
+    assert graph.edges[(0x0B, 0x01)].snr == 2.0
+    assert graph.edges[(0x01, 0x0A)].snr is None
+    assert graph.edges[(0x01, 0x0A)].snr_samples == 0
+
+
+def test_missing_node_ids_are_skipped(base_data):
+    graph = TopologyGraph()
+    graph.ingest(neighbor(base_data, 0x0A, None, 6.0), now=100)
+    graph.ingest(TracerouteHopPoint(**base_data, direction="towards", hop=0, hop_from=None, hop_to=0x01, snr=2.0), now=100)
+
+    assert graph.edges == {}
+    assert graph.nodes == {}
+    assert graph.to_node_graph() == {"nodes": [], "edges": []}
+
+
+def test_prune_drops_old_edges_and_orphaned_nodes(base_data):
+    graph = TopologyGraph(max_age=100)
+    graph.add_edge(0x0B, 0x0A, 6.0, now=100)
+    graph.add_edge(0x0D, 0x0C, 6.0, now=250)
+
+    assert graph.prune(now=250) == 1
+    assert set(graph.edges) == {(0x0D, 0x0C)}
+    assert set(graph.nodes) == {0x0C, 0x0D}
+
+
+def test_to_node_graph(base_data):
+    graph = TopologyGraph()
+    graph.ingest(neighbor(base_data, 0x0A, 0x0B, 6.0), now=100)
+
+    node_graph = graph.to_node_graph()
+    assert {node["id"] for node in node_graph["nodes"]} == {"!0000000a", "!0000000b"}
+    assert node_graph["edges"][0]["id"] == "!0000000b_!0000000a"
+    assert node_graph["edges"][0]["mainstat"] == 6.0
@@ -1,6 +1,8 @@
 from unittest.mock import patch
 
-from bridger.utils import should_ignore_pki_message
+import pytest
+
+from bridger.utils import parse_node_id, should_ignore_pki_message
 
 
 class TestShouldIgnorePkiMessage:
@@ -40,3 +42,11 @@ class TestShouldIgnorePkiMessage:
 
         assert should_ignore_pki_message(pki_topic) is True
         assert should_ignore_pki_message(regular_topic) is False
+
+
+def test_parse_node_id():
+    assert parse_node_id("!1a2b3c4d") == 0x1A2B3C4D
+    assert parse_node_id("439041101") == 439041101
+
+    with pytest.raises(ValueError):
+        parse_node_id("!zz")